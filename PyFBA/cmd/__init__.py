@@ -8,11 +8,12 @@ from .media import list_media, media_compounds
 from .reactions_to_roles import convert_reactions_to_roles, convert_reactions_to_aliases
 from .gapcreate import create_reaction_gaps
 from .test_two_media import compare_two_media
+from .screen_media import run_media_screen
 
 # Don't forget to add the imports here so that you can import *
 
 __all__ = [
     'cite_me_please', 'measure_fluxes', 'gapfill_from_roles', 'to_reactions', 'run_the_fba', 'gapfill_multiple_media',
     'list_media', 'convert_reactions_to_roles', 'create_reaction_gaps', 'compare_two_media', 'media_compounds',
-    'gapfill_two_media', 'convert_reactions_to_aliases'
+    'gapfill_two_media', 'convert_reactions_to_aliases', 'run_media_screen'
 ]
@@ -20,6 +20,7 @@ Please use one of these commands with their appropriate flags. Use pyfba <comman
 
 fba\tGiven a file with a set of reactions, run an FBA on that set of reactions
 fluxes\tGiven a set of reactions that form a model, report the fluxes through those reactions
+screen_media\tGiven a set of reactions that form a model, test growth on many (by default all) media
 
 to_reactions\tConvert a set of functional roles or feature names to a list of reactions
 gapfill_roles\tGapfill Flux Balance Analysis from a list of functional roles
@@ -79,6 +80,8 @@ def run():
         create_reaction_gaps()
     elif sys.argv[1] == 'compare_media':
         compare_two_media()
+    elif sys.argv[1] == 'screen_media':
+        run_media_screen()
     else:
         sys.stderr.write(f"Sorry. Don't understand {sys.argv[1]}.")
         sys.stderr.write(full_help())
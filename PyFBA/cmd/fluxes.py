@@ -9,7 +9,7 @@ import PyFBA
 from PyFBA import log_and_message
 
 
-def fluxes(reactions, modeldata, media, biomass_equation, verbose=False):
+def fluxes(reactions, modeldata, media, biomass_equation, parsimonious=False, verbose=False):
     """
     Run the FBA and return the fluxes through each reaction
     :param biomass_equation: the biomass equation
@@ -20,6 +20,8 @@ def fluxes(reactions, modeldata, media, biomass_equation, verbose=False):
     :type modeldata: PyFBA.model_seed.ModelData
     :param media: the media object
     :type media: set[PyFBA.metabolism.Compound]
+    :param parsimonious: report the fluxes with the smallest total flux at the optimal biomass flux (pFBA)
+    :type parsimonious: bool
     :param verbose: more output
     :return: a dict of the reactions and their fluxes
     :rtype: dict[str, float]
@@ -33,7 +35,8 @@ def fluxes(reactions, modeldata, media, biomass_equation, verbose=False):
     for r in todelete:
         reactions.remove(r)
 
-    status, value, growth = PyFBA.fba.run_fba(modeldata, reactions, media, biomass_equation, verbose=verbose)
+    status, value, growth = PyFBA.fba.run_fba(modeldata, reactions, media, biomass_equation,
+                                              parsimonious=parsimonious, verbose=verbose)
     if not growth:
         msg = f'ERROR: The set of {len(reactions)} reactions that you provided did not result in growth. '
         msg += 'We can not report fluxes if there was no growth!'
@@ -55,6 +58,8 @@ def measure_fluxes():
     parser.add_argument('-t', '--type', default='gramnegative',
                         help=f'organism type for the model (currently allowed are {orgtypes}). Default=gramnegative')
     parser.add_argument('-b', '--biomass', help='biomass equation to use. Default is the same as --type option')
+    parser.add_argument('-p', '--parsimonious', action='store_true',
+                        help='report the fluxes with the smallest total flux at the optimal biomass flux (pFBA)')
     parser.add_argument('-v', '--verbose', help='verbose output', action='store_true')
     args = parser.parse_args(sys.argv[2:])
 
@@ -83,7 +88,7 @@ def measure_fluxes():
 
     media = PyFBA.parse.pyfba_media(args.media, modeldata, args.verbose)
     fl = fluxes(reactions=rxns, modeldata=modeldata, media=media, biomass_equation=biomass_equation,
-                verbose=args.verbose)
+                parsimonious=args.parsimonious, verbose=args.verbose)
 
     if fl:
         with open(args.output, 'w') as out:
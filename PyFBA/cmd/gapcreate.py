@@ -76,7 +76,11 @@ def gap_create(reactions, media, model_data, orgtype='gramnegative',  flux_fract
     biomass_equation = PyFBA.metabolism.biomass_equation(orgtype)
 
     original_reactions = copy.deepcopy(reactions)
-    initial_value, initial_growth = run_eqn("Initial", model_data, reactions, media, biomass_equation, verbose=verbose)
+    # we load all the reactions once, and then switch them off and on as we test them
+    session = PyFBA.fba.FBASession(model_data, reactions, media, biomass_equation, verbose=verbose)
+    status, initial_value, initial_growth = session.solve()
+    log_and_message(f"FBA run Initial has a biomass flux value of {initial_value:.2f} --> Growth: {initial_growth}",
+                    stderr=verbose)
     if not initial_growth:
         log_and_message(f"The initial set of {len(reactions)} reactions doesn't grow on your media (flux: {initial_value})",
                         stderr = True)
@@ -86,21 +90,28 @@ def gap_create(reactions, media, model_data, orgtype='gramnegative',  flux_fract
     c=0
     for r in original_reactions:
         reactions.remove(r)
+        session.disable({r})
         c += 1
-        value, growth = run_eqn(f"Reaction {c}: {r} ", model_data, reactions, media, biomass_equation, verbose=verbose)
         if flux_fraction > 0:
+            status, value, growth = session.solve()
+            log_and_message(f"FBA run Reaction {c}: {r}  has a biomass flux value of {value:.2f} --> Growth: {growth}",
+                            stderr=verbose)
             if value/initial_value >= flux_fraction:
                 # this is growth
                 log_and_message(f"Reaction {c}/{num} ({r}) Flux: {value:.2f} Flux fraction {value/initial_value:.3f} {r} NOT required", stderr=verbose)
             else:
                 log_and_message(f"Reaction {c}/{num} ({r}) Flux: {value:.2f} Flux fraction {value/initial_value:.3f} {r} REQUIRED", stderr=verbose)
                 reactions.add(r)
+                session.enable({r})
         else:
+            # without a flux fraction we only need to know whether we grow
+            growth = session.grows()
             if growth:
-                log_and_message(f"Reaction {c}/{num} ({r}) Flux: {value:.2f} {r} not required", stderr=verbose)
+                log_and_message(f"Reaction {c}/{num} ({r}) not required", stderr=verbose)
             else:
                 log_and_message(f"Reaction {c}/{num} ({r}) is required for growth", stderr=verbose)
                 reactions.add(r)
+                session.enable({r})
     log_and_message(f"After testing all the reactions, {len(reactions)} are required", stderr=verbose)
     return reactions
 
@@ -18,7 +18,8 @@ We will handle multiple positive files and negative files and try and resolve in
 modeldata = PyFBA.model_seed.ModelData()
 
 
-def minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media, biomass_equation, verbose=False):
+def minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media, biomass_equation,
+                       strategy='bisect', verbose=False):
     reqd_additional = set()
     print(f"Before we began, we had {len(original_reactions_to_run)} reactions")
 
@@ -37,7 +38,7 @@ def minimize_reactions(original_reactions_to_run, added_reactions, modeldata, me
         # Use minimization function to determine the minimal
         # set of gap-filled reactions from the current method
         new_essential = PyFBA.gapfill.minimize_additional_reactions(ori, new, modeldata, media, biomass_equation,
-                                                                    verbose=True)
+                                                                    strategy=strategy, verbose=True)
         log_and_message(f"Saved {len(new_essential)} reactions from {how}", stderr=verbose)
         # Record the method used to determine
         # how the reaction was gap-filled
@@ -68,7 +69,8 @@ def update_r2r(old, new, why, verbose=False):
 
 
 def resolve_additional_reactions(ori_reactions, adnl_reactions, md, gm, ngm, biomass_eqn,
-                                 minimum_tp=0, minimum_accuracy=0.5, verbose=False):
+                                 minimum_tp=0, minimum_accuracy=0.5, strategy='bisect', processes=1, checkpoint=None,
+                                 verbose=False):
     """
     Iteratively resolve additional reactions that are required
     :param ori_reactions: the set of original reactions that form the base of the model
@@ -86,6 +88,13 @@ def resolve_additional_reactions(ori_reactions, adnl_reactions, md, gm, ngm, bio
     :type minimum_tp: float
     :param minimum_accuracy:  minimum accuracy desired
     :type minimum_accuracy: float
+    :param strategy: how to minimize the reactions: bisect or ddmin (see PyFBA.gapfill.minimize_by_accuracy)
+    :type strategy: str
+    :param processes: the number of processes to test the media with
+    :type processes: int
+    :param checkpoint: save the reactions that we keep from each step, and use the reactions that we already kept
+    if we are resuming (see PyFBA.gapfill.Checkpoint)
+    :type checkpoint: PyFBA.gapfill.Checkpoint
     :param verbose:  more output
     :return: set of additional reactions from all of the added_reactions
     :rtype: set
@@ -101,8 +110,15 @@ def resolve_additional_reactions(ori_reactions, adnl_reactions, md, gm, ngm, bio
         # get all the other reactions we need to add
         for tple in adnl_reactions:
             ori.update(tple[1])
-        new_essential = PyFBA.gapfill.minimize_by_accuracy(ori, new, md, gm, ngm,
-                                                           biomass_eqn, minimum_tp, minimum_accuracy, verbose=verbose)
+        new_essential = None
+        if checkpoint is not None:
+            new_essential = checkpoint.required(how, ori, new)
+        if new_essential is None:
+            new_essential = PyFBA.gapfill.minimize_by_accuracy(ori, new, md, gm, ngm, biomass_eqn, minimum_tp,
+                                                               minimum_accuracy, strategy=strategy,
+                                                               processes=processes, verbose=verbose)
+            if checkpoint is not None:
+                checkpoint.record_required(how, ori, new, new_essential)
         for new_r in new_essential:
             md.reactions[new_r].is_gapfilled = True
             md.reactions[new_r].gapfill_method = how
@@ -136,7 +152,8 @@ def read_reactions(reaction_file, verbose=False):
 
 
 def measure_accuracy(why, growth_media, no_growth_media, reactions, added_reactions,
-                     biomass_eqtn, min_growth_conditions, reaction_source, output, verbose=False):
+                     biomass_eqtn, min_growth_conditions, reaction_source, output, checkpoint=None, processes=1,
+                     strategy='bisect', verbose=False):
     """
     Measure the accuracy of this set of reactions
     :param output: the name of the output file
@@ -157,14 +174,30 @@ def measure_accuracy(why, growth_media, no_growth_media, reactions, added_reacti
     :type added_reactions: list[(str, set[str])]
     :param biomass_eqtn: the biomass equation
     :type biomass_eqtn: PyFBA.metabolism.Reaction
+    :param checkpoint: use the saved accuracy if we have already tested these reactions, otherwise save it
+    (see PyFBA.gapfill.Checkpoint)
+    :type checkpoint: PyFBA.gapfill.Checkpoint
+    :param processes: the number of processes to test the media with (see PyFBA.gapfill.calculate_precision_recall)
+    :type processes: int
+    :param strategy: how to minimize the reactions once we grow: bisect or ddmin (see resolve_additional_reactions)
+    :type strategy: str
     :param verbose: more output
     :type verbose: bool
-    :return: True if we have succeeded in positive rate exceeeding min_growth_conditions (ie. we should exit)
+    :return: the number of true positives, and if that exceeds min_growth_conditions the reactions that we need,
+    which we have written to output (otherwise None)
+    :rtype: (int, set[str])
 
     """
 
     global modeldata
-    pr = PyFBA.gapfill.calculate_precision_recall(growth_media, no_growth_media, modeldata, reactions, biomass_eqtn)
+    pr = None
+    if checkpoint is not None:
+        pr = checkpoint.result(why, reactions)
+    if pr is None:
+        pr = PyFBA.gapfill.calculate_precision_recall(growth_media, no_growth_media, modeldata, reactions,
+                                                      biomass_eqtn, processes=processes)
+        if checkpoint is not None:
+            checkpoint.record_step(why, reactions, added_reactions, pr)
     acc = PyFBA.gapfill.reaction_minimization.accuracy(pr)
 
     msg = f"Testing accuracy: {why} "
@@ -181,19 +214,21 @@ def measure_accuracy(why, growth_media, no_growth_media, reactions, added_reacti
         original_reactions = reactions.difference(all_reactions)
         additions = resolve_additional_reactions(original_reactions, added_reactions, modeldata,
                                                  growth_media, no_growth_media, biomass_eqtn,
-                                                 minimum_tp=min_growth_conditions, verbose=verbose)
+                                                 minimum_tp=min_growth_conditions, strategy=strategy,
+                                                 processes=processes, checkpoint=checkpoint, verbose=verbose)
 
         with open(output, 'w') as out:
             for r in original_reactions.union(additions):
                 if r not in reaction_source:
                     reaction_source[r] = "UNKNOWN??"
                 out.write(f"{r}\t{reaction_source[r]}\n")
-        sys.exit(0)
-    return pr['tp']
+        return pr['tp'], original_reactions.union(additions)
+    return pr['tp'], None
 
 
 
-def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close, genome_type, output, verbose=False):
+def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close, genome_type, output, checkpoint=None,
+                     processes=1, strategy='bisect', verbose=False):
     """
     Run multiple gap filling operations and try to resove positive/negative growth
     :param output: Output file name
@@ -210,10 +245,17 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
     :type close: list[str]
     :param genome_type: The genome type (gram +ve, -ve, etc)
     :type genome_type: str
+    :param checkpoint: save our progress after every step, and resume from it (see PyFBA.gapfill.Checkpoint)
+    :type checkpoint: PyFBA.gapfill.Checkpoint
+    :param processes: the number of processes to test the media with
+    :type processes: int
+    :param strategy: how to minimize the reactions once we grow: bisect or ddmin
+    :type strategy: str
     :param verbose: more output
     :type verbose: bool
-    :return: The set of reactions that meets the conditions
-    :rtype: set[str]
+    :return: The most true positives, and the set of reactions that gave them. If we have more true positives than
+    min_growth_conditions, these are the reactions we need, and we have written them to output
+    :rtype: (int, set[str])
     """
 
     if close is None:
@@ -222,6 +264,9 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
     growth_media = [PyFBA.parse.read_media.find_media_file(m, modeldata=modeldata, verbose=verbose) for m in positive]
     no_growth_media = [PyFBA.parse.read_media.find_media_file(m, modeldata=modeldata, verbose=verbose) for m in negative]
     biomass_eqtn = PyFBA.metabolism.biomass.biomass_equation(genome_type)
+    if checkpoint is not None:
+        for name, media in zip(positive + negative, growth_media + no_growth_media):
+            checkpoint.watch(f"media {name}", PyFBA.fba.growth_oracle(modeldata, media, biomass_eqtn))
 
     min_growth_conditions = 1.0 * min_growth_conditions * len(growth_media)
 
@@ -229,8 +274,11 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
 
     reaction_source = {r: 'original_reaction' for r in reactions}
 
-    max_tp = measure_accuracy('Initial run',  growth_media, no_growth_media, reactions, [], biomass_eqtn,
-                              min_growth_conditions, reaction_source, output, verbose)
+    max_tp, resolved = measure_accuracy('Initial run', growth_media, no_growth_media, reactions, [], biomass_eqtn,
+                                        min_growth_conditions, reaction_source, output, checkpoint, processes, strategy,
+                                        verbose)
+    if resolved is not None:
+        return max_tp, resolved
     best_reactions = copy.deepcopy(reactions)
 
     added_reactions = []
@@ -264,8 +312,11 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
     added_reactions.append(("essential", essential_reactions))
     reactions = update_r2r(reactions, essential_reactions, "ESSENTIAL REACTIONS")
 
-    tp = measure_accuracy('Essential reactions',  growth_media, no_growth_media, reactions, added_reactions,
-                          biomass_eqtn, min_growth_conditions, reaction_source, output, verbose)
+    tp, resolved = measure_accuracy('Essential reactions', growth_media, no_growth_media, reactions, added_reactions,
+                                    biomass_eqtn, min_growth_conditions, reaction_source, output, checkpoint,
+                                    processes, strategy, verbose)
+    if resolved is not None:
+        return tp, resolved
     if tp > max_tp:
         best_reactions = copy.deepcopy(reactions)
         max_tp = tp
@@ -281,8 +332,11 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
     added_reactions.append(("linked_reactions", linked_reactions))
     reactions = update_r2r(reactions, linked_reactions, "LINKED REACTIONS")
 
-    tp = measure_accuracy('Linked reactions',  growth_media, no_growth_media, reactions, added_reactions, biomass_eqtn,
-                          min_growth_conditions, reaction_source, output, verbose)
+    tp, resolved = measure_accuracy('Linked reactions', growth_media, no_growth_media, reactions, added_reactions,
+                                    biomass_eqtn, min_growth_conditions, reaction_source, output, checkpoint,
+                                    processes, strategy, verbose)
+    if resolved is not None:
+        return tp, resolved
     if tp > max_tp:
         best_reactions = copy.deepcopy(reactions)
         max_tp = tp
@@ -302,8 +356,11 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
         if r not in reaction_source:
             reaction_source[r] = 'media_reactions'
 
-    tp = measure_accuracy('Media reactions',  growth_media, no_growth_media, reactions, added_reactions, biomass_eqtn,
-                          min_growth_conditions, reaction_source, output, verbose)
+    tp, resolved = measure_accuracy('Media reactions', growth_media, no_growth_media, reactions, added_reactions,
+                                    biomass_eqtn, min_growth_conditions, reaction_source, output, checkpoint,
+                                    processes, strategy, verbose)
+    if resolved is not None:
+        return tp, resolved
     if tp > max_tp:
         best_reactions = copy.deepcopy(reactions)
         max_tp = tp
@@ -326,8 +383,11 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
                 if r not in reaction_source:
                     reaction_source[r] = f"close genome: {close_genome}"
 
-            tp = measure_accuracy(f"Close genome: {close_genome}",  growth_media, no_growth_media, reactions,
-                                  added_reactions, biomass_eqtn, min_growth_conditions, reaction_source, output, verbose)
+            tp, resolved = measure_accuracy(f"Close genome: {close_genome}", growth_media, no_growth_media, reactions,
+                                            added_reactions, biomass_eqtn, min_growth_conditions,
+                                            reaction_source, output, checkpoint, processes, strategy, verbose)
+            if resolved is not None:
+                return tp, resolved
             if tp > max_tp:
                 best_reactions = copy.deepcopy(reactions)
                 max_tp = tp
@@ -346,8 +406,11 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
         if r not in reaction_source:
             reaction_source[r] = 'subsystem_reactions'
 
-    tp = measure_accuracy('Subsystems',  growth_media, no_growth_media, reactions, added_reactions, biomass_eqtn,
-                          min_growth_conditions, reaction_source, output, verbose)
+    tp, resolved = measure_accuracy('Subsystems', growth_media, no_growth_media, reactions, added_reactions,
+                                    biomass_eqtn, min_growth_conditions, reaction_source, output, checkpoint,
+                                    processes, strategy, verbose)
+    if resolved is not None:
+        return tp, resolved
     if tp > max_tp:
         best_reactions = copy.deepcopy(reactions)
         max_tp = tp
@@ -364,8 +427,11 @@ def multiple_gapfill(reactions, positive, negative, min_growth_conditions, close
         if r not in reaction_source:
             reaction_source[r] = 'orphan_compounds'
 
-    tp = measure_accuracy('Orphan compounds',  growth_media, no_growth_media, reactions, added_reactions, biomass_eqtn,
-                          min_growth_conditions, reaction_source, output, verbose)
+    tp, resolved = measure_accuracy('Orphan compounds', growth_media, no_growth_media, reactions, added_reactions,
+                                    biomass_eqtn, min_growth_conditions, reaction_source, output, checkpoint,
+                                    processes, strategy, verbose)
+    if resolved is not None:
+        return tp, resolved
     if tp > max_tp:
         best_reactions = copy.deepcopy(reactions)
         max_tp = tp
@@ -390,6 +456,11 @@ def gapfill_multiple_media():
                         action='append')
     parser.add_argument('-t', '--type', default='gramnegative',
                         help=f'organism type for the model (currently allowed are {orgtypes}). Default=gramnegative')
+    parser.add_argument('--checkpoint', help='save our progress to this file, and resume from it if it exists')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='number of processes to test the media with. Default: 1')
+    parser.add_argument('--strategy', choices=['bisect', 'ddmin'], default='bisect',
+                        help='how to minimize the gapfilled reactions. Default: bisect')
     parser.add_argument('-v', '--verbose', help='verbose output', action='store_true')
     args = parser.parse_args(sys.argv[2:])
 
@@ -409,8 +480,21 @@ def gapfill_multiple_media():
     reactions = read_reactions(args.reactions, args.verbose)
     log_and_message(f"Found {len(reactions)} reactions", stderr=args.verbose)
 
+    checkpoint = None
+    if args.checkpoint:
+        media = {m: PyFBA.parse.read_media.find_media_file(m, modeldata=modeldata, verbose=args.verbose)
+                 for m in args.positive + args.negative}
+        checkpoint = PyFBA.gapfill.Checkpoint(args.checkpoint, media=media,
+                                              biomass_equation=PyFBA.metabolism.biomass.biomass_equation(args.type),
+                                              verbose=args.verbose)
+
     max_tp, best_reactions = multiple_gapfill(reactions, args.positive, args.negative, args.fraction,
-                                              args.close_genomes, args.type, args.output, args.verbose)
+                                              args.close_genomes, args.type, args.output, checkpoint,
+                                              args.processes, args.strategy, args.verbose)
+
+    if max_tp > args.fraction * len(args.positive):
+        log_and_message(f"We have written {len(best_reactions)} reactions to {args.output}", stderr=args.verbose)
+        return
 
     msg = f"Sorry, we added {len(best_reactions)} reactions, but we can never get more than {max_tp} true positives\n"
     msg += f"We have written those reactions to {args.output}"
@@ -11,7 +11,7 @@ import copy
 from PyFBA import log_and_message
 
 
-def run_eqn(why, md, r2r, med, bme, verbose=False):
+def run_eqn(why, md, r2r, med, bme, checkpoint=None, added_reactions=None, verbose=False):
     """
     Run the fba
     :param why: why are we doing this
@@ -19,13 +19,23 @@ def run_eqn(why, md, r2r, med, bme, verbose=False):
     :param r2r: reactions to run
     :param med: media object
     :param bme: biomass equation
+    :param checkpoint: use the saved result if we have already run these reactions, otherwise save the result
+    (see PyFBA.gapfill.Checkpoint)
+    :param added_reactions: the steps and the reactions they suggested, to save in the checkpoint
     :param verbose: more output
     :type verbose: bool
-    :return: (value, growth)
+    :return: (value, growth). The value is None if we used the saved result
     """
 
+    if checkpoint is not None:
+        growth = checkpoint.result(why, r2r)
+        if growth is not None:
+            log_and_message(f"FBA run {why} from the checkpoint --> Growth: {growth}", stderr=verbose)
+            return None, growth
     status, value, growth = PyFBA.fba.run_fba(md, r2r, med, bme)
     log_and_message(f"FBA run {why} has a biomass flux value of {value} --> Growth: {growth}", stderr=verbose)
+    if checkpoint is not None:
+        checkpoint.record_step(why, r2r, added_reactions or [], growth)
     return value, growth
 
 
@@ -57,7 +67,7 @@ def update_r2r(old, new, why, verbose=False):
 
 
 def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='gramnegative', close_orgs=None,
-                           close_genera=None, verbose=False):
+                           close_genera=None, global_lp=False, checkpoint=None, verbose=False):
     """
     gapfill growth from a set of roles in the genome
     :param close_genera: the list of roles in close genera
@@ -72,6 +82,11 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
     :type media: Set[PyFBA.metabolism.Compound]
     :param orgtype: the organism type for the model
     :type orgtype: str
+    :param global_lp: once we grow, choose the reactions to keep with a single optimization rather than by
+    bisecting (see PyFBA.gapfill.global_gapfill)
+    :type global_lp: bool
+    :param checkpoint: save our progress after every step, and resume from it (see PyFBA.gapfill.Checkpoint)
+    :type checkpoint: PyFBA.gapfill.Checkpoint
     :param verbose: more output
     :type verbose: bool
     :return: a dict of the reactions and what step they were added at
@@ -88,9 +103,10 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
 
     biomass_equation = PyFBA.metabolism.biomass_equation(orgtype)
 
-    run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
-
     added_reactions = []
+    run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, checkpoint=checkpoint,
+            added_reactions=added_reactions, verbose=verbose)
+
     original_reactions_to_run = copy.deepcopy(reactions_to_run)
 
     #############################################################################################
@@ -119,11 +135,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
         modeldata.reactions[r].reset_bounds()
     added_reactions.append(("essential", essential_reactions))
     reactions_to_run = update_r2r(reactions_to_run, essential_reactions, "ESSENTIAL REACTIONS")
-    value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+    value, growth = run_eqn("essential", modeldata, reactions_to_run, media, biomass_equation,
+                            checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                biomass_equation, verbose=verbose)
+                                                biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                       LINKED REACTIONS                                    #
@@ -135,11 +153,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
         modeldata.reactions[r].reset_bounds()
     added_reactions.append(("linked_reactions", linked_reactions))
     reactions_to_run = update_r2r(reactions_to_run, linked_reactions, "LINKED REACTIONS")
-    value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+    value, growth = run_eqn("linked_reactions", modeldata, reactions_to_run, media, biomass_equation,
+                            checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                biomass_equation, verbose=verbose)
+                                                biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                       EC NUMBERS                                          #
@@ -151,11 +171,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
         modeldata.reactions[r].reset_bounds()
     added_reactions.append(("ec_numbers_brief", ecnos))
     reactions_to_run = update_r2r(reactions_to_run, ecnos, "EC Numbers")
-    value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+    value, growth = run_eqn("ec_numbers_brief", modeldata, reactions_to_run, media, biomass_equation,
+                            checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                biomass_equation, verbose=verbose)
+                                                biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                       Media import reactions                              #
@@ -165,11 +187,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
     media_reactions = PyFBA.gapfill.suggest_from_media(modeldata, reactions_to_run, media, verbose=verbose)
     added_reactions.append(("media", media_reactions))
     reactions_to_run = update_r2r(reactions_to_run, media_reactions, "MEDIA REACTIONS")
-    value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+    value, growth = run_eqn("media", modeldata, reactions_to_run, media, biomass_equation,
+                            checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                biomass_equation, verbose=verbose)
+                                                biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                        Other genomes and organisms                        #
@@ -183,11 +207,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
         close_reactions.difference_update(reactions_to_run)
         added_reactions.append(("close genomes ", close_reactions))
         reactions_to_run = update_r2r(reactions_to_run, close_reactions, "CLOSE ORGANISMS")
-        value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+        value, growth = run_eqn("close genomes", modeldata, reactions_to_run, media, biomass_equation,
+                                checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
         if growth:
             return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                    biomass_equation, verbose=verbose)
+                                                    biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                    verbose=verbose)
 
     if close_genera:
         # add reactions from roles in similar genera
@@ -196,11 +222,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
         genus_reactions.difference_update(reactions_to_run)
         added_reactions.append(("other genera", genus_reactions))
         reactions_to_run = update_r2r(reactions_to_run, genus_reactions, "CLOSE GENERA")
-        value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+        value, growth = run_eqn("other genera", modeldata, reactions_to_run, media, biomass_equation,
+                                checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
         if growth:
             return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                    biomass_equation, verbose=verbose)
+                                                    biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                    verbose=verbose)
 
     #############################################################################################
     #                                        Subsystems                                         #
@@ -212,11 +240,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
                                                                           verbose=verbose)
     added_reactions.append(("subsystems", subsystem_reactions))
     reactions_to_run = update_r2r(reactions_to_run, subsystem_reactions, "SUBSYSTEMS")
-    value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+    value, growth = run_eqn("subsystems", modeldata, reactions_to_run, media, biomass_equation,
+                            checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                biomass_equation, verbose=verbose)
+                                                biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                        Orphan compounds                                   #
@@ -226,11 +256,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
     orphan_compounds = PyFBA.gapfill.suggest_by_compound(modeldata, reactions_to_run, 1)
     added_reactions.append(("orphans", orphan_compounds))
     reactions_to_run = update_r2r(reactions_to_run, orphan_compounds, "ORPHANS")
-    value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+    value, growth = run_eqn("orphans", modeldata, reactions_to_run, media, biomass_equation,
+                            checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                biomass_equation, verbose=verbose)
+                                                biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     # ## Revisit EC Numbers
     #
@@ -247,11 +279,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
         modeldata.reactions[r].reset_bounds()
     added_reactions.append(("ec_numbers_full", ecnos))
     reactions_to_run = update_r2r(reactions_to_run, ecnos, "EC Numbers")
-    value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+    value, growth = run_eqn("ec_numbers_full", modeldata, reactions_to_run, media, biomass_equation,
+                            checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                biomass_equation, verbose=verbose)
+                                                biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     # We revist linked reactions once more, because now we have many more reactions in our set to run!
 
@@ -265,11 +299,13 @@ def run_gapfill_from_roles(roles, reactions_to_run, modeldata, media, orgtype='g
         modeldata.reactions[r].reset_bounds()
     added_reactions.append(("linked_reactions_full", linked_reactions))
     reactions_to_run = update_r2r(reactions_to_run, linked_reactions, "LINKED REACTIONS")
-    value, growth = run_eqn("Initial", modeldata, reactions_to_run, media, biomass_equation, verbose=verbose)
+    value, growth = run_eqn("linked_reactions_full", modeldata, reactions_to_run, media, biomass_equation,
+                            checkpoint=checkpoint, added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
-                                                biomass_equation, verbose=verbose)
+                                                biomass_equation, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     log_and_message(f"FATAL: After compiling {len(reactions_to_run)} reactions, we still could not get growth",
                     stderr=True, loglevel='CRITICAL')
@@ -293,6 +329,10 @@ def gapfill_from_roles():
                         help=f'organism type for the model (currently allowed are {orgtypes}). Default=gramnegative')
     parser.add_argument('-c', '--close', help='a file with roles from close organisms')
     parser.add_argument('-g', '--genera', help='a file with roles from similar genera')
+    parser.add_argument('--global_lp', action='store_true',
+                        help='choose the gapfilled reactions with a single optimization rather than by bisection')
+    parser.add_argument('--checkpoint',
+                        help='save the progress to this JSON file after every step, and resume from it if it exists')
     parser.add_argument('-v', '--verbose', help='verbose output', action='store_true')
     args = parser.parse_args(sys.argv[2:])
 
@@ -325,9 +365,16 @@ def gapfill_from_roles():
     reactions_to_run = roles_to_reactions_to_run(roles, args.type, args.verbose)
     media = PyFBA.parse.read_media.find_media_file(args.media, model_data, args.verbose)
 
+    checkpoint = None
+    if args.checkpoint:
+        checkpoint = PyFBA.gapfill.Checkpoint(args.checkpoint, media=media,
+                                              biomass_equation=PyFBA.metabolism.biomass_equation(args.type),
+                                              verbose=args.verbose)
+
     new_reactions = run_gapfill_from_roles(roles=roles, reactions_to_run=reactions_to_run, modeldata=model_data,
                                            media=media, orgtype=args.type, close_orgs=args.close,
-                                           close_genera=args.genera, verbose=args.verbose)
+                                           close_genera=args.genera, global_lp=args.global_lp,
+                                           checkpoint=checkpoint, verbose=args.verbose)
     if new_reactions:
         with open(args.output, 'w') as out:
             for r in new_reactions:
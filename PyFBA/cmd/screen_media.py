@@ -0,0 +1,60 @@
+"""
+Test a set of reactions for growth on many media
+"""
+import argparse
+import contextlib
+import os
+import sys
+
+import PyFBA
+from PyFBA import log_and_message
+
+
+def run_media_screen():
+    """
+    Parse the arguments and test growth on all the media
+    """
+
+    orgtypes = ['gramnegative', 'grampositive', 'microbial', 'mycobacteria', 'plant']
+    parser = argparse.ArgumentParser(description='Run Flux Balance Analysis on a set of reactions on many media')
+    parser.add_argument('-r', '--reactions', help='A list of the reactions in this model, one per line', required=True)
+    parser.add_argument('-m', '--media', help='media names or files to test. Default: all the media', nargs='+')
+    parser.add_argument('-o', '--output', help='file to write the growth table to. Default: stdout')
+    parser.add_argument('-t', '--type', default='gramnegative',
+                        help=f'organism type for the model (currently allowed are {orgtypes}). Default=gramnegative')
+    parser.add_argument('-b', '--biomass', help='biomass equation to use. Default is the same as --type option')
+    parser.add_argument('-p', '--processes', type=int, default=1,
+                        help='number of processes to use. Default: 1')
+    parser.add_argument('-v', '--verbose', help='verbose output', action='store_true')
+    args = parser.parse_args(sys.argv[2:])
+
+    if not os.path.exists(args.reactions):
+        sys.stderr.write(f"FATAL: {args.reactions} does not exist. Please check your files\n")
+        sys.exit(1)
+
+    log_and_message(f"Running PyFBA with the parameters: {sys.argv}\n", quiet=True)
+
+    modeldata = PyFBA.parse.model_seed.parse_model_seed_data(args.type, verbose=args.verbose)
+    rxns = set()
+    with open(args.reactions, 'r') as f:
+        for li in f:
+            r = li.strip()
+            if r in modeldata.reactions:
+                rxns.add(r)
+            else:
+                log_and_message(f'Skipped reaction {r} from {args.reactions} as it is not a known reaction',
+                                stderr=args.verbose)
+
+    if args.biomass:
+        biomass_equation = PyFBA.metabolism.biomass_equation(args.biomass)
+    else:
+        biomass_equation = PyFBA.metabolism.biomass_equation(args.type)
+
+    results = PyFBA.fba.screen_media(modeldata, rxns, args.media, biomass_equation, processes=args.processes,
+                                     verbose=args.verbose)
+
+    with open(args.output, 'w') if args.output else contextlib.nullcontext(sys.stdout) as out:
+        out.write("Media\tBiomass Flux\tGrowth\n")
+        for m in sorted(results):
+            value, growth = results[m]
+            out.write(f"{m}\t{value}\t{growth}\n")
@@ -59,7 +59,7 @@ def run_eqn(why, md, r2r, med, bme, verbose=False):
     return value, growth
 
 
-def compare_media(reactions, positive, negative, model_data, orgtype='gramnegative',  verbose=False):
+def compare_media(reactions, positive, negative, model_data, orgtype='gramnegative', processes=None, verbose=False):
     """
     Iteratively remove reactions until we don't have any more to test
     :param reactions: list of reactins to test
@@ -72,6 +72,8 @@ def compare_media(reactions, positive, negative, model_data, orgtype='gramnegati
     :type model_data: PyFBA.model_seed.ModelData
     :param orgtype: the type of organism
     :type orgtype: str
+    :param processes: the number of processes to use to test the reactions. Default: the number of CPUs
+    :type processes: int
     :param verbose: more output
     :type verbose: bool
     :return: a set of reactions where we grow
@@ -86,18 +88,20 @@ def compare_media(reactions, positive, negative, model_data, orgtype='gramnegati
                         stderr = True)
         return reactions
 
-    num = len(original_reactions)
-    c=0
+    # each reaction is knocked out independently, so we test them in parallel
+    pko = PyFBA.fba.reaction_knockouts(model_data, reactions, positive, biomass_equation, processes=processes,
+                                       verbose=verbose)
+    nko = PyFBA.fba.reaction_knockouts(model_data, reactions, negative, biomass_equation, processes=processes,
+                                       verbose=verbose)
+
     both = set()
     nonly = set()
     ponly = set()
     neither = set()
     log_and_message("REACTION ID\tPositive Media\tNegative Media", stderr = True)
     for r in original_reactions:
-        reactions.remove(r)
-        c += 1
-        pvalue, pgrowth = run_eqn("Initial", model_data, reactions, positive, biomass_equation, verbose=verbose)
-        nvalue, ngrowth = run_eqn("Initial", model_data, reactions, negative, biomass_equation, verbose=verbose)
+        pvalue, pgrowth = pko[r]
+        nvalue, ngrowth = nko[r]
         log_and_message(f"{r}\t{pgrowth}\t{ngrowth}", stderr = True)
         if pgrowth and ngrowth:
             both.add(r)
@@ -107,7 +111,6 @@ def compare_media(reactions, positive, negative, model_data, orgtype='gramnegati
             nonly.add(r)
         else:
             neither.add(r)
-        reactions.add(r)
 
     newreactions = both.union(ponly)
     pvalue, pgrowth = run_eqn("Initial", model_data, newreactions, positive, biomass_equation, verbose=verbose)
@@ -129,6 +132,8 @@ def compare_two_media():
     parser.add_argument('-n', '--negative', help='media name where we should not grow', required=True)
     parser.add_argument('-t', '--type', default='gramnegative',
                         help=f'organism type for the model (currently allowed are {orgtypes}). Default=gramnegative')
+    parser.add_argument('--processes', type=int,
+                        help='number of processes to use to test the reactions. Default: the number of CPUs')
     parser.add_argument('-v', '--verbose', help='verbose output', action='store_true')
     args = parser.parse_args(sys.argv[2:])
 
@@ -150,7 +155,7 @@ def compare_two_media():
     positive = PyFBA.parse.read_media.find_media_file(args.positive, model_data, args.verbose)
     negative = PyFBA.parse.read_media.find_media_file(args.negative, model_data, args.verbose)
 
-    rxn = compare_media(reactions, positive, negative, model_data, args.type, args.verbose)
+    rxn = compare_media(reactions, positive, negative, model_data, args.type, args.processes, args.verbose)
     with open(args.output, 'w') as out:
         for r in rxn:
             out.write(f"{r}\n")
@@ -1,8 +1,27 @@
-from .external_reactions import uptake_and_secretion_reactions, remove_uptake_and_secretion_reactions
-from .create_stoichiometric_matrix import create_stoichiometric_matrix
-from .bounds import reaction_bounds, compound_bounds
-from .run_fba import run_fba
-from .fluxes import reaction_fluxes
+from .external_reactions import uptake_and_secretion_reactions, remove_uptake_and_secretion_reactions, \
+    exchange_reaction, exchange_reaction_id
+from .create_stoichiometric_matrix import create_stoichiometric_matrix, compile_stoichiometric_matrix, \
+    load_stoichiometric_matrix
+from .bounds import reaction_bounds, calculate_reaction_bounds, compound_bounds, direction_bounds
+from .compiled_network import CompiledNetwork
+from .presolve import presolve, blocked_reactions
+from .compression import compress
+from .stoichiometry_cache import StoichiometryCache, default_cache
+from .parsimonious import parsimonious_fba, split_reversible, REVERSE_SUFFIX
+from .run_fba import run_fba, feasible_growth, GROWTH_THRESHOLD, GROWTH_TOLERANCE
+from .growth_oracle import GrowthOracle, growth_oracle, clear_growth_oracles
+from .fluxes import reaction_fluxes, FluxVector
+from .media_bounds import MediaBounds
+from .session import FBASession
+from .knockouts import reaction_knockouts
+from .flux_variability import flux_variability, biomass_minimum, OPTIMUM_TOLERANCE
+from .screen_media import screen_media, grow_on_media
 
-__all__ = ['uptake_and_secretion_reactions', 'remove_uptake_and_secretion_reactions', 'create_stoichiometric_matrix',
-           'reaction_bounds', 'compound_bounds', 'run_fba', 'reaction_fluxes']
+__all__ = ['uptake_and_secretion_reactions', 'remove_uptake_and_secretion_reactions', 'exchange_reaction',
+           'exchange_reaction_id', 'create_stoichiometric_matrix', 'compile_stoichiometric_matrix',
+           'load_stoichiometric_matrix', 'CompiledNetwork', 'presolve', 'blocked_reactions', 'compress',
+           'StoichiometryCache', 'default_cache', 'reaction_bounds', 'calculate_reaction_bounds', 'compound_bounds',
+           'direction_bounds', 'parsimonious_fba', 'split_reversible', 'REVERSE_SUFFIX', 'run_fba',
+           'feasible_growth', 'GROWTH_THRESHOLD', 'GROWTH_TOLERANCE', 'GrowthOracle', 'growth_oracle',
+           'clear_growth_oracles', 'reaction_fluxes', 'FluxVector', 'MediaBounds', 'FBASession', 'reaction_knockouts', 'flux_variability',
+           'biomass_minimum', 'OPTIMUM_TOLERANCE', 'screen_media', 'grow_on_media']
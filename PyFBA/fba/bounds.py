@@ -3,12 +3,17 @@ import sys
 from PyFBA import lp, log_and_message
 
 
-def reaction_bounds(reactions, reactions_with_upsr, media, lower=-1000.0, mid=0.0, upper=1000.0, verbose=False):
+def reaction_bounds(reactions, reactions_with_upsr, media, lower=-1000.0, mid=0.0, upper=1000.0, problem=None,
+                    uptake_secretion=None, verbose=False):
     """
     Set the bounds for each reaction. We set the reactions to run between
     either lower/mid, mid/upper, or lower/upper depending on whether the
     reaction runs <=, =>, or <=> respectively.
 
+    The bounds are stored on the reactions the first time we calculate them, so subsequent calls
+    just reuse them, and the solver only updates the columns whose bounds have changed since the
+    last time they were set.
+
     :param reactions: The dict of all reactions we know about
     :type reactions: dict of metabolism.Reaction
     :param reactions_with_upsr: The sorted list of reactions to run
@@ -21,6 +26,62 @@ def reaction_bounds(reactions, reactions_with_upsr, media, lower=-1000.0, mid=0.
     :type mid: float
     :param upper: The default upper bound
     :type upper: float
+    :param problem: the linear programming problem to set the bounds on. Default: PyFBA.lp.default_problem
+    :type problem: PyFBA.lp.LPProblem
+    :param uptake_secretion: the uptake and secretion reactions, if they are not in reactions. The uptake and
+    secretion reactions are not in modeldata.reactions, so you need to provide these (see
+    PyFBA.fba.uptake_and_secretion_reactions)
+    :type uptake_secretion: dict[str, PyFBA.metabolism.Reaction]
+    :return: A dict of the reaction ID and the tuple of bounds
+    :rtype: dict
+    """
+
+    rbvals = calculate_reaction_bounds(reactions, reactions_with_upsr, media, lower, mid, upper,
+                                       uptake_secretion=uptake_secretion, verbose=verbose)
+    rbounds = [rbvals[r] for r in reactions_with_upsr]
+
+    if problem is None:
+        problem = lp.get_default_problem()
+    problem.col_bounds(rbounds)
+    return rbvals
+
+
+def direction_bounds(direction, lower=-1000.0, mid=0.0, upper=1000.0):
+    """
+    The bounds of a reaction that runs in this direction, if we do not already know its bounds
+
+    :param direction: the direction of the reaction (<, =, or >)
+    :type direction: str
+    :param lower: The default lower bound
+    :type lower: float
+    :param mid: The default mid value (typically 0)
+    :type mid: float
+    :param upper: The default upper bound
+    :type upper: float
+    :return: the lower and upper bounds
+    :rtype: (float, float)
+    """
+    if direction == "=":
+        # This is what I think it should be:
+        return lower, upper
+        # return mid, upper
+    elif direction == ">":
+        # This is what I think it should be:
+        return mid, upper
+        # return lower, upper
+    elif direction == "<":
+        # This is what I think it should be:
+        # return lower, mid
+        return lower, upper
+    return mid, upper
+
+
+def calculate_reaction_bounds(reactions, reactions_with_upsr, media, lower=-1000.0, mid=0.0, upper=1000.0,
+                              uptake_secretion=None, verbose=False):
+    """
+    Calculate the bounds for each reaction without setting them in the solver. See reaction_bounds for
+    the parameters. We raise a ValueError if a reaction is not in reactions or uptake_secretion.
+
     :return: A dict of the reaction ID and the tuple of bounds
     :rtype: dict
     """
@@ -34,15 +95,17 @@ def reaction_bounds(reactions, reactions_with_upsr, media, lower=-1000.0, mid=0.
             continue
 
         # if we already know the bounds, eg from an SBML file or from our uptake/secretion reactions
+        if uptake_secretion and r in uptake_secretion:
+            rbvals[r] = (uptake_secretion[r].lower_bound, uptake_secretion[r].upper_bound)
+            continue
+        if r not in reactions:
+            raise ValueError(f"{r} is not in reactions. If it is an uptake and secretion reaction, please provide " +
+                             "them as uptake_secretion (see PyFBA.fba.uptake_and_secretion_reactions)")
         if reactions[r].lower_bound != None and reactions[r].upper_bound != None:
             rbvals[r] = (reactions[r].lower_bound, reactions[r].upper_bound)
             continue
 
-        if r in reactions:
-            direction = reactions[r].direction
-        else:
-            sys.stderr.write("Did not find {} in reactions\n".format(r))
-            direction = "="
+        direction = reactions[r].direction
 
         """
         RAE 16/6/21
@@ -79,36 +142,22 @@ def reaction_bounds(reactions, reactions_with_upsr, media, lower=-1000.0, mid=0.
                 other_uptake_secretion_count += 1
             continue
 
-        if direction == "=":
-            # This is what I think it should be:
-            rbvals[r] = (lower, upper)
-            # rbvals[r] = (mid, upper)
-        elif direction == ">":
-            # This is what I think it should be:
-            rbvals[r] = (mid, upper)
-            # rbvals[r] =  (lower, upper)
-        elif direction == "<":
-            # This is what I think it should be:
-            # rbvals[r] = (lower, mid)
-            rbvals[r] = (lower, upper)
-        else:
-            sys.stderr.write("DO NOT UNDERSTAND DIRECTION " + direction + " for " + r + "\n")
-            rbvals[r] = (mid, upper)
+        if direction not in ("=", ">", "<"):
+            sys.stderr.write("DO NOT UNDERSTAND DIRECTION " + str(direction) + " for " + r + "\n")
+        rbvals[r] = direction_bounds(direction, lower, mid, upper)
 
     if verbose:
         sys.stderr.write("In parsing the bounds we found {} media uptake ".format(media_uptake_secretion_count) +
                          "and secretion reactions and {} other u/s reactions\n".format(other_uptake_secretion_count))
 
-    rbounds = [rbvals[r] for r in reactions_with_upsr]
     for r in reactions_with_upsr:
         if r in reactions:
             reactions[r].lower_bound, reactions[r].upper_bound = rbvals[r]
 
-    lp.col_bounds(rbounds)
     return rbvals
 
 
-def compound_bounds(cp, lower=0, upper=0):
+def compound_bounds(cp, lower=0, upper=0, problem=None):
     """
     Impose constraints on the compounds. These constraints limit what
     the variation of each compound can be and is essentially 0 for
@@ -121,10 +170,13 @@ def compound_bounds(cp, lower=0, upper=0):
         cp: the list of compound ids
         lower: the default lower value
         upper: the default upper value
+        problem: the linear programming problem to set the bounds on. Default: PyFBA.lp.default_problem
     """
 
     cbounds = [(lower, upper) for c in cp]
     cbvals = {c: (lower, upper) for c in cp}
 
-    lp.row_bounds(cbounds)
+    if problem is None:
+        problem = lp.get_default_problem()
+    problem.row_bounds(cbounds)
     return cbvals
@@ -0,0 +1,199 @@
+"""
+A compiled network: a set of reactions, a media, and a biomass equation that have been validated and
+indexed once, and can then be loaded into a solver as many times as we need.
+
+The network only holds numbers (the non-zero elements of the stoichiometric matrix, the bounds, and the
+objective) and the names of the rows and columns, so it is cheap to keep around and can be pickled and
+sent to worker processes, which then do not need to build the stoichiometric matrix again.
+"""
+
+import numpy as np
+
+import PyFBA
+from PyFBA import log_and_message
+
+# approximate sizes in bytes of the objects that are not numpy arrays. A name is about 80 bytes,
+# and an uptake and secretion reaction with its compounds is about 2kb
+NAME_BYTES = 80
+REACTION_BYTES = 2048
+
+
+class CompiledNetwork:
+    """
+    A stoichiometric matrix with its bounds and objective, ready to load into the solver.
+
+    :ivar compounds: the compounds (rows) of the matrix
+    :ivar reactions: the reactions (columns) of the matrix, including uptake/secretion and biomass
+    :ivar uptake_secretion: the uptake and secretion reactions that were added to the model
+    :ivar compound_index: a dict of compound and its row
+    :ivar reaction_index: a dict of reaction id and its column
+    :ivar rows: the row of each non-zero element
+    :ivar cols: the column of each non-zero element
+    :ivar values: the value of each non-zero element
+    :ivar lower: the default lower bound of each reaction
+    :ivar upper: the default upper bound of each reaction
+    :ivar compound_lower: the lower bound of each compound
+    :ivar compound_upper: the upper bound of each compound
+    :ivar objective: the objective coefficient of each reaction. The biomass equation is the last column
+    :ivar media: the media compounds
+    :ivar biomass_equation: the biomass equation
+    :ivar removed: the reactions that were removed from the network by PyFBA.fba.presolve
+    :ivar presolved: the presolved network, once we have calculated it (see presolve)
+    :ivar coupled: a dict of reaction id (column) and the reactions that were merged into it by
+    PyFBA.fba.compress, with the factor to multiply the flux of the column by to get their flux
+    :ivar compressed: the compressed network, once we have calculated it (see compress)
+    :ivar nbytes: the approximate size of this network in memory
+    """
+
+    def __init__(self, data, compounds, reactions, uptake_secretion, reaction_bounds, compound_bounds, media=None,
+                 biomass_equation=None):
+        """
+        Create a compiled network from a compiled stoichiometric matrix and its bounds
+
+        :param data: the (row, column, value) triplets of the non-zero elements
+        :type data: list[(int, int, float)]
+        :param compounds: the compounds (rows) of the matrix
+        :type compounds: list[PyFBA.metabolism.CompoundWithLocation]
+        :param reactions: the reactions (columns) of the matrix. The biomass equation must be the last reaction
+        :type reactions: list[str]
+        :param uptake_secretion: the uptake and secretion reactions
+        :type uptake_secretion: dict[str, PyFBA.metabolism.Reaction]
+        :param reaction_bounds: a dict of reaction id and its bounds
+        :type reaction_bounds: dict[str, (float, float)]
+        :param compound_bounds: the bounds of each compound (row)
+        :type compound_bounds: list[(float, float)]
+        :param media: the media compounds
+        :type media: set[PyFBA.metabolism.CompoundWithLocation]
+        :param biomass_equation: the biomass equation
+        :type biomass_equation: PyFBA.metabolism.Reaction
+        """
+        self.compounds = list(compounds)
+        self.reactions = list(reactions)
+        self.uptake_secretion = uptake_secretion
+        self.media = media
+        self.biomass_equation = biomass_equation
+        self.removed = []
+        self.presolved = None
+        self.coupled = {}
+        self.compressed = None
+        self.compound_index = {c: i for i, c in enumerate(self.compounds)}
+        self.reaction_index = {r: j for j, r in enumerate(self.reactions)}
+
+        self.rows = np.fromiter((i for i, j, v in data), dtype=np.int32, count=len(data))
+        self.cols = np.fromiter((j for i, j, v in data), dtype=np.int32, count=len(data))
+        self.values = np.fromiter((v for i, j, v in data), dtype=float, count=len(data))
+
+        self.lower = np.array([reaction_bounds[r][0] for r in self.reactions], dtype=float)
+        self.upper = np.array([reaction_bounds[r][1] for r in self.reactions], dtype=float)
+        self.compound_lower = np.array([b[0] for b in compound_bounds], dtype=float)
+        self.compound_upper = np.array([b[1] for b in compound_bounds], dtype=float)
+
+        self.objective = np.zeros(len(self.reactions))
+        self.objective[-1] = 1
+
+        self.nbytes = (self.rows.nbytes + self.cols.nbytes + self.values.nbytes + self.lower.nbytes +
+                       self.upper.nbytes + self.compound_lower.nbytes + self.compound_upper.nbytes +
+                       self.objective.nbytes + (len(self.compounds) + len(self.reactions)) * NAME_BYTES +
+                       len(uptake_secretion) * REACTION_BYTES)
+
+    @classmethod
+    def compile(cls, modeldata, reactions, media, biomass_equation, uptake_secretion=None, verbose=False):
+        """
+        Validate and index the reactions, media, and biomass equation
+
+        :param modeldata: the model seed object that includes compounds and reactions
+        :type modeldata: PyFBA.model_seed.ModelData
+        :param reactions: the reactions to run
+        :type reactions: set[str]
+        :param media: the media compounds
+        :type media: set[PyFBA.metabolism.CompoundWithLocation]
+        :param biomass_equation: the biomass equation
+        :type biomass_equation: PyFBA.metabolism.Reaction
+        :param uptake_secretion: An optional hash of uptake and secretion reactions. Calculated if not provided.
+        :type uptake_secretion: dict[str, PyFBA.metabolism.Reaction]
+        :param verbose: more output
+        :type verbose: bool
+        :return: the compiled network
+        :rtype: CompiledNetwork
+        """
+
+        cp, rc, upsr, data = PyFBA.fba.compile_stoichiometric_matrix(reactions, modeldata, media, biomass_equation,
+                                                                     uptake_secretion, verbose=verbose)
+        rbvals = PyFBA.fba.calculate_reaction_bounds(modeldata.reactions, rc, media, uptake_secretion=upsr,
+                                                     verbose=verbose)
+        log_and_message(f"Compiled a network with {len(cp)} compounds and {len(rc)} reactions", stderr=verbose)
+        return cls(data, cp, rc, upsr, rbvals, [(0, 0) for c in cp], media, biomass_equation)
+
+    def presolve(self, verbose=False):
+        """
+        The network without the reactions that can not carry any flux. This is only calculated once.
+
+        :param verbose: more output
+        :type verbose: bool
+        :return: the presolved network
+        :rtype: CompiledNetwork
+        """
+        if self.presolved is None:
+            self.presolved = PyFBA.fba.presolve(self, verbose=verbose)
+        return self.presolved
+
+    def compress(self, verbose=False):
+        """
+        The network with the fully coupled reactions merged into single columns. This is only calculated once.
+
+        :param verbose: more output
+        :type verbose: bool
+        :return: the compressed network
+        :rtype: CompiledNetwork
+        """
+        if self.compressed is None:
+            self.compressed = PyFBA.fba.compress(self, verbose=verbose)
+        return self.compressed
+
+    @property
+    def data(self):
+        """
+        The (row, column, value) triplets of the non-zero elements
+
+        :rtype: list[(int, int, float)]
+        """
+        return list(zip(self.rows.tolist(), self.cols.tolist(), self.values.tolist()))
+
+    @property
+    def reaction_bounds(self):
+        """
+        The default bounds of each reaction
+
+        :rtype: dict[str, (float, float)]
+        """
+        return {r: (lb, ub) for r, lb, ub in zip(self.reactions, self.lower.tolist(), self.upper.tolist())}
+
+    def load(self, problem=None, split=False, verbose=False):
+        """
+        Load the matrix, the bounds, and the objective into the solver
+
+        :param problem: the linear programming problem to load the network into. Default: PyFBA.lp.default_problem
+        :type problem: PyFBA.lp.LPProblem
+        :param split: split the reversible reactions into a forward and a reverse column, so that we can run
+        PyFBA.fba.parsimonious_fba on the problem. The reverse columns are after all the other columns
+        :type split: bool
+        :param verbose: more output
+        :type verbose: bool
+        """
+        if problem is None:
+            problem = PyFBA.lp.get_default_problem()
+        if split:
+            rows, cols, values, lower, upper, reversible = PyFBA.fba.split_reversible(self)
+            problem.load_sparse(list(zip(rows.tolist(), cols.tolist(), values.tolist())), len(self.compounds),
+                                len(lower), [str(c) for c in self.compounds],
+                                self.reactions + [self.reactions[j] + PyFBA.fba.REVERSE_SUFFIX for j in reversible],
+                                verbose=verbose)
+            objective = np.zeros(len(lower))
+            objective[:len(self.reactions)] = self.objective
+        else:
+            lower, upper, objective = self.lower, self.upper, self.objective
+            problem.load_sparse(self.data, len(self.compounds), len(self.reactions), [str(c) for c in self.compounds],
+                                self.reactions, verbose=verbose)
+        problem.objective_coefficients(objective.tolist())
+        problem.col_bounds(list(zip(lower.tolist(), upper.tolist())))
+        problem.row_bounds(list(zip(self.compound_lower.tolist(), self.compound_upper.tolist())))
@@ -0,0 +1,102 @@
+"""
+Merge reactions whose fluxes are fully coupled into a single column of the LP.
+
+If a compound is at steady state and is only in two reactions, the flux through one of them is always
+proportional to the flux through the other: s1 * v1 + s2 * v2 = 0, so v2 = -(s1 / s2) * v1. We merge the
+second reaction into the first, so that the column for the first reaction is the sum of both columns,
+the compound no longer has any non-zero elements, and the bounds of the merged column are the
+intersection of the bounds of both reactions. We repeat this until no more reactions can be merged, which
+collapses the unbranched pathways in the model into single columns.
+
+The merged reactions are in network.coupled, and their fluxes are calculated from the flux of the
+column they were merged into (see PyFBA.fba.reaction_fluxes). The uptake and secretion reactions and the
+biomass equation are never merged, so that we can still change the media and the objective.
+"""
+
+import PyFBA
+from PyFBA import log_and_message
+
+
+def compress(network, verbose=False):
+    """
+    Merge the fully coupled reactions in the network
+
+    :param network: the compiled network. This is usually presolved first (see PyFBA.fba.presolve)
+    :type network: PyFBA.fba.CompiledNetwork
+    :param verbose: more output
+    :type verbose: bool
+    :return: the compressed network
+    :rtype: PyFBA.fba.CompiledNetwork
+    """
+
+    ncols = len(network.reactions)
+    columns = [{} for r in network.reactions]
+    compound_columns = [set() for c in network.compounds]
+    for i, j, v in zip(network.rows.tolist(), network.cols.tolist(), network.values.tolist()):
+        if v:
+            columns[j][i] = v
+            compound_columns[i].add(j)
+
+    lower = network.lower.tolist()
+    upper = network.upper.tolist()
+    steady = [lb == 0 and ub == 0 for lb, ub in zip(network.compound_lower.tolist(), network.compound_upper.tolist())]
+    # the flux of each reaction is the flux of the column it is in times its factor
+    members = {j: [(r, 1.0)] + network.coupled.get(r, []) for j, r in enumerate(network.reactions)}
+    protected = {network.reaction_index[r] for r in network.uptake_secretion}
+    protected.add(ncols - 1)
+
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(network.compounds)):
+            if not steady[i] or len(compound_columns[i]) != 2:
+                continue
+            j, k = sorted(compound_columns[i])
+            if j in protected or k in protected:
+                continue
+
+            # v_k = factor * v_j, so the bounds of k limit the bounds of j
+            factor = -columns[j][i] / columns[k][i]
+            if factor > 0:
+                low, high = lower[k] / factor, upper[k] / factor
+            else:
+                low, high = upper[k] / factor, lower[k] / factor
+            low, high = max(lower[j], low), min(upper[j], high)
+            if low > high:
+                # these reactions can not carry any flux. That is a job for presolve
+                continue
+
+            for row, v in columns[k].items():
+                compound_columns[row].discard(k)
+                value = columns[j].get(row, 0) + factor * v
+                if abs(value) < 1e-9:
+                    columns[j].pop(row, None)
+                    compound_columns[row].discard(j)
+                else:
+                    columns[j][row] = value
+                    compound_columns[row].add(j)
+            columns[k] = {}
+            lower[j], upper[j] = low, high
+            members[j].extend((r, factor * f) for r, f in members.pop(k))
+            merged = True
+
+    keep_cols = sorted(members)
+    col_map = {j: n for n, j in enumerate(keep_cols)}
+    keep_rows = sorted({i for j in keep_cols for i in columns[j]})
+    row_map = {i: n for n, i in enumerate(keep_rows)}
+
+    data = [(row_map[i], col_map[j], v) for j in keep_cols for i, v in columns[j].items()]
+    reactions = [network.reactions[j] for j in keep_cols]
+    reaction_bounds = {network.reactions[j]: (lower[j], upper[j]) for j in keep_cols}
+    compressed = PyFBA.fba.CompiledNetwork(data, [network.compounds[i] for i in keep_rows], reactions,
+                                           network.uptake_secretion, reaction_bounds,
+                                           [(network.compound_lower.item(i), network.compound_upper.item(i))
+                                            for i in keep_rows],
+                                           network.media, network.biomass_equation)
+    compressed.removed = network.removed
+    compressed.coupled = {network.reactions[j]: members[j][1:] for j in keep_cols if len(members[j]) > 1}
+    compressed.compressed = compressed
+
+    log_and_message(f"Compression merged {ncols - len(keep_cols)} coupled reactions and removed " +
+                    f"{len(network.compounds) - len(keep_rows)} compounds", stderr=verbose)
+    return compressed
@@ -1,18 +1,14 @@
-import sys
+import numpy as np
 import PyFBA
-from PyFBA import lp, log_and_message
+from PyFBA import log_and_message
 
 
-def create_stoichiometric_matrix(reactions_to_run, modeldata, media, biomass_equation,
-                                 uptake_secretion=None, verbose=False):
+def compile_stoichiometric_matrix(reactions_to_run, modeldata, media, biomass_equation, uptake_secretion=None,
+                                  verbose=False):
     """Given the reactions data and a list of RIDs to include, build a
-    stoichiometric matrix and load that into the linear solver.
+    stoichiometric matrix as (row, column, value) triplets of the non-zero elements.
 
-    The uptake and secretion reactions (sometimes called boundary reactions) are reactions that allow
-    compounds to flow into the media and secreted compounds away from the cell. You can either provide these (e.g. if
-    you are parsing an XML (SBML) file, or we will calculate them for you based on your media and reactions.
-
-    We also take this opportunity to set the objective function (as it is a member of the SM).
+    This does not load the matrix into the linear solver. See create_stoichiometric_matrix.
 
     :param reactions_to_run: just the reaction ids that we want to include in our model
     :type reactions_to_run: Set[str]
@@ -26,10 +22,9 @@ def create_stoichiometric_matrix(reactions_to_run, modeldata, media, biomass_equ
     :type uptake_secretion: Dict[str, PyFBA.metabolism.Reaction]
     :param verbose: print more information
     :type verbose: bool
-    :returns: Sorted lists of all the compounds and reactions in the model, and a revised reactions dict that includes
-    the uptake and secretion reactions
-    :rtype: list, list, dict
-
+    :returns: Sorted lists of all the compounds and reactions in the model, a dict of the uptake and secretion
+    reactions, and the (row, column, value) triplets of the matrix
+    :rtype: list, list, dict, list
     """
 
     if not isinstance(modeldata, PyFBA.model_seed.ModelData):
@@ -57,12 +52,19 @@ def create_stoichiometric_matrix(reactions_to_run, modeldata, media, biomass_equ
         reaction_cpds.add(c)
         sm[c] = {}
 
-    # iterate through the reactions
+    # the reactions that we know about are a slice of the columns of the universe matrix. We only
+    # need to add the other reactions (e.g. from an SBML file) one compound at a time
+    universe, universe_compounds, universe_index = modeldata.universe_matrix()
+    in_universe = []
     for r in reactions_to_run:
         if 'biomass' in r.lower():
             log_and_message(f"Found a potential biomass equation in reactions to run ({r}). Skipped", stderr=verbose)
             continue
 
+        if r in universe_index:
+            in_universe.append(r)
+            continue
+
         for c in modeldata.reactions[r].left_compounds:
             reaction_cpds.add(c)
             if c not in sm:
@@ -81,6 +83,11 @@ def create_stoichiometric_matrix(reactions_to_run, modeldata, media, biomass_equ
                                 loglevel="WARNING")
             sm[c][r] = modeldata.reactions[r].get_right_compound_abundance(c)
 
+    universe_slice = universe[:, [universe_index[r] for r in in_universe]].tocoo()
+    universe_rows = np.unique(universe_slice.row)
+    for i in universe_rows:
+        reaction_cpds.add(universe_compounds[i])
+
     for c in biomass_equation.left_compounds:
         if not modeldata.get_compound_by_name(c.name):
             # compounds.add(c)
@@ -112,11 +119,12 @@ def create_stoichiometric_matrix(reactions_to_run, modeldata, media, biomass_equ
     #
     # When we set the reaction bounds we determine which things are in the media unless they are provided for you
 
+    #
+    # The uptake/secretion reactions are cached in modeldata.exchange_reactions and are not added to modeldata.reactions
+
     if not uptake_secretion:
-        uptake_secretion = PyFBA.fba.uptake_and_secretion_reactions(reaction_cpds, media)
-    modeldata.reactions.update(uptake_secretion)
+        uptake_secretion = PyFBA.fba.uptake_and_secretion_reactions(reaction_cpds, media, modeldata)
     for r in uptake_secretion:
-        # modeldata.reactions[uptake_secretion[r].id] = uptake_secretion[r]
         for c in uptake_secretion[r].left_compounds:
             reaction_cpds.add(c)
             if c not in sm:
@@ -134,25 +142,85 @@ def create_stoichiometric_matrix(reactions_to_run, modeldata, media, biomass_equ
     # it is important that we add these at the end
     rc.append("BIOMASS_EQN")
 
-    # here we create the matrix from our sm hash
-    data = []
+    # here we create the sparse matrix from the slice of the universe matrix and our sm hash.
+    # We only pass the non-zero (row, column, value) triplets to the solver
+    rc_index = {r: j for j, r in enumerate(rc)}
+    cp_index = {c: i for i, c in enumerate(cp)}
+    row_map = np.zeros(len(universe_compounds), dtype=int)
+    row_map[universe_rows] = [cp_index[universe_compounds[i]] for i in universe_rows]
+    col_map = np.array([rc_index[r] for r in in_universe], dtype=int)
+    nonzero = universe_slice.data != 0
+    data = list(zip(row_map[universe_slice.row[nonzero]].tolist(), col_map[universe_slice.col[nonzero]].tolist(),
+                    universe_slice.data[nonzero].tolist()))
     for i, j in enumerate(cp):
-        if j not in sm:
-            sys.exit("Error while parsing: no " + j + " in sm")
-        data.append([])
-        for c in rc:
-            if c in sm[j]:
-                data[i].append(sm[j][c])
-            else:
-                data[i].append(0.0)
+        for r, v in sm.get(j, {}).items():
+            if v:
+                data.append((i, rc_index[r], v))
+
+    return cp, rc, uptake_secretion, data
+
+
+def create_stoichiometric_matrix(reactions_to_run, modeldata, media, biomass_equation,
+                                 uptake_secretion=None, problem=None, verbose=False):
+    """Given the reactions data and a list of RIDs to include, build a
+    stoichiometric matrix and load that into the linear solver.
+
+    The uptake and secretion reactions (sometimes called boundary reactions) are reactions that allow
+    compounds to flow into the media and secreted compounds away from the cell. You can either provide these (e.g. if
+    you are parsing an XML (SBML) file, or we will calculate them for you based on your media and reactions.
+
+    We also take this opportunity to set the objective function (as it is a member of the SM).
+
+    :param reactions_to_run: just the reaction ids that we want to include in our model
+    :type reactions_to_run: Set[str]
+    :param modeldata: the model seed object that includes compounds and reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param media: a set of compounds that would make up the media
+    :type media: set[PyFBA.metabolism.CompoundWithLocation]
+    :param biomass_equation: the biomass_equation equation as a Reaction object
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param uptake_secretion: An optional hash of uptake and secretion reactions that should be added to the model
+    :type uptake_secretion: Dict[str, PyFBA.metabolism.Reaction]
+    :param problem: the linear programming problem to load the matrix into. Default: PyFBA.lp.default_problem
+    :type problem: PyFBA.lp.LPProblem
+    :param verbose: print more information
+    :type verbose: bool
+    :returns: Sorted lists of all the compounds and reactions in the model, and a dict of the uptake and secretion
+    reactions
+    :rtype: list, list, dict
+
+    """
+    cp, rc, uptake_secretion, data = compile_stoichiometric_matrix(reactions_to_run, modeldata, media,
+                                                                   biomass_equation, uptake_secretion, verbose=verbose)
+
+    load_stoichiometric_matrix(cp, rc, data, problem=problem, verbose=verbose)
+    return cp, rc, uptake_secretion
+
+
+def load_stoichiometric_matrix(cp, rc, data, problem=None, verbose=False):
+    """
+    Load a compiled stoichiometric matrix into the linear solver and set the objective function.
+
+    :param cp: the compounds (rows) of the matrix
+    :type cp: list
+    :param rc: the reactions (columns) of the matrix. The biomass equation must be the last reaction
+    :type rc: list
+    :param data: the (row, column, value) triplets of the non-zero elements
+    :type data: list of (int, int, float)
+    :param problem: the linear programming problem to load the matrix into. Default: PyFBA.lp.default_problem
+    :type problem: PyFBA.lp.LPProblem
+    :param verbose: print more information
+    :type verbose: bool
+    """
 
     # load the data into the model
-    PyFBA.lp.load(data, [str(c) for c in cp], [str(r) for r in rc], verbose=verbose)
+    if problem is None:
+        problem = PyFBA.lp.get_default_problem()
+    problem.load_sparse(data, len(cp), len(rc), [str(c) for c in cp], [str(r) for r in rc], verbose=verbose)
 
     # now set the objective function.It is the biomass_equation
     # equation which is the last reaction in the network
     ob = [0.0 for r in rc]
     ob[-1] = 1
 
-    PyFBA.lp.objective_coefficients(ob)
-    return cp, rc, uptake_secretion
+    problem.objective_coefficients(ob)
@@ -1,9 +1,56 @@
 import copy
+
 import PyFBA
-from PyFBA import log_and_message
 
 
-def uptake_and_secretion_reactions(model_compounds, media):
+def exchange_reaction_id(compound):
+    """
+    The id of the uptake and secretion reaction for a compound. This is similar to the name used in the
+    model seed, e.g. EX_cpd00027_e
+
+    :param compound: the external compound
+    :type compound: PyFBA.metabolism.CompoundWithLocation
+    :return: the reaction id
+    :rtype: str
+    """
+    return f"EX_{compound.id or compound.name}_{compound.location}"
+
+
+def exchange_reaction(compound):
+    """
+    Create an uptake and secretion reaction for a compound. This is an endless reaction that allows the
+    compound to be taken up and/or secreted without affecting the rest of the stoichiometric matrix.
+
+    The compound is not changed, and the reaction does not have any bounds. These are set by
+    uptake_and_secretion_reactions depending on the media.
+
+    :param compound: the external compound
+    :type compound: PyFBA.metabolism.CompoundWithLocation
+    :return: the uptake and secretion reaction
+    :rtype: PyFBA.metabolism.Reaction
+    """
+
+    # we need to add a new compound like this with a false location
+    # The uptake and secretion compounds typically have reaction bounds that allow them to be consumed
+    # (i.e. diffuse away from the cell) but not produced. However, our media components can also increase
+    # in concentration (i.e. diffuse to the cell) and thus the bounds are set higher. Whenever you change the
+    # growth media, you also need to adjust the reaction bounds to ensure that the media can be consumed!
+    # the b is for boundary and is secretion away from the cell
+    boundary = PyFBA.metabolism.CompoundWithLocation(compound.id, compound.name, 'b')
+    boundary.uptake_secretion = True
+    us_reaction_id = exchange_reaction_id(compound)
+    us_reaction = PyFBA.metabolism.Reaction(us_reaction_id, f"UPTAKE_SECRETION_REACTION {compound}")
+    us_reaction.equation = '(1) + ' + str(compound) + " <=> (1) + " + str(boundary)
+    us_reaction.add_left_compounds({compound})
+    us_reaction.set_left_compound_abundance(compound, 1)
+    us_reaction.add_right_compounds({boundary})
+    us_reaction.set_right_compound_abundance(boundary, 1)
+    us_reaction.set_direction('=')
+    us_reaction.is_uptake_secretion = True
+    return us_reaction
+
+
+def uptake_and_secretion_reactions(model_compounds, media, modeldata=None):
     """
     Figure out which compounds can be taken up from the media and/or secreted into the media. We provide an endless
     reaction for these which allows them to be taken up and/or secreted without affecting the rest of the stoichiometric
@@ -11,48 +58,32 @@ def uptake_and_secretion_reactions(model_compounds, media):
 
     We also add a reaction for biomass_equation.
 
-    We will eventually set the bounds for these reactions, such that if the compound is in the media, the
+    We set the bounds for these reactions, such that if the compound is in the media, the
     bounds are (-1000,1000) [i.e. the compound can flow into the media] whereas if the compounds are not
     in the media, the bounds are (0,1000) [ie. the compound can flow out of the media, but not into it]
 
+    If you provide the modeldata, each compound only ever has one uptake and secretion reaction, which is
+    kept in modeldata.exchange_reactions (not in modeldata.reactions). We return a copy of that reaction with
+    the bounds for this media, so the reactions that we returned for another media do not change.
+
     :param model_compounds: A set of the compounds that are in this model
     :type model_compounds: set[PyFBA.metabolism.CompoundWithLocation]
     :param media: the media we want to grow on
     :type media: set[PyFBA.metabolism.CompoundWithLocation]
-    :return: A hash of new uptake and secretion reactions we need to add to the model
-    :rtype: hash
+    :param modeldata: the model seed object to cache the reactions in. Default: create new reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :return: A hash of uptake and secretion reactions we need to add to the model
+    :rtype: dict[str, PyFBA.metabolism.Reaction]
     """
 
     uptake_sec_reactions = {}
-    count = 0
     for c in model_compounds:
         if c.location == 'e' or c.name == 'Biomass':
             # this is an uptake or secretion reaction
-            # we need to add a new compound like this with a false location
-            us_leftside = c
-            us_rightside = copy.deepcopy(us_leftside)
-            # The uptake and secretion compounds typically have reaction bounds that allow them to be consumed
-            # (i.e. diffuse away from the cell) but not produced. However, our media components can also increase
-            # in concentration (i.e. diffuse to the cell) and thus the bounds are set higher. Whenever you change the
-            # growth media, you also need to adjust the reaction bounds to ensure that the media can be consumed!
-            # the b is for boundary and is secretion away from the cell
-            us_rightside.location = 'b'
-            us_rightside.uptake_secretion = True
-            # this is similar name that they use in the model seed
-            # us_reaction = Reaction('us_001', "EX_" + us_leftside.model_seed_id + "_" + us_leftside.location + "0")
-            # but we normally use a different name
-            us_reaction_id = f"upsr_{count}"
-            us_reaction = PyFBA.metabolism.Reaction(us_reaction_id, f"UPTAKE_SECRETION_REACTION {count}")
-            count += 1
-            us_reaction.equation = '(1) + ' + str(us_leftside) + " <=> (1) + " + str(us_rightside)
-            us_reaction.add_left_compounds({us_leftside})
-            us_reaction.set_left_compound_abundance(us_leftside, 1)
-            us_reaction.add_right_compounds({us_rightside})
-            us_reaction.set_right_compound_abundance(us_rightside, 1)
-            us_reaction.set_direction('=')
-            us_reaction.is_uptake_secretion = True
-            us_leftside.add_reactions({us_reaction})
-            us_rightside.add_reactions({us_reaction})
+            if modeldata is None:
+                us_reaction = exchange_reaction(c)
+            else:
+                us_reaction = copy.copy(modeldata.exchange_reaction(c))
             # Here we set reaction bounds. If the compound is in the media, we let it flow freely
             # otherwise we only let it diffuse away
             if c in media:
@@ -61,7 +92,7 @@ def uptake_and_secretion_reactions(model_compounds, media):
             else:
                 us_reaction.lower_bound = 0
                 us_reaction.upper_bound = 1000
-            uptake_sec_reactions[us_reaction_id] = us_reaction
+            uptake_sec_reactions[us_reaction.id] = us_reaction
 
     return uptake_sec_reactions
 
@@ -69,6 +100,10 @@ def uptake_and_secretion_reactions(model_compounds, media):
 def remove_uptake_and_secretion_reactions(reactions):
     """
     Remove all the uptake and secretion reactions added to a model, eg. when you are running multiple simulations.
+
+    The uptake and secretion reactions are no longer added to modeldata.reactions, so you only need this
+    if you have added them yourself. We only remove the reactions made by exchange_reaction, so exchange
+    reactions that are part of the model (e.g. EX_ reactions read from an SBML file) are kept.
     :param reactions: The reactions dict
     :type reactions: dict
     :return: The enzymes, compounds, and reactions data structure
@@ -76,9 +111,12 @@ def remove_uptake_and_secretion_reactions(reactions):
     """
 
     toremove = set()
-    for r in reactions:
+    for r, rxn in reactions.items():
         if r.startswith('upsr_'):
             toremove.add(r)
+        elif rxn.is_uptake_secretion and len(rxn.left_compounds) == 1 and \
+                r == exchange_reaction_id(next(iter(rxn.left_compounds))):
+            toremove.add(r)
 
     for r in toremove:
         reactions.pop(r)
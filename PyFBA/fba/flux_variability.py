@@ -0,0 +1,221 @@
+"""
+Flux variability analysis (FVA).
+
+We find the optimal biomass flux, fix the biomass flux to be at least a fraction of that optimum, and
+then find the minimum and maximum flux through every reaction. The model is only compiled and loaded
+once: for each reaction we just change the objective coefficients, and each solve starts from the basis of
+the previous one. The reactions can be split into chunks that are run in separate processes, each of
+which loads the compiled network into its own problem.
+"""
+
+import math
+import os
+from multiprocessing import Pool
+
+import PyFBA
+from PyFBA import log_and_message
+
+# the problem for this worker process. This is set by _init_worker
+_problem = None
+
+# how far below the fraction of the optimal biomass flux we allow the biomass flux to be, relative to the optimum.
+# Without this, fixing the biomass flux at exactly the optimum is often infeasible because of solver round-off
+OPTIMUM_TOLERANCE = 1e-6
+
+
+def _load_problem(network, fraction_of_optimum, optimum=None, backend=None):
+    """
+    Load the network, find the optimal biomass flux, and fix the biomass flux at a fraction of it
+
+    :param network: the compiled model
+    :type network: PyFBA.fba.CompiledNetwork
+    :param fraction_of_optimum: the fraction of the optimal biomass flux that must be maintained
+    :type fraction_of_optimum: float
+    :param optimum: the optimal biomass flux if we already know it
+    :type optimum: float
+    :param backend: the linear programming backend to use
+    :type backend: str
+    :return: the problem and the optimal biomass flux
+    :rtype: (PyFBA.lp.LPProblem, float)
+    """
+
+    problem = PyFBA.lp.new_problem(backend)
+    network.load(problem)
+
+    if optimum is None:
+        status, optimum = problem.solve()
+        if status != 'opt':
+            raise ValueError(f"Can not run flux variability analysis: the FBA did not solve (status: {status})")
+
+    # the biomass equation is always the last column
+    biomass = len(network.reactions) - 1
+    problem.col_bounds({biomass: (biomass_minimum(optimum, fraction_of_optimum), network.upper.item(biomass))})
+    problem.objective_coefficients({biomass: 0.0})
+    return problem, optimum
+
+
+def biomass_minimum(optimum, fraction_of_optimum=1.0):
+    """
+    The smallest biomass flux that we allow when the biomass flux must be at least a fraction of its optimum. This
+    is a little below the fraction of the optimum (see OPTIMUM_TOLERANCE) so that the solver can always find it
+
+    :param optimum: the optimal biomass flux
+    :type optimum: float
+    :param fraction_of_optimum: the fraction of the optimal biomass flux that must be maintained
+    :type fraction_of_optimum: float
+    :return: the smallest biomass flux
+    :rtype: float
+    """
+    return fraction_of_optimum * optimum - OPTIMUM_TOLERANCE * max(1.0, abs(optimum))
+
+
+def _solved(status, value, unbounded, column):
+    """
+    The minimum or maximum flux through a column, if the solver found it
+
+    :param status: the status of the solution
+    :type status: str
+    :param value: the value of the objective
+    :type value: float
+    :param unbounded: the flux if the problem is unbounded (-inf for the minimum and inf for the maximum)
+    :type unbounded: float
+    :param column: the column that we are testing
+    :type column: int
+    :return: the flux
+    :rtype: float
+    """
+    if status == 'opt':
+        return value
+    if status == 'unbnd':
+        return unbounded
+    raise ValueError(f"Can not find the flux variability of column {column}: the LP did not solve (status: {status})")
+
+
+def _variability(problem, columns):
+    """
+    Find the minimum and maximum flux through each of the columns
+
+    :param problem: the problem with the biomass flux fixed
+    :type problem: PyFBA.lp.LPProblem
+    :param columns: the indices of the columns to test
+    :type columns: list[int]
+    :return: the column index and its minimum and maximum flux. The flux is -inf or inf if it is unbounded
+    :rtype: list[(int, float, float)]
+    """
+
+    results = []
+    for j in columns:
+        problem.objective_coefficients({j: 1.0})
+        problem.maximize = False
+        status, minimum = problem.solve()
+        minimum = _solved(status, minimum, -math.inf, j)
+        problem.maximize = True
+        status, maximum = problem.solve()
+        maximum = _solved(status, maximum, math.inf, j)
+        problem.objective_coefficients({j: 0.0})
+        results.append((j, minimum, maximum))
+    return results
+
+
+def _init_worker(network, fraction_of_optimum, optimum, backend):
+    """
+    Load the problem for this worker process. See _load_problem for the parameters
+    """
+    global _problem
+    _problem, optimum = _load_problem(network, fraction_of_optimum, optimum, backend)
+
+
+def _worker_variability(columns):
+    """
+    Find the flux variability of the columns using the problem for this worker process
+
+    :param columns: the indices of the columns to test
+    :type columns: list[int]
+    :return: the column index and its minimum and maximum flux
+    :rtype: list[(int, float, float)]
+    """
+    return _variability(_problem, columns)
+
+
+def flux_variability(modeldata, reactions, media, biomass_equation, fraction_of_optimum=1.0, reactions_to_test=None,
+                     processes=1, backend=None, compress=False, verbose=False):
+    """
+    Calculate the minimum and maximum flux through each reaction while the biomass flux is at least
+    fraction_of_optimum of its optimal value.
+
+    :param modeldata: the model seed object that includes compounds and reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param reactions: the reactions in the model
+    :type reactions: set[str]
+    :param media: the media compounds
+    :type media: set[PyFBA.metabolism.CompoundWithLocation]
+    :param biomass_equation: the biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param fraction_of_optimum: the fraction of the optimal biomass flux that must be maintained
+    :type fraction_of_optimum: float
+    :param reactions_to_test: the reactions to calculate the variability for. Default: every reaction in the
+    model, including the uptake and secretion reactions and the biomass equation
+    :type reactions_to_test: set[str]
+    :param processes: the number of processes to use. Default: 1 (run in this process). Use None for the number
+    of CPUs
+    :type processes: int
+    :param backend: the linear programming backend (e.g. glpk or highs). Default: PyFBA.lp.default_backend()
+    :type backend: str
+    :param compress: merge the reactions whose fluxes are fully coupled into single columns (see
+    PyFBA.fba.compress). We only need to calculate the variability of each column, and the variability of the
+    reactions that were merged into it are proportional
+    :type compress: bool
+    :param verbose: more output
+    :type verbose: bool
+    :return: a dict of reaction id and its (minimum flux, maximum flux). A flux is -inf or inf if it is unbounded,
+    and we raise a ValueError if the LP for any reaction does not solve
+    :rtype: dict[str, (float, float)]
+    """
+
+    if not 0 <= fraction_of_optimum <= 1:
+        raise ValueError(f"fraction_of_optimum must be between 0 and 1, not {fraction_of_optimum}")
+
+    network = PyFBA.fba.CompiledNetwork.compile(modeldata, reactions, media, biomass_equation, verbose=verbose)
+    if compress:
+        network = network.compress(verbose=verbose)
+    problem, optimum = _load_problem(network, fraction_of_optimum, backend=backend)
+    log_and_message(f"FVA: the optimal biomass flux is {optimum}. Fixing it to be at least " +
+                    f"{biomass_minimum(optimum, fraction_of_optimum)}", stderr=verbose)
+
+    # the column of each reaction and the factor to multiply the flux of the column by
+    columns = {r: (j, 1.0) for r, j in network.reaction_index.items()}
+    for r, merged in network.coupled.items():
+        for m, factor in merged:
+            columns[m] = (network.reaction_index[r], factor)
+
+    if reactions_to_test is None:
+        reactions_to_test = columns
+    missing = set(reactions_to_test).difference(columns)
+    if missing:
+        raise ValueError(f"Can not test {', '.join(missing)} because they are not in the model")
+    to_solve = sorted({columns[r][0] for r in reactions_to_test})
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(to_solve)))
+
+    if processes == 1:
+        results = _variability(problem, to_solve)
+    else:
+        # split the reactions into a few chunks per process so that the slow ones are spread out
+        nchunks = processes * 4
+        chunks = [to_solve[i::nchunks] for i in range(nchunks) if to_solve[i::nchunks]]
+        results = []
+        with Pool(processes, initializer=_init_worker,
+                  initargs=(network, fraction_of_optimum, optimum, backend)) as pool:
+            for res in pool.imap_unordered(_worker_variability, chunks):
+                results.extend(res)
+
+    log_and_message(f"FVA: calculated the variability of {len(results)} columns", stderr=verbose)
+    variability = {j: (minimum, maximum) for j, minimum, maximum in results}
+    fva = {}
+    for r in reactions_to_test:
+        j, factor = columns[r]
+        minimum, maximum = variability[j]
+        fva[r] = tuple(sorted((factor * minimum, factor * maximum)))
+    return fva
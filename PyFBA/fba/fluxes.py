@@ -1,17 +1,118 @@
 import os
 import sys
+from collections.abc import Mapping
+
+import numpy as np
+
 from PyFBA import lp
 import PyFBA
 
 
-def reaction_fluxes(verbose=False):
+class FluxVector(Mapping):
+    """
+    The fluxes through every reaction in a solved FBA model.
+
+    This is a read-only mapping of reaction ID to flux, so it can be used wherever the old dict of fluxes
+    was used, but the fluxes are held in a single numpy array in the same order as the columns of the
+    linear programming problem, so they can also be used directly in vectorised calculations.
+
+    :ivar reactions: the reaction IDs, in the order of the columns
+    :ivar fluxes: a numpy array of the flux through each reaction
+    :ivar index: a dict of reaction ID and its position in the arrays
+    """
+
+    def __init__(self, reactions, fluxes, index=None):
+        """
+        Create a new flux vector
+
+        :param reactions: the reaction IDs, in the order of the fluxes
+        :type reactions: list[str]
+        :param fluxes: the flux through each reaction
+        :type fluxes: numpy.ndarray
+        :param index: an optional dict of reaction ID and its position. Calculated if not provided
+        :type index: dict[str, int]
+        """
+        if len(reactions) != len(fluxes):
+            raise ValueError(f"There are {len(reactions)} reactions but {len(fluxes)} fluxes")
+        self.reactions = reactions
+        self.fluxes = fluxes
+        if index is None:
+            index = {r: i for i, r in enumerate(reactions)}
+        self.index = index
+
+    def __getitem__(self, item):
+        return float(self.fluxes[self.index[item]])
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def __iter__(self):
+        return iter(self.reactions)
+
+    def __len__(self):
+        return len(self.reactions)
+
+    def __repr__(self):
+        return f"FluxVector({len(self.reactions)} reactions)"
+
+    def to_dict(self):
+        """
+        Convert the fluxes to a dict
+
+        :return: A dict of reaction ID and flux through that reaction
+        :rtype: dict of str and float
+        """
+        return dict(zip(self.reactions, self.fluxes.tolist()))
+
+
+def reaction_fluxes(problem=None, removed=None, coupled=None, verbose=False):
     """
     Return the reaction fluxes from the solved FBA model.
 
+    :param problem: the linear programming problem that was solved. Default: PyFBA.lp.default_problem
+    :type problem: PyFBA.lp.LPProblem
+    :param removed: reactions that are part of the model but not the problem (e.g. because they were removed
+    by PyFBA.fba.presolve). These have a flux of zero
+    :type removed: list[str]
+    :param coupled: a dict of reaction id (column) and the reactions that were merged into it by
+    PyFBA.fba.compress, with the factor to multiply the flux of the column by
+    :type coupled: dict[str, list[(str, float)]]
     :param verbose: Print more output
     :type verbose: bool
-    :return: A dict of reaction ID and flux through that reaction
-    :rtype: dict of str and float
+    :return: A mapping of reaction ID and flux through that reaction
+    :rtype: FluxVector
     """
 
-    return lp.col_primal_hash()
+    if problem is None:
+        problem = lp.get_default_problem()
+    fluxes = problem.col_primal_array()
+    if problem.col_names is None:
+        # the columns were not named when the problem was loaded, so use the column numbers
+        return FluxVector(list(range(len(fluxes))), fluxes)
+    reactions = problem.col_names
+    index = problem.col_index
+    if reactions and str(reactions[-1]).endswith(PyFBA.fba.REVERSE_SUFFIX):
+        # the reversible reactions were split for parsimonious FBA, so the net flux is forward - reverse
+        ncols = len(reactions)
+        while str(reactions[ncols - 1]).endswith(PyFBA.fba.REVERSE_SUFFIX):
+            ncols -= 1
+        forward = [index[r[:-len(PyFBA.fba.REVERSE_SUFFIX)]] for r in reactions[ncols:]]
+        net = fluxes[:ncols]
+        net[forward] -= fluxes[ncols:]
+        fluxes = net
+        reactions = reactions[:ncols]
+        index = None
+    if not removed and not coupled:
+        return FluxVector(reactions, fluxes, index)
+
+    reactions = list(reactions)
+    extra = []
+    for r, merged in (coupled or {}).items():
+        flux = fluxes[problem.col_index[r]]
+        for m, factor in merged:
+            reactions.append(m)
+            extra.append(factor * flux)
+    if removed:
+        reactions += removed
+        extra += [0.0] * len(removed)
+    return FluxVector(reactions, np.concatenate([fluxes, extra]))
@@ -0,0 +1,281 @@
+"""
+Remember which sets of reactions grow, so that we do not run the FBA again when we already know the answer.
+
+Adding a reaction to a model only adds a column to the linear program, so it can only make growth easier: if a set
+of reactions grows on a media, every superset of it grows too, and if a set does not grow, none of its subsets grow.
+A GrowthOracle keeps the smallest sets that we know grow and the largest sets that we know do not grow for one media
+and biomass equation, answers every query that they imply, and only runs the FBA when the answer is unknown.
+
+This is only true while the reactions stay the same. Gapfilling resets the bounds of the reactions that it suggests
+(see PyFBA.metabolism.Reaction.reset_bounds), so the oracle remembers the direction and bounds of every reaction that
+it has seen, and forgets everything if any of the reactions that we ask about have changed. We do not need to check
+the other reactions: a set that we know grows is a subset of the reactions we ask about, and if the reactions we
+ask about are a subset of a set that did not grow, they did not grow with the same bounds either.
+
+To answer a query without comparing it to every set that we know, the growing sets are indexed by one of their
+reactions, so we only compare the sets whose reaction is in the query, and the failing sets are sorted by size, so
+we only compare the sets that are at least as large as the query.
+"""
+
+import weakref
+from bisect import bisect_left
+
+import PyFBA
+from PyFBA import log_and_message
+
+# the shared oracles for each model data, by media and biomass equation (see growth_oracle). We only keep a weak
+# reference to the model data, so the oracles are forgotten when the model data is
+_oracles = weakref.WeakKeyDictionary()
+
+
+class GrowthOracle:
+    """
+    The sets of reactions that we know grow, or do not grow, on one media with one biomass equation.
+
+    :ivar modeldata: the model seed object that includes compounds and reactions. We only keep a weak reference to it
+    :ivar media: the media compounds
+    :ivar biomass_equation: the biomass equation
+    :ivar growing: the smallest sets of reactions that we know grow
+    :ivar failing: the largest sets of reactions that we know do not grow
+    :ivar max_sets: the number of growing and of failing sets that we keep. We forget the oldest sets first
+    :ivar tests: the number of growth tests that we ran
+    :ivar hits: the number of growth tests that we did not need to run
+    """
+
+    def __init__(self, modeldata=None, media=None, biomass_equation=None, max_sets=1000):
+        """
+        Start an oracle that does not know anything yet
+
+        :param modeldata: the model seed object that includes compounds and reactions. Without this we do not check
+        whether the reactions have changed, and you must provide the growth test to grows
+        :type modeldata: PyFBA.model_seed.ModelData
+        :param media: the media compounds
+        :type media: set[PyFBA.metabolism.CompoundWithLocation]
+        :param biomass_equation: the biomass equation
+        :type biomass_equation: PyFBA.metabolism.Reaction
+        :param max_sets: the number of growing and of failing sets that we keep
+        :type max_sets: int
+        """
+        self._modeldata = weakref.ref(modeldata) if modeldata is not None else None
+        self.media = media
+        self.biomass_equation = biomass_equation
+        self.max_sets = max_sets
+        self.growing = []
+        self.failing = []
+        self.reaction_bounds = {}
+        self.tests = 0
+        self.hits = 0
+        # the growing sets by their smallest reaction, and the sizes of the failing sets with the sets, by size
+        self._growing_index = {}
+        self._failing_sizes = []
+        self._failing_by_size = []
+
+    @property
+    def modeldata(self):
+        """
+        The model seed object that includes compounds and reactions, or None if we do not check the reactions
+        """
+        return self._modeldata() if self._modeldata is not None else None
+
+    def _bounds(self, reaction):
+        """
+        The direction and bounds of a reaction in the model data
+
+        :param reaction: the reaction id
+        :type reaction: str
+        :return: the direction, lower bound, and upper bound
+        :rtype: (str, float, float)
+        """
+        rxn = self.modeldata.reactions.get(reaction)
+        if rxn is None:
+            return None
+        return rxn.direction, rxn.lower_bound, rxn.upper_bound
+
+    def _check_reactions(self, reactions):
+        """
+        Forget everything that we know if any of these reactions have changed since we saw them
+
+        :param reactions: the reactions to check
+        :type reactions: frozenset[str]
+        """
+        if self._modeldata is None:
+            return
+        for r in reactions.intersection(self.reaction_bounds):
+            if self._bounds(r) != self.reaction_bounds[r]:
+                log_and_message(f"The bounds of {r} have changed, so we forget the sets of reactions that grow")
+                self.clear()
+                return
+
+    def _index(self):
+        """
+        Index the growing and failing sets after we have changed them
+        """
+        self._growing_index = {}
+        for g in self.growing:
+            self._growing_index.setdefault(min(g, default=None), []).append(g)
+        self._failing_by_size = sorted(self.failing, key=len)
+        self._failing_sizes = [len(f) for f in self._failing_by_size]
+
+    def _implies_growth(self, reactions):
+        """
+        Whether one of the growing sets is a subset of these reactions
+
+        :param reactions: the reactions to run
+        :type reactions: frozenset[str]
+        :rtype: bool
+        """
+        if None in self._growing_index:
+            return True
+        for r in reactions.intersection(self._growing_index):
+            if any(g <= reactions for g in self._growing_index[r]):
+                return True
+        return False
+
+    def _implies_failure(self, reactions):
+        """
+        Whether these reactions are a subset of one of the failing sets
+
+        :param reactions: the reactions to run
+        :type reactions: frozenset[str]
+        :rtype: bool
+        """
+        start = bisect_left(self._failing_sizes, len(reactions))
+        return any(reactions <= f for f in self._failing_by_size[start:])
+
+    def known(self, reactions):
+        """
+        Whether the reactions grow, if we know that from the sets that we have already tested
+
+        :param reactions: the reactions to run
+        :type reactions: set[str]
+        :return: True if they grow, False if they do not, and None if we do not know
+        :rtype: bool | None
+        """
+        reactions = frozenset(reactions)
+        self._check_reactions(reactions)
+        if self._implies_growth(reactions):
+            self.hits += 1
+            return True
+        if self._implies_failure(reactions):
+            self.hits += 1
+            return False
+        return None
+
+    def record(self, reactions, growth):
+        """
+        Remember whether a set of reactions grows
+
+        :param reactions: the reactions that we ran
+        :type reactions: set[str]
+        :param growth: whether they grew
+        :type growth: bool
+        """
+        reactions = frozenset(reactions)
+        if self._modeldata is not None:
+            for r in reactions.difference(self.reaction_bounds):
+                self.reaction_bounds[r] = self._bounds(r)
+        if growth:
+            if self._implies_growth(reactions):
+                return
+            self.growing = [g for g in self.growing if not reactions <= g]
+            self.growing.append(reactions)
+            del self.growing[:-self.max_sets]
+        else:
+            if self._implies_failure(reactions):
+                return
+            self.failing = [f for f in self.failing if not f <= reactions]
+            self.failing.append(reactions)
+            del self.failing[:-self.max_sets]
+        self._index()
+
+    def grows(self, reactions, test=None):
+        """
+        Whether the reactions grow. We only run the growth test if we do not already know the answer.
+
+        :param reactions: the reactions to run
+        :type reactions: set[str]
+        :param test: a function with no arguments that tests whether these reactions grow, e.g. the grows method
+        of an FBASession with these reactions enabled. Default: PyFBA.fba.run_fba
+        :type test: callable
+        :return: whether the reactions grow
+        :rtype: bool
+        """
+        growth = self.known(reactions)
+        if growth is None:
+            if test is None:
+                status, value, growth = PyFBA.fba.run_fba(self.modeldata, set(reactions), self.media,
+                                                          self.biomass_equation, growth_only=True)
+            else:
+                growth = test()
+            self.tests += 1
+            self.record(reactions, growth)
+        return growth
+
+    def dump(self):
+        """
+        The sets of reactions that we know, and the reactions they were tested with, as lists that can be saved
+        as JSON (see PyFBA.gapfill.Checkpoint)
+
+        :return: the growing sets, the failing sets, and the direction and bounds of each reaction
+        :rtype: dict
+        """
+        return {'growing': [sorted(g) for g in self.growing], 'failing': [sorted(f) for f in self.failing],
+                'reaction_bounds': {r: list(b) if b is not None else None for r, b in self.reaction_bounds.items()}}
+
+    def load(self, data):
+        """
+        Add the sets of reactions that we saved with dump. If any of the reactions have changed since then, we
+        forget them all the next time we use the oracle.
+
+        :param data: the growing sets, the failing sets, and the direction and bounds of each reaction
+        :type data: dict
+        """
+        for r, b in data['reaction_bounds'].items():
+            self.reaction_bounds.setdefault(r, tuple(b) if b is not None else None)
+        for g in data['growing']:
+            self.record(g, True)
+        for f in data['failing']:
+            self.record(f, False)
+
+    def clear(self):
+        """
+        Forget all the sets of reactions that we know
+        """
+        self.growing = []
+        self.failing = []
+        self.reaction_bounds = {}
+        self._index()
+
+    def __repr__(self):
+        return f"GrowthOracle({len(self.growing)} growing sets, {len(self.failing)} failing sets, " + \
+               f"{self.tests} tests, {self.hits} hits)"
+
+
+def growth_oracle(modeldata, media, biomass_equation):
+    """
+    The oracle that we share for this model data, media, and biomass equation. We use the same objects, not
+    just equal ones, as the key, so calling PyFBA.metabolism.biomass_equation again gives a new oracle. The oracle
+    keeps the biomass equation, so its id is not reused while we have the oracle, and the oracles for a model data
+    are forgotten when the model data is.
+
+    :param modeldata: the model seed object that includes compounds and reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param media: the media compounds
+    :type media: set[PyFBA.metabolism.CompoundWithLocation]
+    :param biomass_equation: the biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :return: the growth oracle
+    :rtype: GrowthOracle
+    """
+    oracles = _oracles.setdefault(modeldata, {})
+    key = (frozenset(media), id(biomass_equation))
+    if key not in oracles:
+        oracles[key] = GrowthOracle(modeldata, media, biomass_equation)
+    return oracles[key]
+
+
+def clear_growth_oracles():
+    """
+    Forget all the shared oracles, and the model data they refer to
+    """
+    _oracles.clear()
@@ -0,0 +1,138 @@
+"""
+Knock out reactions one at a time and measure the growth without them.
+
+Each knockout is independent, so we spread them over a pool of processes. We compile the network once,
+and every worker loads it into its own FBASession (and so its own linear programming problem), and then
+switches each reaction off, solves, and switches it back on again.
+"""
+
+import os
+from multiprocessing import Pool
+
+import PyFBA
+from PyFBA import log_and_message
+
+# the FBASession for this worker process. This is set by _init_worker
+_session = None
+
+
+def _init_worker(network, backend, presolve, compress):
+    """
+    Load the network into an FBASession for this worker process
+
+    :param network: the compiled base set of reactions
+    :type network: PyFBA.fba.CompiledNetwork
+    :param backend: the linear programming backend to use
+    :type backend: str
+    :param presolve: remove the reactions that can not carry any flux
+    :type presolve: bool
+    :param compress: merge the reactions whose fluxes are coupled
+    :type compress: bool
+    """
+    global _session
+    _session = PyFBA.fba.FBASession(network=network, backend=backend, presolve=presolve, compress=compress)
+
+
+def _knockout_session(session, deletion):
+    """
+    Switch off the reactions, solve the FBA, and switch them back on
+
+    :param session: the FBA session that has the base reactions loaded
+    :type session: PyFBA.fba.FBASession
+    :param deletion: a reaction id, or a tuple of reaction ids to knock out together
+    :type deletion: str | tuple[str]
+    :return: the deletion, the biomass flux, and whether we grew
+    :rtype: (str | tuple[str], float, bool)
+    """
+    rxns = {deletion} if isinstance(deletion, str) else set(deletion)
+    session.disable(rxns)
+    status, value, growth = session.solve()
+    session.enable(rxns)
+    return deletion, value, growth
+
+
+def _knockout(deletion):
+    """
+    Knock out the reactions using the session for this worker process
+
+    :param deletion: a reaction id, or a tuple of reaction ids to knock out together
+    :type deletion: str | tuple[str]
+    :return: the deletion, the biomass flux, and whether we grew
+    :rtype: (str | tuple[str], float, bool)
+    """
+    return _knockout_session(_session, deletion)
+
+
+def reaction_knockouts(modeldata, reactions, media, biomass_equation, deletions=None, processes=None, backend=None,
+                       presolve=False, compress=False, verbose=False):
+    """
+    Knock out each of the deletions from the base set of reactions and measure the growth.
+
+    :param modeldata: the model seed object that includes compounds and reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param reactions: the base set of reactions
+    :type reactions: set[str]
+    :param media: the media compounds
+    :type media: set[PyFBA.metabolism.CompoundWithLocation]
+    :param biomass_equation: the biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param deletions: the deletions to test. Each is either a reaction id or a tuple of reaction ids that are
+    knocked out together. Default: each of the reactions on its own
+    :type deletions: list[str | tuple[str]]
+    :param processes: the number of processes to use. Default: the number of CPUs. Use 1 to run in this process
+    :type processes: int
+    :param backend: the linear programming backend (e.g. glpk or highs). Default: PyFBA.lp.default_backend()
+    :type backend: str
+    :param presolve: remove the reactions that can not carry any flux before solving (see PyFBA.fba.presolve).
+    Knocking out a reaction that is already blocked does not change the growth
+    :type presolve: bool
+    :param compress: merge the reactions whose fluxes are fully coupled into single columns (see
+    PyFBA.fba.compress). Knocking out any of them knocks out all of them
+    :type compress: bool
+    :param verbose: more output
+    :type verbose: bool
+    :return: a dict of each deletion and the biomass flux and whether we grew without it
+    :rtype: dict[str | tuple[str], (float, bool)]
+    """
+
+    reactions = set(reactions)
+    if deletions is None:
+        deletions = sorted(reactions)
+    else:
+        deletions = list(deletions)
+    for d in deletions:
+        missing = {d}.difference(reactions) if isinstance(d, str) else set(d).difference(reactions)
+        if missing:
+            raise ValueError(f"Can not knock out {', '.join(missing)} because it is not in the base reactions")
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(deletions)))
+
+    log_and_message(f"Testing {len(deletions)} knockouts of {len(reactions)} reactions using {processes} processes",
+                    stderr=verbose)
+
+    network = PyFBA.fba.CompiledNetwork.compile(modeldata, reactions, media, biomass_equation, verbose=verbose)
+    # presolve and compress once here, and the workers get the results with the full network
+    reduced = network.presolve(verbose=verbose) if presolve else network
+    if compress:
+        reduced.compress(verbose=verbose)
+    results = {}
+    if processes == 1:
+        session = PyFBA.fba.FBASession(network=network, backend=backend, presolve=presolve, compress=compress)
+        for d in deletions:
+            d, value, growth = _knockout_session(session, d)
+            results[d] = (value, growth)
+            log_and_message(f"Knockout of {d} has a biomass flux value of {value} --> Growth: {growth}",
+                            stderr=verbose)
+        return results
+
+    # give each worker a few chunks so that the slow solves are spread out
+    chunksize = max(1, len(deletions) // (processes * 4))
+    with Pool(processes, initializer=_init_worker,
+              initargs=(network, backend, presolve, compress)) as pool:
+        for d, value, growth in pool.imap_unordered(_knockout, deletions, chunksize=chunksize):
+            results[d] = (value, growth)
+            log_and_message(f"Knockout of {d} has a biomass flux value of {value} --> Growth: {growth}",
+                            stderr=verbose)
+    return results
@@ -0,0 +1,111 @@
+"""
+The bounds of the uptake and secretion reactions for many media, calculated once.
+
+A compound in the media can be taken up and secreted, so its uptake and secretion reaction has the bounds
+(-1000, 1000), and every other external compound can only be secreted (0, 1000). For a compiled network we
+calculate these bounds as one vector per media, in the order of the uptake and secretion columns of the
+network, so changing the media is just one update of those columns (see FBASession.set_media).
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+import PyFBA
+from PyFBA import log_and_message
+
+
+class MediaBounds(Mapping):
+    """
+    A mapping of media name and the (lower, upper) bounds of the uptake and secretion reactions
+    of a compiled network on that media.
+
+    :ivar columns: the columns of the uptake and secretion reactions in the network
+    :ivar compound_index: a dict of external compound and the position of its uptake and secretion reaction in columns
+    :ivar bounds: a dict of media name and the lower and upper bounds of each uptake and secretion reaction
+    :ivar media: a dict of media name and the media compounds
+    """
+
+    def __init__(self, network, media=None):
+        """
+        Index the uptake and secretion reactions of the network and calculate the bounds for each media
+
+        :param network: the compiled network
+        :type network: PyFBA.fba.CompiledNetwork
+        :param media: an optional dict of media name and the media compounds
+        :type media: dict[str, set[PyFBA.metabolism.CompoundWithLocation]]
+        """
+        self.columns = np.array(sorted(network.reaction_index[r] for r in network.uptake_secretion), dtype=int)
+        self.compound_index = {}
+        for k, j in enumerate(self.columns.tolist()):
+            for c in network.uptake_secretion[network.reactions[j]].left_compounds:
+                self.compound_index[c] = k
+        self.bounds = {}
+        self.media = {}
+        for name, compounds in (media or {}).items():
+            self.add(name, compounds)
+
+    @classmethod
+    def from_media_files(cls, network, modeldata, media_names=None, verbose=False):
+        """
+        Read the media and calculate their bounds
+
+        :param network: the compiled network
+        :type network: PyFBA.fba.CompiledNetwork
+        :param modeldata: the model seed object to correct the media compound names
+        :type modeldata: PyFBA.model_seed.ModelData
+        :param media_names: the media to read. These can be the names of the media provided with PyFBA, or media
+        files. Default: all the media (see PyFBA.parse.available_media)
+        :type media_names: list[str]
+        :param verbose: more output
+        :type verbose: bool
+        :return: the bounds for every media
+        :rtype: MediaBounds
+        """
+        if media_names is None:
+            media_names = PyFBA.parse.available_media()
+        media = {m: PyFBA.parse.find_media_file(m, modeldata, verbose=verbose) for m in media_names}
+        log_and_message(f"Calculated the bounds of {len(network.uptake_secretion)} uptake and secretion reactions " +
+                        f"for {len(media)} media", stderr=verbose)
+        return cls(network, media)
+
+    def calculate(self, media):
+        """
+        Calculate the bounds of the uptake and secretion reactions for a media without keeping them
+
+        :param media: the media compounds
+        :type media: set[PyFBA.metabolism.CompoundWithLocation]
+        :return: the lower and upper bounds of each uptake and secretion reaction, in the order of columns
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        lower = np.zeros(len(self.columns))
+        upper = np.full(len(self.columns), 1000.0)
+        lower[[self.compound_index[c] for c in media if c in self.compound_index]] = -1000
+        return lower, upper
+
+    def add(self, name, media):
+        """
+        Calculate and keep the bounds for a media
+
+        :param name: the name of the media
+        :type name: str
+        :param media: the media compounds
+        :type media: set[PyFBA.metabolism.CompoundWithLocation]
+        :return: the lower and upper bounds of each uptake and secretion reaction
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        self.bounds[name] = self.calculate(media)
+        self.media[name] = set(media)
+        return self.bounds[name]
+
+    def __getitem__(self, item):
+        return self.bounds[item]
+
+    def __iter__(self):
+        return iter(self.bounds)
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def __repr__(self):
+        return f"MediaBounds({len(self.columns)} uptake and secretion reactions, {len(self.bounds)} media)"
@@ -0,0 +1,104 @@
+"""
+Parsimonious FBA (pFBA).
+
+There are usually many flux distributions with the same (optimal) biomass flux, and the simplex just returns
+one of them, so the fluxes can change between runs. Parsimonious FBA fixes the biomass flux at its optimum and
+then finds the flux distribution with the smallest total absolute flux, which is much more reproducible.
+
+To minimize the absolute flux, each reversible reaction is split into a forward column and a reverse column
+that can both only carry positive flux. The reverse columns are added after all the other columns when the
+network is loaded (see PyFBA.fba.CompiledNetwork.load), so the first FBA is exactly the same and the
+parsimonious step only has to change the bounds and objective of the problem that is already loaded.
+PyFBA.fba.reaction_fluxes adds the reverse columns back into the net flux of each reaction.
+"""
+
+import numpy as np
+
+import PyFBA
+from PyFBA import log_and_message
+
+# the reverse column of a reaction that has been split is the reaction id with this suffix
+REVERSE_SUFFIX = "_reverse"
+
+
+def split_reversible(network, columns=None):
+    """
+    Split the reversible reactions into a forward column, which is the original column, and a reverse column
+    with the opposite stoichiometry. Both columns can only carry positive flux, and the reverse columns are
+    after all the columns of the network.
+
+    :param network: the compiled network
+    :type network: PyFBA.fba.CompiledNetwork
+    :param columns: the columns to split if they are reversible. Default: every column except the biomass equation
+    :type columns: numpy.ndarray
+    :return: the rows, columns, and values of the non-zero elements, the lower and upper bounds of every column,
+    and the original columns that were split, in the order of their reverse columns
+    :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+
+    ncols = len(network.reactions)
+    if columns is None:
+        columns = np.arange(ncols - 1)
+    lower = network.lower.copy()
+    upper = network.upper.copy()
+    reversible = columns[lower[columns] < 0]
+
+    reverse_col = np.full(ncols, -1)
+    reverse_col[reversible] = np.arange(ncols, ncols + len(reversible))
+    split = reverse_col[network.cols] >= 0
+    rows = np.concatenate([network.rows, network.rows[split]])
+    cols = np.concatenate([network.cols, reverse_col[network.cols[split]]])
+    values = np.concatenate([network.values, -network.values[split]])
+
+    reverse_lower = np.maximum(0, -upper[reversible])
+    reverse_upper = -lower[reversible]
+    lower[reversible] = 0
+    upper[reversible] = np.maximum(0, upper[reversible])
+    return rows, cols, values, np.concatenate([lower, reverse_lower]), np.concatenate([upper, reverse_upper]), \
+        reversible
+
+
+def parsimonious_fba(problem, biomass_column, biomass_bounds, optimum, fraction_of_optimum=1.0, verbose=False):
+    """
+    Find the flux distribution with the smallest total flux that has the optimal biomass flux (less a small
+    tolerance for round off, see PyFBA.fba.biomass_minimum). The network must
+    have been loaded with the reversible reactions split (see CompiledNetwork.load) and already solved.
+    The fluxes are in the problem (see PyFBA.fba.reaction_fluxes), and the bounds and objective of the
+    biomass equation are restored afterwards.
+
+    :param problem: the linear programming problem with the split network loaded and solved
+    :type problem: PyFBA.lp.LPProblem
+    :param biomass_column: the column of the biomass equation
+    :type biomass_column: int
+    :param biomass_bounds: the usual bounds of the biomass equation
+    :type biomass_bounds: (float, float)
+    :param optimum: the optimal biomass flux
+    :type optimum: float
+    :param fraction_of_optimum: the fraction of the optimal biomass flux that must be maintained
+    :type fraction_of_optimum: float
+    :param verbose: more output
+    :type verbose: bool
+    :return: the status of the solution and the total flux
+    :rtype: (str, float)
+    """
+
+    lower, upper = biomass_bounds
+    ncols = problem.ncols
+    objective = np.ones(ncols)
+    objective[biomass_column] = 0
+
+    # allow a little round off in the optimum, otherwise the LP can be infeasible (see PyFBA.fba.biomass_minimum)
+    minimum = max(lower, PyFBA.fba.biomass_minimum(optimum, fraction_of_optimum))
+    problem.col_bounds({biomass_column: (minimum, upper)})
+    problem.objective_coefficients(objective.tolist())
+    problem.maximize = False
+    status, total = problem.solve()
+    log_and_message(f"Parsimonious FBA: the total flux at a biomass flux of {minimum} " +
+                    f"is {total} ({status})", stderr=verbose)
+
+    problem.maximize = True
+    objective = np.zeros(ncols)
+    objective[biomass_column] = 1
+    problem.objective_coefficients(objective.tolist())
+    problem.col_bounds({biomass_column: (lower, upper)})
+    return status, total
@@ -0,0 +1,106 @@
+"""
+Remove the reactions that can never carry any flux before we solve the LP.
+
+A compound that is at steady state (i.e. its bounds are (0, 0)) but that is only ever produced, or only
+ever consumed, or that is only in one reaction, is a dead end: the reactions it is part of can not carry
+any flux. Removing those reactions can make more compounds into dead ends, so we repeat until nothing
+changes. Gapfilled models often have a lot of these reactions, and the smaller LP is faster to solve.
+
+The reduced network keeps the biomass equation as the last column. The reactions that were removed are
+in network.removed, and their flux is always zero (see PyFBA.fba.reaction_fluxes).
+"""
+
+import numpy as np
+
+import PyFBA
+from PyFBA import log_and_message
+
+
+def blocked_reactions(network):
+    """
+    Find the reactions that can not carry any flux because of dead end compounds
+
+    :param network: the compiled network
+    :type network: PyFBA.fba.CompiledNetwork
+    :return: a boolean array that is True for each reaction (column) that is blocked
+    :rtype: numpy.ndarray
+    """
+
+    ncpds = len(network.compounds)
+    rows, cols, values = network.rows, network.cols, network.values
+    lower, upper = network.lower, network.upper
+    steady = (network.compound_lower == 0) & (network.compound_upper == 0)
+    nonzero = values != 0
+
+    # a reaction produces a compound if it has a positive coefficient and can run forwards, or a negative
+    # coefficient and can run backwards, and consumes it otherwise
+    forward = upper[cols] > 0
+    backward = lower[cols] < 0
+    produces = nonzero & (((values > 0) & forward) | ((values < 0) & backward))
+    consumes = nonzero & (((values < 0) & forward) | ((values > 0) & backward))
+
+    blocked = (lower == 0) & (upper == 0)
+    while True:
+        active = nonzero & ~blocked[cols]
+        producers = np.bincount(rows[active & produces], minlength=ncpds)
+        consumers = np.bincount(rows[active & consumes], minlength=ncpds)
+        reactions = np.bincount(rows[active], minlength=ncpds)
+        dead = steady & (reactions > 0) & ((producers == 0) | (consumers == 0) | (reactions == 1))
+        newly_blocked = np.unique(cols[active & dead[rows]])
+        if len(newly_blocked) == 0:
+            return blocked
+        blocked[newly_blocked] = True
+
+
+def presolve(network, verbose=False):
+    """
+    Remove the blocked reactions, and the compounds that are not in any of the remaining reactions, from the network.
+
+    :param network: the compiled network
+    :type network: PyFBA.fba.CompiledNetwork
+    :param verbose: more output
+    :type verbose: bool
+    :return: the reduced network
+    :rtype: PyFBA.fba.CompiledNetwork
+    """
+
+    blocked = blocked_reactions(network)
+    # we always keep the biomass equation so that the objective is the same, but it may not be able to carry flux
+    biomass = len(network.reactions) - 1
+    biomass_blocked = bool(blocked[biomass])
+    blocked[biomass] = False
+
+    keep_cols = np.flatnonzero(~blocked)
+    col_map = np.full(len(network.reactions), -1)
+    col_map[keep_cols] = np.arange(len(keep_cols))
+
+    kept = ~blocked[network.cols] & (network.values != 0)
+    keep_rows = np.unique(network.rows[kept])
+    row_map = np.full(len(network.compounds), -1)
+    row_map[keep_rows] = np.arange(len(keep_rows))
+
+    data = list(zip(row_map[network.rows[kept]].tolist(), col_map[network.cols[kept]].tolist(),
+                    network.values[kept].tolist()))
+    reactions = [network.reactions[j] for j in keep_cols]
+    reaction_bounds = {network.reactions[j]: (network.lower.item(j), network.upper.item(j)) for j in keep_cols}
+    if biomass_blocked:
+        reaction_bounds[network.reactions[biomass]] = (0, 0)
+    uptake_secretion = {r: us for r, us in network.uptake_secretion.items() if r in reaction_bounds}
+
+    reduced = PyFBA.fba.CompiledNetwork(data, [network.compounds[i] for i in keep_rows], reactions, uptake_secretion,
+                                        reaction_bounds,
+                                        list(zip(network.compound_lower[keep_rows].tolist(),
+                                                 network.compound_upper[keep_rows].tolist())),
+                                        network.media, network.biomass_equation)
+    reduced.removed = network.removed + [network.reactions[j] for j in np.flatnonzero(blocked)]
+    reduced.coupled = {r: c for r, c in network.coupled.items() if r in reaction_bounds}
+    for r in network.coupled:
+        if r not in reaction_bounds:
+            reduced.removed.extend(m for m, f in network.coupled[r])
+    reduced.presolved = reduced
+
+    log_and_message(f"Presolve removed {len(network.reactions) - len(reactions)} blocked reactions and " +
+                    f"{len(network.compounds) - len(keep_rows)} compounds", stderr=verbose)
+    if biomass_blocked:
+        log_and_message("Presolve: the biomass equation can not carry any flux", stderr=verbose)
+    return reduced
@@ -1,8 +1,49 @@
 from PyFBA import lp, log_and_message
+from .stoichiometry_cache import load_model
 import PyFBA
 
+# a model grows if it can carry more than this biomass flux
+GROWTH_THRESHOLD = 1
+# a linear program can not have a strict inequality, so feasible_growth asks for a biomass flux of at least
+# GROWTH_THRESHOLD + GROWTH_TOLERANCE. run_fba and FBASession then agree with it, so the growth tests can share a
+# PyFBA.fba.GrowthOracle
+GROWTH_TOLERANCE = 1e-6
 
-def run_fba(modeldata, reactions_to_run, media, biomass_equation, uptake_secretion=None, verbose=False):
+
+def feasible_growth(problem, biomass_column, biomass_bounds, threshold=GROWTH_THRESHOLD):
+    """
+    Test whether the model can grow without finding the maximum biomass flux. We fix the biomass flux to be
+    more than the threshold (by GROWTH_TOLERANCE) and remove the objective, so the solver only has to find a feasible
+    solution. The bounds and objective of the biomass equation are restored afterwards.
+
+    :param problem: the linear programming problem with the model loaded
+    :type problem: PyFBA.lp.LPProblem
+    :param biomass_column: the column of the biomass equation
+    :type biomass_column: int
+    :param biomass_bounds: the usual bounds of the biomass equation
+    :type biomass_bounds: (float, float)
+    :param threshold: the biomass flux that we need to exceed to grow
+    :type threshold: float
+    :return: the status of the solution and whether the model grows
+    :rtype: (str, bool)
+    """
+
+    lower, upper = biomass_bounds
+    minimum = threshold + GROWTH_TOLERANCE
+    if upper < minimum:
+        return 'nofeas', False
+
+    coefficient = problem.objective_coefficient(biomass_column)
+    problem.col_bounds({biomass_column: (max(lower, minimum), upper)})
+    problem.objective_coefficients({biomass_column: 0.0})
+    status, value = problem.solve()
+    problem.col_bounds({biomass_column: (lower, upper)})
+    problem.objective_coefficients({biomass_column: coefficient})
+    return status, status in ('opt', 'feas')
+
+
+def run_fba(modeldata, reactions_to_run, media, biomass_equation, uptake_secretion=None, problem=None,
+            backend=None, cache=None, presolve=False, growth_only=False, parsimonious=False, verbose=False):
     """
     Run an fba for a set of data. We required the reactions object,
     a list of reactions to run, the media, and the biomass_equation equation.
@@ -20,6 +61,28 @@ def run_fba(modeldata, reactions_to_run, media, biomass_equation, uptake_secreti
     :param uptake_secretion: A hash of uptake and secretion reactions that should be added to the model.
     Calculated if not provided.
     :type uptake_secretion: dict of Reaction
+    :param problem: the linear programming problem to use. Each problem is independent, so you can run
+    more than one FBA at a time by giving each its own PyFBA.lp.LPProblem. Default: PyFBA.lp.default_problem
+    :type problem: PyFBA.lp.LPProblem
+    :param backend: the linear programming backend (e.g. glpk or highs) to use for a new problem if problem is
+    not provided. Default: use PyFBA.lp.default_problem
+    :type backend: str
+    :param cache: the cache of compiled stoichiometric matrices. If we have run this model (the same reactions
+    with the same bounds, media, and biomass equation) before, we load the matrix and bounds from the cache rather
+    than building them again. Use False to always build the matrix. The cache is not used if uptake_secretion is
+    provided. Default: PyFBA.fba.default_cache
+    :type cache: PyFBA.fba.StoichiometryCache | bool
+    :param presolve: remove the reactions that can not carry any flux before we solve the LP (see PyFBA.fba.presolve).
+    The removed reactions are not in the problem, so use a PyFBA.fba.FBASession if you need their (zero) fluxes
+    :type presolve: bool
+    :param growth_only: only test whether the model grows (see feasible_growth). This is faster than finding the
+    maximum biomass flux, but the value that is returned is None
+    :type growth_only: bool
+    :param parsimonious: once we have the optimal biomass flux, find the flux distribution with the smallest total
+    flux (see PyFBA.fba.parsimonious_fba). The value that is returned is still the biomass flux, and the fluxes are
+    in the problem (see PyFBA.fba.reaction_fluxes). If the parsimonious step does not solve, the fluxes in the problem
+    are the FBA fluxes
+    :type parsimonious: bool
     :param verbose: Print more output
     :type verbose: bool
     :return: which type of linear resolution, the output value of the model, whether the model grew
@@ -27,11 +90,30 @@ def run_fba(modeldata, reactions_to_run, media, biomass_equation, uptake_secreti
 
     """
 
-    cp, rc, upsr = PyFBA.fba.create_stoichiometric_matrix(reactions_to_run, modeldata, media,
-                                                          biomass_equation, uptake_secretion, verbose=verbose)
+    if problem is None:
+        if backend is None:
+            problem = lp.get_default_problem()
+        else:
+            problem = lp.new_problem(backend)
 
-    rbvals = PyFBA.fba.reaction_bounds(modeldata.reactions, rc, media, verbose=verbose)
-    PyFBA.fba.compound_bounds(cp)
+    if cache is not False and not uptake_secretion:
+        cp, rc, upsr, rbvals = load_model(modeldata, reactions_to_run, media, biomass_equation, problem, cache=cache,
+                                          presolve=presolve, split=parsimonious, verbose=verbose)
+    elif presolve or parsimonious:
+        network = PyFBA.fba.CompiledNetwork.compile(modeldata, reactions_to_run, media, biomass_equation,
+                                                    uptake_secretion, verbose=verbose)
+        if presolve:
+            network = network.presolve(verbose=verbose)
+        network.load(problem, split=parsimonious, verbose=verbose)
+        cp, rc, upsr, rbvals = network.compounds, network.reactions, network.uptake_secretion, network.reaction_bounds
+    else:
+        cp, rc, upsr = PyFBA.fba.create_stoichiometric_matrix(reactions_to_run, modeldata, media,
+                                                              biomass_equation, uptake_secretion, problem=problem,
+                                                              verbose=verbose)
+
+        rbvals = PyFBA.fba.reaction_bounds(modeldata.reactions, rc, media, problem=problem, uptake_secretion=upsr,
+                                           verbose=verbose)
+        PyFBA.fba.compound_bounds(cp, problem=problem)
 
     if verbose:
         log_and_message(f"Length of the media: {len(media)}", stderr=verbose)
@@ -41,10 +123,21 @@ def run_fba(modeldata, reactions_to_run, media, biomass_equation, uptake_secreti
         log_and_message(f"Number of uptake/secretion reactions {len(upsr)}", stderr=verbose)
         log_and_message(f"SMat dimensions: {len(cp)} x {len(rc)}", stderr=verbose)
 
-    status, value = PyFBA.lp.solve()
+    if growth_only:
+        status, growth = feasible_growth(problem, len(rc) - 1, rbvals[rc[-1]])
+        return status, None, growth
+
+    status, value = problem.solve()
+    if parsimonious and status == 'opt':
+        pstatus, total = PyFBA.fba.parsimonious_fba(problem, len(rc) - 1, rbvals[rc[-1]], value, verbose=verbose)
+        if pstatus != 'opt':
+            # the fluxes in the problem are from the failed pFBA, so solve the FBA again to get its fluxes back
+            log_and_message(f"Parsimonious FBA did not solve ({pstatus}), so we use the FBA fluxes", stderr=True,
+                            loglevel="WARN")
+            status, value = problem.solve()
 
     growth = False
-    if value > 1:
+    if value > GROWTH_THRESHOLD:
         growth = True
 
     return status, value, growth
@@ -0,0 +1,207 @@
+"""
+Test the growth of a model on many different media.
+
+The network is only compiled once, for all the media together, and the bounds of the uptake and secretion
+reactions are calculated once for each media (see PyFBA.fba.MediaBounds). Between media we just change those
+bounds (see FBASession.set_media). The media can be split over several
+processes, and each process loads the compiled network into its own FBASession.
+
+grow_on_media yields the result for each media as soon as we have it, so the caller can stop early when the
+remaining media can not change their decision (see PyFBA.gapfill.calculate_precision_recall).
+"""
+
+import os
+from functools import partial
+from multiprocessing import Pool
+
+import PyFBA
+from PyFBA import log_and_message
+
+# the FBASession for this worker process. This is set by _init_worker
+_session = None
+
+
+def _init_worker(network, media, backend, compress):
+    """
+    Load the network into an FBASession for this worker process and calculate the bounds for each media
+
+    :param network: the reactions compiled with the compounds from all the media
+    :type network: PyFBA.fba.CompiledNetwork
+    :param media: a dict of media name and the media compounds
+    :type media: dict[str, set[PyFBA.metabolism.CompoundWithLocation]]
+    :param backend: the linear programming backend to use
+    :type backend: str
+    :param compress: merge the reactions whose fluxes are coupled
+    :type compress: bool
+    """
+    global _session
+    _session = _load_session(network, media, backend, compress)
+
+
+def _load_session(network, media, backend, compress, verbose=False):
+    """
+    Load the network into an FBASession and add the bounds of the uptake and secretion reactions for each media
+
+    :param network: the reactions compiled with the compounds from all the media
+    :type network: PyFBA.fba.CompiledNetwork
+    :param media: a dict of media name and the media compounds
+    :type media: dict[str, set[PyFBA.metabolism.CompoundWithLocation]]
+    :param backend: the linear programming backend to use
+    :type backend: str
+    :param compress: merge the reactions whose fluxes are coupled
+    :type compress: bool
+    :param verbose: more output
+    :type verbose: bool
+    :return: the FBA session
+    :rtype: PyFBA.fba.FBASession
+    """
+    session = PyFBA.fba.FBASession(network=network, backend=backend, compress=compress, verbose=verbose)
+    for m, compounds in media.items():
+        session.media_bounds.add(m, compounds)
+    return session
+
+
+def _compile(modeldata, reactions, media, biomass_equation, verbose=False):
+    """
+    Compile the network with the uptake and secretion reactions for all the media
+
+    :param modeldata: the model seed object that includes compounds and reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param reactions: the reactions in the model
+    :type reactions: set[str]
+    :param media: a dict of media name and the media compounds
+    :type media: dict[str, set[PyFBA.metabolism.CompoundWithLocation]]
+    :param biomass_equation: the biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param verbose: more output
+    :type verbose: bool
+    :return: the compiled network
+    :rtype: PyFBA.fba.CompiledNetwork
+    """
+    allmedia = set()
+    for m in media.values():
+        allmedia.update(m)
+    return PyFBA.fba.CompiledNetwork.compile(modeldata, reactions, allmedia, biomass_equation, verbose=verbose)
+
+
+def _grow(session, media_name, growth_only=False):
+    """
+    Switch the session to the media and solve the FBA
+
+    :param session: the FBA session with the bounds for the media
+    :type session: PyFBA.fba.FBASession
+    :param media_name: the name of the media
+    :type media_name: str
+    :param growth_only: only test whether we grow (see FBASession.grows). The biomass flux is None
+    :type growth_only: bool
+    :return: the media name, the biomass flux and whether we grew
+    :rtype: (str, float, bool)
+    """
+    session.set_media(media_name)
+    if growth_only:
+        return media_name, None, session.grows()
+    status, value, growth = session.solve()
+    return media_name, value, growth
+
+
+def _worker_grow(media_name, growth_only=False):
+    """
+    Grow on the media using the session for this worker process
+
+    :param media_name: the name of the media
+    :type media_name: str
+    :param growth_only: only test whether we grow
+    :type growth_only: bool
+    :return: the media name, the biomass flux and whether we grew
+    :rtype: (str, float, bool)
+    """
+    return _grow(_session, media_name, growth_only)
+
+
+def grow_on_media(modeldata, reactions, media, biomass_equation, processes=1, backend=None, compress=False,
+                  growth_only=False, verbose=False):
+    """
+    Test whether the reactions grow on each of the media, and yield the results as soon as we have them. With more
+    than one process the results are not in the order of the media. If you stop early (e.g. break out of the loop
+    or close the generator), we stop the worker processes and do not test the rest of the media.
+
+    :param modeldata: the model seed object that includes compounds and reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param reactions: the reactions in the model
+    :type reactions: set[str]
+    :param media: a dict of media name and the media compounds
+    :type media: dict[str, set[PyFBA.metabolism.CompoundWithLocation]]
+    :param biomass_equation: the biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param processes: the number of processes to use. Default: 1 (run in this process). Use None for the number
+    of CPUs
+    :type processes: int
+    :param backend: the linear programming backend (e.g. glpk or highs). Default: PyFBA.lp.default_backend()
+    :type backend: str
+    :param compress: merge the reactions whose fluxes are fully coupled into single columns (see screen_media)
+    :type compress: bool
+    :param growth_only: only test whether we grow, without finding the maximum biomass flux (see
+    PyFBA.fba.feasible_growth). The biomass flux is None
+    :type growth_only: bool
+    :param verbose: more output
+    :type verbose: bool
+    :return: the media name, the biomass flux and whether we grew, for each media
+    :rtype: Iterator[(str, float, bool)]
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(media)))
+    log_and_message(f"Testing {len(reactions)} reactions on {len(media)} media using {processes} processes",
+                    stderr=verbose)
+
+    network = _compile(modeldata, reactions, media, biomass_equation, verbose=verbose)
+    if processes == 1:
+        session = _load_session(network, media, backend, compress, verbose=verbose)
+        for m in media:
+            yield _grow(session, m, growth_only)
+        return
+
+    with Pool(processes, initializer=_init_worker,
+              initargs=(network, media, backend, compress)) as pool:
+        yield from pool.imap_unordered(partial(_worker_grow, growth_only=growth_only), list(media))
+
+
+def screen_media(modeldata, reactions, media_names, biomass_equation, processes=1, backend=None, compress=False,
+                 verbose=False):
+    """
+    Test whether the reactions grow on each of the media.
+
+    :param modeldata: the model seed object that includes compounds and reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param reactions: the reactions in the model
+    :type reactions: set[str]
+    :param media_names: the media to test. These can be the names of the media provided with PyFBA, or media
+    files. Use None to test all the media provided with PyFBA
+    :type media_names: list[str]
+    :param biomass_equation: the biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param processes: the number of processes to use. Default: 1 (run in this process). Use None for the number
+    of CPUs
+    :type processes: int
+    :param backend: the linear programming backend (e.g. glpk or highs). Default: PyFBA.lp.default_backend()
+    :type backend: str
+    :param compress: merge the reactions whose fluxes are fully coupled into single columns (see
+    PyFBA.fba.compress). The uptake and secretion reactions are never merged, so this does not change the results
+    :type compress: bool
+    :param verbose: more output
+    :type verbose: bool
+    :return: a dict of media name and the biomass flux and whether we grew on that media
+    :rtype: dict[str, (float, bool)]
+    """
+
+    if media_names is None:
+        media_names = sorted(PyFBA.parse.read_media.media_files())
+    media = {m: PyFBA.parse.read_media.find_media_file(m, modeldata, verbose=verbose) for m in media_names}
+
+    results = {}
+    for m, value, growth in grow_on_media(modeldata, reactions, media, biomass_equation, processes=processes,
+                                          backend=backend, compress=compress, verbose=verbose):
+        results[m] = (value, growth)
+        log_and_message(f"Media {m} has a biomass flux value of {value} --> Growth: {growth}", stderr=verbose)
+    return results
@@ -0,0 +1,258 @@
+import numpy as np
+
+import PyFBA
+from PyFBA import log_and_message
+
+
+class FBASession:
+    """
+    A persistent FBA problem over a fixed universe of reactions.
+
+    The stoichiometric matrix for all the candidate reactions is built and loaded into the
+    linear solver once. Reactions are then switched off by setting their bounds to (0, 0) and
+    switched back on by restoring their original bounds, so repeated FBAs that only differ by
+    a few reactions (e.g. during gapfilling or creating gaps) do not need to rebuild the model.
+
+    Because the uptake and secretion reactions are calculated for every compound in the
+    universe, solving with a subset of reactions enabled gives the same result as running
+    PyFBA.fba.run_fba with just that subset.
+
+    :ivar modeldata: the model seed object that includes compounds and reactions
+    :ivar media: the media compounds
+    :ivar biomass_equation: the biomass equation
+    :ivar full_network: the PyFBA.fba.CompiledNetwork of the universe of reactions
+    :ivar network: the network that is loaded into the solver. This is smaller than full_network if we presolved
+    :ivar removed: the reactions that were removed by presolving. These are always off
+    :ivar columns: a dict of reaction id and its column in the problem. Reactions that were merged by compressing
+    the network share a column
+    :ivar problem: the PyFBA.lp.LPProblem that this session owns
+    :ivar compounds: the sorted list of compounds (rows) in the matrix
+    :ivar reactions: the list of reactions (columns) in the matrix, including uptake/secretion and biomass
+    :ivar uptake_secretion: the uptake and secretion reactions that were added to the model
+    :ivar default_bounds: the bounds of each reaction when it is switched on
+    :ivar media_bounds: the PyFBA.fba.MediaBounds of the uptake and secretion reactions for each media
+    :ivar exchange_bounds: the current lower and upper bounds of the uptake and secretion reactions
+    :ivar disabled: the set of reactions that are currently switched off
+    """
+
+    def __init__(self, modeldata=None, reactions=None, media=None, biomass_equation=None, uptake_secretion=None,
+                 enabled=None, problem=None, backend=None, network=None, presolve=False, compress=False,
+                 verbose=False):
+        """
+        Build the stoichiometric matrix for the universe of reactions and load it into the solver. If you
+        have already compiled the network (e.g. in another process) you can just provide that instead.
+
+        :param modeldata: the model seed object that includes compounds and reactions
+        :type modeldata: PyFBA.model_seed.ModelData
+        :param reactions: all the reactions that we may want to enable during this session
+        :type reactions: set[str]
+        :param media: the media compounds
+        :type media: set[PyFBA.metabolism.CompoundWithLocation]
+        :param biomass_equation: the biomass equation
+        :type biomass_equation: PyFBA.metabolism.Reaction
+        :param uptake_secretion: An optional hash of uptake and secretion reactions. Calculated if not provided.
+        :type uptake_secretion: dict[str, PyFBA.metabolism.Reaction]
+        :param enabled: the reactions that are enabled at the start. Default: all the reactions
+        :type enabled: set[str]
+        :param problem: the linear programming problem to use. Default: a new problem using backend
+        :type problem: PyFBA.lp.LPProblem
+        :param backend: the linear programming backend (e.g. glpk or highs) if problem is not provided.
+        Default: PyFBA.lp.default_backend()
+        :type backend: str
+        :param network: the compiled universe of reactions. If provided, modeldata, reactions, media,
+        biomass_equation, and uptake_secretion are not needed
+        :type network: PyFBA.fba.CompiledNetwork
+        :param presolve: remove the reactions that can not carry any flux before loading the network (see
+        PyFBA.fba.presolve). Switching reactions off can only block more reactions, so this does not change the
+        results, but changing the media to include compounds that were not in the original media may.
+        :type presolve: bool
+        :param compress: merge the reactions whose fluxes are fully coupled into single columns (see
+        PyFBA.fba.compress). Switching off any reaction in a merged column switches off the whole column
+        :type compress: bool
+        :param verbose: more output
+        :type verbose: bool
+        """
+
+        if network is None:
+            network = PyFBA.fba.CompiledNetwork.compile(modeldata, set(reactions), media, biomass_equation,
+                                                        uptake_secretion, verbose=verbose)
+        self.full_network = network
+        if presolve:
+            network = network.presolve(verbose=verbose)
+        if compress:
+            network = network.compress(verbose=verbose)
+        self.modeldata = modeldata
+        self.network = network
+        self.media = network.media
+        self.biomass_equation = network.biomass_equation
+        self.verbose = verbose
+        if problem is None:
+            problem = PyFBA.lp.new_problem(backend)
+        self.problem = problem
+        network.load(problem, verbose=verbose)
+
+        self.compounds = network.compounds
+        self.reactions = network.reactions
+        self.uptake_secretion = network.uptake_secretion
+        self.universe = set(self.full_network.reactions).difference(self.full_network.uptake_secretion)
+        self.universe.discard('BIOMASS_EQN')
+        self.removed = set(network.removed)
+
+        self.index = network.reaction_index
+        # the column of every reaction, including those that were merged, and the reactions in each merged column
+        self.columns = dict(self.index)
+        self.members = {}
+        for r, merged in network.coupled.items():
+            self.members[self.index[r]] = [r] + [m for m, f in merged]
+            for m, f in merged:
+                self.columns[m] = self.index[r]
+        self.default_bounds = list(zip(network.lower.tolist(), network.upper.tolist()))
+        self.media_bounds = PyFBA.fba.MediaBounds(network)
+        self.exchange_bounds = (network.lower[self.media_bounds.columns], network.upper[self.media_bounds.columns])
+        self.changed_bounds = {}
+        self.disabled = set()
+
+        log_and_message(f"FBA session loaded {len(self.compounds)} compounds and {len(self.reactions)} reactions",
+                        stderr=verbose)
+
+        if enabled is not None:
+            self.disable(self.universe.difference(enabled))
+
+    def _check(self, rxns):
+        """
+        Make sure that all the reactions are in this session
+
+        :param rxns: the reactions to check
+        :type rxns: set[str]
+        """
+        missing = [r for r in rxns if r not in self.columns and r not in self.removed]
+        if missing:
+            raise ValueError(f"Can not change {len(missing)} reactions that are not part of the session: " +
+                             ", ".join(missing[:10]))
+
+    def disable(self, rxns):
+        """
+        Switch off the reactions by setting their bounds to (0, 0)
+
+        :param rxns: the reactions to switch off
+        :type rxns: set[str]
+        """
+        self._check(rxns)
+        for r in rxns:
+            self.disabled.add(r)
+            if r in self.columns:
+                self.changed_bounds[self.columns[r]] = (0, 0)
+
+    def enable(self, rxns):
+        """
+        Switch reactions back on by restoring their original bounds
+
+        :param rxns: the reactions to switch on
+        :type rxns: set[str]
+        """
+        self._check(rxns)
+        for r in rxns:
+            self.disabled.discard(r)
+        for r in rxns:
+            if r not in self.columns:
+                continue
+            j = self.columns[r]
+            # a merged column stays off while any of its reactions are off
+            if j not in self.members or self.disabled.isdisjoint(self.members[j]):
+                self.changed_bounds[j] = self.default_bounds[j]
+
+    def set_reactions(self, rxns):
+        """
+        Enable exactly these reactions and disable every other reaction in the universe. The uptake/secretion
+        reactions and the biomass equation are not affected.
+
+        :param rxns: the reactions to enable
+        :type rxns: set[str]
+        """
+        rxns = set(rxns)
+        self._check(rxns)
+        self.disable(self.universe.difference(rxns).difference(self.disabled))
+        self.enable(self.disabled.intersection(rxns))
+
+    def set_media(self, media):
+        """
+        Change the media that we grow on. Only the bounds of the uptake and secretion reactions change: the
+        compounds in the media can be taken up and secreted, and everything else can only be secreted.
+
+        Media compounds that are not part of any reaction in the session do not have an uptake and secretion
+        reaction, but they could not be used anyway, so this gives the same result as loading the session
+        with the new media.
+
+        If you switch between the same media many times, add them to media_bounds once and use their names.
+
+        :param media: the new media compounds, or the name of a media in media_bounds
+        :type media: set[PyFBA.metabolism.CompoundWithLocation] | str
+        """
+        if isinstance(media, str):
+            lower, upper = self.media_bounds[media]
+            media = self.media_bounds.media[media]
+        else:
+            lower, upper = self.media_bounds.calculate(media)
+        columns = self.media_bounds.columns
+        current_lower, current_upper = self.exchange_bounds
+        for k in np.flatnonzero((lower != current_lower) | (upper != current_upper)).tolist():
+            bounds = (lower.item(k), upper.item(k))
+            self.default_bounds[columns.item(k)] = bounds
+            self.changed_bounds[columns.item(k)] = bounds
+        self.exchange_bounds = (lower, upper)
+        self.media = media
+
+    def enabled(self):
+        """
+        The reactions from the universe that are currently switched on
+
+        :return: the enabled reactions
+        :rtype: set[str]
+        """
+        return self.universe.difference(self.disabled)
+
+    def solve(self):
+        """
+        Solve the FBA with the currently enabled reactions
+
+        :return: which type of linear resolution, the output value of the model, whether the model grew
+        :rtype: (str, float, bool)
+        """
+        if self.changed_bounds:
+            # only the columns that we have switched off or on are passed to the solver
+            self.problem.col_bounds(self.changed_bounds)
+            self.changed_bounds = {}
+
+        status, value = self.problem.solve()
+
+        growth = False
+        if value > PyFBA.fba.GROWTH_THRESHOLD:
+            growth = True
+
+        return status, value, growth
+
+    def grows(self):
+        """
+        Test whether the currently enabled reactions grow, without finding the maximum biomass flux. This is
+        faster than solve when we only need to know whether we grow (see PyFBA.fba.feasible_growth)
+
+        :return: whether the model grew
+        :rtype: bool
+        """
+        if self.changed_bounds:
+            self.problem.col_bounds(self.changed_bounds)
+            self.changed_bounds = {}
+
+        biomass = len(self.reactions) - 1
+        status, growth = PyFBA.fba.feasible_growth(self.problem, biomass, self.default_bounds[biomass])
+        return growth
+
+    def fluxes(self):
+        """
+        The reaction fluxes from the last time we solved this session
+
+        :return: A mapping of reaction ID and flux through that reaction
+        :rtype: PyFBA.fba.FluxVector
+        """
+        return PyFBA.fba.reaction_fluxes(problem=self.problem, removed=self.network.removed,
+                                         coupled=self.network.coupled)
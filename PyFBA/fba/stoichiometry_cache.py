@@ -0,0 +1,193 @@
+"""
+A cache of compiled networks.
+
+We often run the FBA on exactly the same reactions, media, and biomass equation more than once (e.g.
+when we test the same set of reactions again during gapfilling). Building the stoichiometric matrix is
+the slow part of running the FBA, so we keep the CompiledNetwork (the matrix, the order of the rows and
+columns, and the bounds), and just load it into the solver the next time we see the same model.
+
+The cache is keyed on a hash of the model data and its version, the reaction IDs and their bounds, the media
+compounds, and the biomass equation, and has a memory budget. Gapfilling changes the bounds of reactions (see
+PyFBA.metabolism.Reaction.reset_bounds), so a model whose bounds have changed is compiled again rather than
+loaded from the cache. When the cache is full we drop the entries that have not been used for the longest
+time.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from PyFBA import log_and_message
+from .bounds import direction_bounds
+from .compiled_network import CompiledNetwork
+
+
+class StoichiometryCache:
+    """
+    A least recently used cache of compiled networks.
+
+    :ivar max_bytes: the approximate maximum memory that the cache can use
+    :ivar nbytes: the approximate memory the cache is using
+    :ivar hits: the number of times we found the network in the cache
+    :ivar misses: the number of times we had to build the network
+    :ivar evictions: the number of networks that we removed to keep within the memory budget
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """
+        Create a new cache
+
+        :param max_bytes: the approximate maximum memory that the cache can use. Set to 0 to disable the cache
+        :type max_bytes: int
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(modeldata, reactions, media, biomass_equation):
+        """
+        A stable hash of the model. This does not depend on the order of the reactions or media. The bounds of
+        each reaction are part of the key, using the bounds from its direction if it does not have any yet (see
+        PyFBA.fba.direction_bounds), so the key does not change when we compile the model and store its bounds.
+
+        :param modeldata: the model seed object that includes compounds and reactions
+        :type modeldata: PyFBA.model_seed.ModelData
+        :param reactions: the reactions to run
+        :type reactions: set[str]
+        :param media: the media compounds
+        :type media: set[PyFBA.metabolism.CompoundWithLocation]
+        :param biomass_equation: the biomass equation
+        :type biomass_equation: PyFBA.metabolism.Reaction
+        :return: the key for this model
+        :rtype: str
+        """
+        h = hashlib.sha1()
+        # different model data objects, or versions of them, may have different reactions with the same ids
+        h.update(f"{modeldata.uid}\t{modeldata.version}\t{modeldata.organism_type}\n".encode())
+        for r in sorted(reactions):
+            rxn = modeldata.reactions.get(r)
+            if rxn is None:
+                bounds = None
+            elif rxn.lower_bound is not None and rxn.upper_bound is not None:
+                bounds = (float(rxn.lower_bound), float(rxn.upper_bound))
+            else:
+                bounds = tuple(map(float, direction_bounds(rxn.direction)))
+            h.update(f"{r} {bounds}\t".encode())
+        h.update(b"\n")
+        h.update("\t".join(sorted(f"{c.id}|{c.name}|{c.location}" for c in media)).encode())
+        h.update(b"\n")
+        h.update(biomass_equation.id.encode())
+        for c in sorted(biomass_equation.left_compounds, key=str):
+            h.update(f"\t-{biomass_equation.get_left_compound_abundance(c)} {c}".encode())
+        for c in sorted(biomass_equation.right_compounds, key=str):
+            h.update(f"\t+{biomass_equation.get_right_compound_abundance(c)} {c}".encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        """
+        Get a compiled network from the cache
+
+        :param key: the key for the model
+        :type key: str
+        :return: the compiled network or None if it is not in the cache
+        :rtype: CompiledNetwork
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, compiled):
+        """
+        Add a compiled network to the cache, removing the least recently used networks if we are over budget
+
+        :param key: the key for the model
+        :type key: str
+        :param compiled: the compiled network
+        :type compiled: CompiledNetwork
+        """
+        if compiled.nbytes > self.max_bytes:
+            return
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key).nbytes
+        self.entries[key] = compiled
+        self.nbytes += compiled.nbytes
+        while self.nbytes > self.max_bytes:
+            k, old = self.entries.popitem(last=False)
+            self.nbytes -= old.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Remove everything from the cache. This does not reset the statistics
+        """
+        self.entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """
+        The cache statistics
+
+        :return: a dict of the number of hits, misses, evictions, entries, and the approximate memory used
+        :rtype: dict[str, int]
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self.entries), 'bytes': self.nbytes}
+
+
+# the cache that run_fba uses by default
+default_cache = StoichiometryCache()
+
+
+def load_model(modeldata, reactions, media, biomass_equation, problem, cache=None, presolve=False, split=False,
+               verbose=False):
+    """
+    Load a model into the problem, using the compiled network from the cache if we have seen this model before.
+    Otherwise we compile the network and add it to the cache.
+
+    :param modeldata: the model seed object that includes compounds and reactions
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param reactions: the reactions to run
+    :type reactions: set[str]
+    :param media: the media compounds
+    :type media: set[PyFBA.metabolism.CompoundWithLocation]
+    :param biomass_equation: the biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param problem: the linear programming problem to load the model into
+    :type problem: PyFBA.lp.LPProblem
+    :param cache: the cache to use. Default: PyFBA.fba.default_cache
+    :type cache: StoichiometryCache
+    :param presolve: load the network without the reactions that can not carry any flux (see PyFBA.fba.presolve)
+    :type presolve: bool
+    :param split: split the reversible reactions into a forward and a reverse column (see PyFBA.fba.parsimonious_fba)
+    :type split: bool
+    :param verbose: more output
+    :type verbose: bool
+    :return: the compounds, the reactions including uptake/secretion and biomass, the uptake and secretion
+    reactions, and the reaction bounds
+    :rtype: (list, list, dict, dict)
+    """
+
+    if cache is None:
+        cache = default_cache
+
+    key = cache.key(modeldata, reactions, media, biomass_equation)
+    network = cache.get(key)
+    if network is None:
+        network = CompiledNetwork.compile(modeldata, reactions, media, biomass_equation, verbose=verbose)
+        cache.put(key, network)
+    else:
+        log_and_message(f"Loaded a model with {len(network.compounds)} compounds and {len(network.reactions)} " +
+                        "reactions from the cache", stderr=verbose)
+    if presolve:
+        network = network.presolve(verbose=verbose)
+    network.load(problem, split=split, verbose=verbose)
+    return network.compounds, network.reactions, network.uptake_secretion, network.reaction_bounds
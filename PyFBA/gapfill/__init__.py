@@ -14,6 +14,9 @@ from .ecnumbers import suggest_reactions_using_ec
 from .linked_reactions import suggest_linked_reactions
 from .gapfill import gapfill
 from .gapfill_two_media import gapfill_two_media
+from .global_gapfill import global_gapfill, stage_weights
+from .ddmin import ddmin
+from .checkpoint import Checkpoint, media_digest, model_digest
 
 __all__ = ['suggest_reactions_using_ec',
            'suggest_from_media',
@@ -25,5 +28,6 @@ __all__ = ['suggest_reactions_using_ec',
            'bisect', 'percent_split', 'optimize_split_by_rclust', 'minimize_by_accuracy',
            'calculate_precision_recall',
             'suggest_linked_reactions', 'gapfill',
-           'gapfill_two_media'
+           'gapfill_two_media', 'global_gapfill', 'stage_weights', 'ddmin', 'Checkpoint',
+           'media_digest', 'model_digest'
            ]
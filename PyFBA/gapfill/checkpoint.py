@@ -0,0 +1,231 @@
+"""
+Save the progress of a long gapfilling run so that we can resume it if the job is killed.
+
+A Checkpoint is a JSON file with the reactions that we ran after each gapfilling step and the result, the
+suggested reactions from each step, the reactions that we kept when we minimized each step, and the sets of
+reactions that the growth oracles know grow or do not grow (see PyFBA.fba.GrowthOracle). We save the file after
+every step by writing a temporary file in the same directory and renaming it, so the checkpoint is always
+complete even if the job is killed while we are saving it.
+
+To resume, run the gapfilling again with the same checkpoint. Making the suggestions is quick, and it resets the
+bounds of the suggested reactions again, but a step that runs exactly the same reactions as before uses the
+saved result rather than running the FBA or minimizing the reactions again. If the reactions are different (e.g.
+because you changed the input) the saved result is ignored. The checkpoint also has a digest of the media and the
+biomass equation, and we will not resume from a checkpoint that was saved with a different media or biomass
+equation, because none of its results would be right.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from PyFBA import log_and_message
+
+
+def _digest(reactions):
+    """
+    A short digest of a set of reactions, to check whether we ran the same reactions
+
+    :param reactions: the reactions
+    :type reactions: set[str]
+    :return: the digest
+    :rtype: str
+    """
+    return hashlib.sha1("\n".join(sorted(reactions)).encode()).hexdigest()
+
+
+def media_digest(media):
+    """
+    A short digest of the compounds in a media, to name the growth oracle for that media (see Checkpoint.watch)
+
+    :param media: the media compounds
+    :type media: set[PyFBA.metabolism.CompoundWithLocation]
+    :return: the digest
+    :rtype: str
+    """
+    return _digest(str(c) for c in media)
+
+
+def model_digest(media, biomass_equation):
+    """
+    A short digest of the media and the biomass equation, to check that we resume the same gapfilling
+
+    :param media: the media compounds, or a dict of media name and compounds if we gapfill on more than one media
+    :type media: set[PyFBA.metabolism.CompoundWithLocation] | dict[str, set[PyFBA.metabolism.CompoundWithLocation]]
+    :param biomass_equation: the biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :return: the digest
+    :rtype: str
+    """
+    if isinstance(media, dict):
+        media = {f"{name}: {media_digest(m)}" for name, m in media.items()}
+    else:
+        media = {str(c) for c in media or []}
+    biomass = set()
+    if biomass_equation is not None:
+        biomass.update(f"left {c} {biomass_equation.get_left_compound_abundance(c)}"
+                       for c in biomass_equation.left_compounds)
+        biomass.update(f"right {c} {biomass_equation.get_right_compound_abundance(c)}"
+                       for c in biomass_equation.right_compounds)
+    return _digest([_digest(media), _digest(biomass)])
+
+
+class Checkpoint:
+    """
+    The saved progress of a gapfilling run.
+
+    :ivar path: the JSON file that we save to. If this is None we do not save anything
+    :ivar model: the digest of the media and biomass equation that we are gapfilling with (see model_digest)
+    :ivar reactions: the reactions that we ran in the most recent step
+    :ivar added_reactions: the steps and the reactions they suggested, up to the most recent step
+    :ivar steps: a dict of step and the digest of the reactions that we ran and the result
+    :ivar minimized: a dict of step and the digests of the base and suggested reactions, and the reactions we kept
+    :ivar oracles: a dict of name and the sets of reactions that growth oracle knows (see PyFBA.fba.GrowthOracle.dump)
+    """
+
+    def __init__(self, path=None, media=None, biomass_equation=None, verbose=False):
+        """
+        Start a checkpoint, and load it from the file if it exists
+
+        :param path: the JSON file to save the checkpoint in
+        :type path: str
+        :param media: the media compounds, or a dict of media name and compounds if we gapfill on more than one media
+        :type media: set[PyFBA.metabolism.CompoundWithLocation] | dict[str, set]
+        :param biomass_equation: the biomass equation
+        :type biomass_equation: PyFBA.metabolism.Reaction
+        :param verbose: more output
+        :type verbose: bool
+        :raises ValueError: if the checkpoint in the file was saved with a different media or biomass equation
+        """
+        self.path = path
+        self.model = model_digest(media, biomass_equation)
+        self.verbose = verbose
+        self.reactions = set()
+        self.added_reactions = []
+        self.steps = {}
+        self.minimized = {}
+        self.oracles = {}
+        self._watched = {}
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('model') != self.model:
+                raise ValueError(f"The checkpoint in {path} was saved with a different media or biomass equation. "
+                                 "Please use a new checkpoint file")
+            self.reactions = set(data['reactions'])
+            self.added_reactions = [(how, set(new)) for how, new in data['added_reactions']]
+            self.steps = data['steps']
+            self.minimized = data['minimized']
+            self.oracles = data['oracles']
+            log_and_message(f"Resuming from {path}: {len(self.steps)} gapfilling steps and {len(self.minimized)} " +
+                            "minimized steps", stderr=verbose)
+
+    def result(self, step, reactions):
+        """
+        The saved result of a step, if we ran exactly these reactions
+
+        :param step: the gapfilling step
+        :type step: str
+        :param reactions: the reactions that we are about to run
+        :type reactions: set[str]
+        :return: the result, or None if we do not have one
+        :rtype: bool | dict | None
+        """
+        saved = self.steps.get(step)
+        if saved is None or saved['reactions'] != _digest(reactions):
+            return None
+        log_and_message(f"Using the saved result of {step} from the checkpoint", stderr=self.verbose)
+        return saved['result']
+
+    def record_step(self, step, reactions, added_reactions, result):
+        """
+        Save the reactions, the suggestions, and the result of a step
+
+        :param step: the gapfilling step
+        :type step: str
+        :param reactions: the reactions that we ran
+        :type reactions: set[str]
+        :param added_reactions: the steps and the reactions they suggested
+        :type added_reactions: list[(str, set[str])]
+        :param result: whether we grew, or another result that can be saved as JSON
+        :type result: bool | dict
+        """
+        self.reactions = set(reactions)
+        self.added_reactions = [(how, set(new)) for how, new in added_reactions]
+        self.steps[step] = {'reactions': _digest(reactions), 'result': result}
+        self.save()
+
+    def required(self, step, base_reactions, new_reactions):
+        """
+        The reactions that we kept when we minimized a step, if we minimized exactly these reactions
+
+        :param step: the gapfilling step
+        :type step: str
+        :param base_reactions: the reactions that we always include
+        :type base_reactions: set[str]
+        :param new_reactions: the reactions that the step suggested
+        :type new_reactions: set[str]
+        :return: the reactions that we kept, or None if we have not minimized these reactions
+        :rtype: set[str] | None
+        """
+        saved = self.minimized.get(step)
+        if saved is None or saved['base'] != _digest(base_reactions) or saved['new'] != _digest(new_reactions):
+            return None
+        log_and_message(f"Using the {len(saved['required'])} reactions from {step} that we kept in the checkpoint",
+                        stderr=self.verbose)
+        return set(saved['required'])
+
+    def record_required(self, step, base_reactions, new_reactions, required):
+        """
+        Save the reactions that we kept when we minimized a step
+
+        :param step: the gapfilling step
+        :type step: str
+        :param base_reactions: the reactions that we always include
+        :type base_reactions: set[str]
+        :param new_reactions: the reactions that the step suggested
+        :type new_reactions: set[str]
+        :param required: the reactions that we kept
+        :type required: set[str]
+        """
+        self.minimized[step] = {'base': _digest(base_reactions), 'new': _digest(new_reactions),
+                                'required': sorted(required)}
+        self.save()
+
+    def watch(self, name, oracle):
+        """
+        Load the sets of reactions that we saved for this growth oracle, and save them every time we save
+
+        :param name: the name of the oracle in the checkpoint. Each media needs its own oracle, so this should
+        include the media name, or its digest (see media_digest)
+        :type name: str
+        :param oracle: the growth oracle
+        :type oracle: PyFBA.fba.GrowthOracle
+        """
+        if name in self.oracles:
+            oracle.load(self.oracles[name])
+        self._watched[name] = oracle
+
+    def save(self):
+        """
+        Write the checkpoint to a temporary file and then rename it, so the file is never incomplete
+        """
+        if not self.path:
+            return
+        for name, oracle in self._watched.items():
+            self.oracles[name] = oracle.dump()
+        data = {'model': self.model, 'reactions': sorted(self.reactions),
+                'added_reactions': [[how, sorted(new)] for how, new in self.added_reactions],
+                'steps': self.steps, 'minimized': self.minimized, 'oracles': self.oracles}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp = tempfile.mkstemp(dir=directory, prefix=".checkpoint.", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, self.path)
+        except BaseException:
+            os.remove(temp)
+            raise
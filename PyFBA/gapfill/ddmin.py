@@ -0,0 +1,105 @@
+"""
+Minimize a set of reactions with delta debugging (ddmin).
+
+Bisection only keeps a half if that half grows on its own, so when the reactions we need are split between
+both halves it has to shuffle and try again, and it can give up with more reactions than we need. Delta
+debugging (Zeller and Hildebrandt, Simplifying and Isolating Failure-Inducing Input, 2002) splits the reactions
+into n parts and tests each part and each complement (everything except one part). If one of them grows we keep
+it, otherwise we split into twice as many parts, until every part is a single reaction.
+
+The set that is returned is 1-minimal: it grows, but it does not grow if we remove any one of its reactions.
+If k reactions are needed from n, this usually takes O(k log n) growth tests, and never more than O(n^2).
+"""
+
+from PyFBA import log_and_message
+
+
+def _partition(reactions, n):
+    """
+    Split the reactions into n parts that are as equal in size as possible
+
+    :param reactions: the reactions to split
+    :type reactions: list[str]
+    :param n: the number of parts
+    :type n: int
+    :return: the parts
+    :rtype: list[list[str]]
+    """
+    size, extra = divmod(len(reactions), n)
+    parts = []
+    start = 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        parts.append(reactions[start:end])
+        start = end
+    return parts
+
+
+def _test(grows, results, reactions):
+    """
+    Test whether the reactions grow, unless we have already tested them
+
+    :param grows: the growth test
+    :type grows: callable
+    :param results: the sets of reactions that we have tested and whether they grew
+    :type results: dict[frozenset[str], bool]
+    :param reactions: the reactions to test
+    :type reactions: list[str]
+    :return: whether the reactions grew
+    :rtype: bool
+    """
+    key = frozenset(reactions)
+    if key not in results:
+        results[key] = grows(reactions)
+    return results[key]
+
+
+def ddmin(reactions, grows, prefetch=None, verbose=False):
+    """
+    Find a 1-minimal subset of the reactions that grows. All of the reactions together must grow, and
+    none of them must not grow.
+
+    :param reactions: the reactions to minimize
+    :type reactions: list[str]
+    :param grows: a function that takes a list of the reactions and returns whether they grow
+    :type grows: callable
+    :param prefetch: an optional function that takes all the lists of reactions that we may test next, e.g. to
+    start testing them in other processes
+    :type prefetch: callable
+    :param verbose: more output
+    :type verbose: bool
+    :return: the reactions we need and the number of growth tests that we ran
+    :rtype: (list[str], int)
+    """
+
+    reactions = list(reactions)
+    results = {}
+    n = 2
+    while len(reactions) >= 2:
+        n = min(n, len(reactions))
+        subsets = _partition(reactions, n)
+        # when there are only two parts, the complement of each part is the other part
+        complements = []
+        if n > 2:
+            complements = [[r for j, s in enumerate(subsets) if j != i for r in s] for i in range(n)]
+        if prefetch is not None:
+            prefetch([s for s in subsets + complements if frozenset(s) not in results])
+
+        reduced = False
+        for s in subsets:
+            if _test(grows, results, s):
+                reactions, n, reduced = s, 2, True
+                break
+        if not reduced:
+            for c in complements:
+                if _test(grows, results, c):
+                    reactions, n, reduced = c, max(n - 1, 2), True
+                    break
+        log_and_message(f"ddmin: {len(reactions)} reactions in {n} parts after {len(results)} growth tests",
+                        stderr=verbose)
+        if not reduced:
+            if n >= len(reactions):
+                break
+            n = min(len(reactions), 2 * n)
+
+    return reactions, len(results)
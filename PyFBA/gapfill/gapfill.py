@@ -25,7 +25,7 @@ def update_r2r(old, new, why, verbose=False):
     return old
 
 
-def run_eqn(why, md, r2r, med, bme, verbose=False):
+def run_eqn(why, md, r2r, med, bme, checkpoint=None, added_reactions=None, verbose=False):
     """
     Run the fba
     :param why: why are we doing this
@@ -33,17 +33,28 @@ def run_eqn(why, md, r2r, med, bme, verbose=False):
     :param r2r: reactions to run
     :param med: media object
     :param bme: biomass equation
+    :param checkpoint: use the saved result if we have already run these reactions, otherwise save the result
+    (see PyFBA.gapfill.Checkpoint)
+    :param added_reactions: the steps and the reactions they suggested, to save in the checkpoint
     :param verbose: more output
     :type verbose: bool
-    :return: (value, growth)
+    :return: (value, growth). The value is None if we used the saved result
     """
 
+    if checkpoint is not None:
+        growth = checkpoint.result(why, r2r)
+        if growth is not None:
+            log_and_message(f"FBA run {why} from the checkpoint --> Growth: {growth}", stderr=verbose)
+            return None, growth
     status, value, growth = PyFBA.fba.run_fba(md, r2r, med, bme)
     log_and_message(f"FBA run {why} has a biomass flux value of {value} --> Growth: {growth}", stderr=verbose)
+    if checkpoint is not None:
+        checkpoint.record_step(why, r2r, added_reactions or [], growth)
     return value, growth
 
 
-def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_type, r2exclude=None, verbose=False):
+def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_type, r2exclude=None, global_lp=False,
+            checkpoint=None, verbose=False):
     """
     Gapfill a set of reactions and return a tuple of [new reactions that grow, [reason, list of reactions]].
 
@@ -57,6 +68,9 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     :param genome_type: the genome type
     :param verbose: more output
     :param r2exclude: a set of reactions to exclude (optional)
+    :param global_lp: once we grow, choose the reactions to keep with a single optimization rather than by
+    bisecting (see PyFBA.gapfill.global_gapfill)
+    :param checkpoint: save our progress after every step, and resume from it (see PyFBA.gapfill.Checkpoint)
     :return: a dict of the reactions and why they are there!
     :rtype: dict[str, str]
     """
@@ -67,7 +81,8 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     original_reactions_to_run = copy.deepcopy(reactions)
 
     val, growth = run_eqn(f"Initial test to make sure we don't grow!", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
     if growth:
         return {r:"initial" for r in reactions}
 
@@ -102,10 +117,12 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     reactions = update_r2r(reactions, essential_reactions, "ESSENTIAL REACTIONS")
 
     val, growth = run_eqn(f"Test growth after {step}", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data, growth_media,
-                                                biomass_eqtn, verbose=verbose)
+                                                biomass_eqtn, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                       LINKED REACTIONS                                    #
@@ -120,11 +137,13 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     reactions = update_r2r(reactions, linked_reactions, "LINKED REACTIONS")
 
     val, growth = run_eqn(f"Test growth after {step}", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
 
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data, growth_media,
-                                                biomass_eqtn, verbose=verbose)
+                                                biomass_eqtn, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                       Media import reactions                              #
@@ -139,10 +158,12 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     reactions = update_r2r(reactions, media_reactions, "MEDIA REACTIONS")
 
     val, growth = run_eqn(f"Test growth after {step}", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data, growth_media,
-                                                biomass_eqtn, verbose=verbose)
+                                                biomass_eqtn, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                        Other genomes and organisms                        #
@@ -162,11 +183,12 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
             added_reactions.append((step, close_reactions))
             reactions = update_r2r(reactions, close_reactions, "CLOSE REACTIONS")
             val, growth = run_eqn(f"Test growth after {step}", model_data,
-                                  r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                                  r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                                  added_reactions=added_reactions, verbose=verbose)
             if growth:
                 return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data,
-                                                        growth_media,
-                                                        biomass_eqtn, verbose=verbose)
+                                                        growth_media, biomass_eqtn, global_lp=global_lp,
+                                                        checkpoint=checkpoint, verbose=verbose)
 
     #############################################################################################
     #                                        Subsystems                                         #
@@ -182,10 +204,12 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     added_reactions.append(("subsystems", subsystem_reactions))
     reactions = update_r2r(reactions, subsystem_reactions, "SUBSYSTEMS REACTIONS")
     val, growth = run_eqn(f"Test growth after {step}", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data, growth_media,
-                                                biomass_eqtn, verbose=verbose)
+                                                biomass_eqtn, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                        Orphan compounds                                   #
@@ -199,10 +223,12 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     added_reactions.append(("orphans", orphan_reactions))
     reactions = update_r2r(reactions, orphan_reactions, "ORPHAN REACTIONS")
     val, growth = run_eqn(f"Test growth after {step}", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data, growth_media,
-                                                biomass_eqtn, verbose=verbose)
+                                                biomass_eqtn, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                                        Probability of inclusion                           #
@@ -219,10 +245,12 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     reactions = update_r2r(reactions, prob_reactions, "PROBABILITY OF REACTIONS")
 
     val, growth = run_eqn(f"Test growth after {step}", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data, growth_media,
-                                                biomass_eqtn, verbose=verbose)
+                                                biomass_eqtn, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                       Reactions that map to proteins                       #
@@ -240,10 +268,12 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     reactions = update_r2r(reactions, with_p_reactions, "REACTIONS WITH PROTEINS")
 
     val, growth = run_eqn(f"Test growth after {step}", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data, growth_media,
-                                                biomass_eqtn, verbose=verbose)
+                                                biomass_eqtn, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     #############################################################################################
     #                       Reactions that do not map to proteins                               #
@@ -270,10 +300,12 @@ def gapfill(reactions, model_data, growth_media, biomass_eqtn, close, genome_typ
     reactions = update_r2r(reactions, without_p_reactions, "REACTIONS WITHOUT PROTEINS")
 
     val, growth = run_eqn(f"Test growth after {step}", model_data,
-                          r2r=reactions, bme=biomass_eqtn, med=growth_media, verbose=verbose)
+                          r2r=reactions, bme=biomass_eqtn, med=growth_media, checkpoint=checkpoint,
+                          added_reactions=added_reactions, verbose=verbose)
     if growth:
         return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, model_data, growth_media,
-                                                biomass_eqtn, verbose=verbose)
+                                                biomass_eqtn, global_lp=global_lp, checkpoint=checkpoint,
+                                                verbose=verbose)
 
     log_and_message(f"ERROR: WE COULD NOT GAPFILL TO GET GROWTH, EVEN WITH ALL REACTIONS", stderr=True, loglevel="WARN")
     sys.exit(0)
@@ -0,0 +1,305 @@
+"""
+Gapfill with a single optimization rather than by testing and bisecting each set of suggested reactions.
+
+All the candidate reactions from every gapfilling step are added to the model at once, and we find the cheapest set
+of candidates that gives a biomass flux of more than PyFBA.fba.GROWTH_THRESHOLD. Each candidate is weighted by the
+step that suggested it, so reactions from the earlier (better supported) steps are cheaper to use.
+
+With the highs backend we solve this exactly as a mixed integer program with scipy.optimize.milp: each candidate has
+a binary column that is 1 if the reaction is used, and the flux through the reaction is bounded by its bounds times
+that column. PyFBA.lp.LPProblem does not wrap the integer columns of GLPK, so with the glpk backend (or with
+milp=False) we use the L1 relaxation used by fastGapFill instead: we minimize the weighted sum of the absolute fluxes
+through the candidates, and reweight the candidates by their fluxes and solve again a few times, which usually
+removes most of the reactions that the relaxation does not need. To take the absolute value of the flux, each
+reversible candidate is split into a forward column and a reverse column, and both of them can only carry positive
+flux (see PyFBA.fba.split_reversible).
+
+Either way, we check that the reactions we choose grow, and bisect the reactions with
+PyFBA.gapfill.minimize_reactions if they do not.
+"""
+
+import numpy as np
+from scipy import sparse
+
+try:
+    # scipy.optimize.milp was added in scipy 1.9
+    from scipy.optimize import Bounds, LinearConstraint, milp as solve_milp
+except ImportError:
+    solve_milp = None
+
+import PyFBA
+from PyFBA import log_and_message
+
+# the flux below which we say that a reaction is not used
+FLUX_TOLERANCE = 1e-6
+
+
+def stage_weights(added_reactions, weights=None):
+    """
+    Find the weight of each candidate reaction from the step that suggested it. If a reaction was suggested by more
+    than one step we use the earliest step.
+
+    :param added_reactions: the steps and the reactions they suggested, in the order we ran them
+    :type added_reactions: list[(str, set[str])]
+    :param weights: the weight of each step. Default: the first step has a weight of 1, the second 2, and so on
+    :type weights: dict[str, float]
+    :return: a dict of reaction id and (weight, step)
+    :rtype: dict[str, (float, str)]
+    """
+
+    candidates = {}
+    for i, (how, new) in enumerate(added_reactions):
+        weight = weights[how] if weights and how in weights else i + 1
+        for r in new:
+            if r not in candidates:
+                candidates[r] = (weight, how)
+    return candidates
+
+
+def _milp_reactions(network, columns, cost, time_limit=None, verbose=False):
+    """
+    Find the cheapest set of candidate reactions that grows with a mixed integer program
+
+    :param network: the network with all the reactions and the candidates
+    :type network: PyFBA.fba.CompiledNetwork
+    :param columns: the columns of the candidate reactions
+    :type columns: numpy.ndarray
+    :param cost: the weight of each candidate reaction
+    :type cost: numpy.ndarray
+    :param time_limit: the number of seconds that we let the solver run for. If it runs out of time we use the best
+    set of reactions that it has found so far. Default: no limit
+    :type time_limit: float
+    :param verbose: more output
+    :type verbose: bool
+    :return: the candidate reactions that we use, or None if we did not find any
+    :rtype: set[str] | None
+    """
+
+    ncols = len(network.reactions)
+    ncandidates = len(columns)
+    lower = network.lower.copy()
+    upper = network.upper.copy()
+    biomass = ncols - 1
+    lower[biomass] = max(lower[biomass], PyFBA.fba.GROWTH_THRESHOLD + PyFBA.fba.GROWTH_TOLERANCE)
+
+    # the candidates can carry no flux when they are not used, and their own bounds when they are:
+    # lower * used <= flux <= upper * used
+    indicator = sparse.coo_matrix((np.ones(ncandidates), (np.arange(ncandidates), columns)),
+                                  shape=(ncandidates, ncols))
+    constraints = [
+        LinearConstraint(sparse.csr_matrix((network.values, (network.rows, network.cols)),
+                                           shape=(len(network.compounds), ncols + ncandidates)),
+                         network.compound_lower, network.compound_upper),
+        LinearConstraint(sparse.hstack([indicator, sparse.diags(-upper[columns])]), -np.inf, 0),
+        LinearConstraint(sparse.hstack([indicator, sparse.diags(-lower[columns])]), 0, np.inf),
+    ]
+    lower[columns] = np.minimum(lower[columns], 0)
+    upper[columns] = np.maximum(upper[columns], 0)
+
+    objective = np.concatenate([np.zeros(ncols), cost])
+    integrality = np.concatenate([np.zeros(ncols), np.ones(ncandidates)])
+    bounds = Bounds(np.concatenate([lower, np.zeros(ncandidates)]), np.concatenate([upper, np.ones(ncandidates)]))
+    options = {'time_limit': time_limit} if time_limit else {}
+    result = solve_milp(objective, integrality=integrality, bounds=bounds, constraints=constraints, options=options)
+    if result.x is None:
+        log_and_message(f"Global gapfill MILP did not solve: {result.message}", stderr=verbose)
+        return None
+
+    used = {network.reactions[j] for j in columns[result.x[ncols:] > 0.5]}
+    log_and_message(f"Global gapfill MILP: weight {result.fun} uses {len(used)} reactions ({result.message})",
+                    stderr=verbose)
+    return used
+
+
+def _lp_reactions(network, columns, cost, iterations=3, backend=None, verbose=False):
+    """
+    Find a cheap set of candidate reactions that grows with the L1 relaxation, reweighting the candidates by their
+    fluxes a few times
+
+    :param network: the network with all the reactions and the candidates
+    :type network: PyFBA.fba.CompiledNetwork
+    :param columns: the columns of the candidate reactions
+    :type columns: numpy.ndarray
+    :param cost: the weight of each candidate reaction
+    :type cost: numpy.ndarray
+    :param iterations: the number of times we reweight the candidates and solve again
+    :type iterations: int
+    :param backend: the linear programming backend to use. Default: PyFBA.lp.default_backend()
+    :type backend: str
+    :param verbose: more output
+    :type verbose: bool
+    :return: the smallest set of candidate reactions that we used, or None if the LP did not solve
+    :rtype: set[str] | None
+    """
+
+    ncols = len(network.reactions)
+    # split the reversible candidates into a forward and a reverse column that both carry positive flux
+    is_reversible = network.lower[columns] < 0
+    rows, cols, values, lower, upper, reversible = PyFBA.fba.split_reversible(network, columns)
+
+    # the biomass equation is the last column of the network, and we need at least enough flux to grow
+    biomass = ncols - 1
+    lower[biomass] = max(lower[biomass], PyFBA.fba.GROWTH_THRESHOLD + PyFBA.fba.GROWTH_TOLERANCE)
+
+    problem = PyFBA.lp.new_problem(backend)
+    problem.load_sparse(list(zip(rows.tolist(), cols.tolist(), values.tolist())), len(network.compounds),
+                        len(lower))
+    problem.row_bounds(list(zip(network.compound_lower.tolist(), network.compound_upper.tolist())))
+    problem.col_bounds(list(zip(lower.tolist(), upper.tolist())))
+    problem.maximize = False
+
+    best = None
+    weight = cost
+    for i in range(iterations + 1):
+        objective = np.zeros(len(lower))
+        objective[columns] = weight
+        objective[ncols:] = weight[is_reversible]
+        problem.objective_coefficients(objective.tolist())
+        status, value = problem.solve()
+        if status not in ('opt', 'feas'):
+            log_and_message(f"Global gapfill LP did not solve (status: {status})", stderr=verbose)
+            break
+
+        primals = problem.col_primal_array()
+        flux = primals[columns].copy()
+        flux[is_reversible] += primals[ncols:]
+        used = {network.reactions[j] for j in columns[flux > FLUX_TOLERANCE]}
+        log_and_message(f"Global gapfill iteration {i}: weighted flux {value} uses {len(used)} reactions",
+                        stderr=verbose)
+        if best is None or len(used) < len(best):
+            best = used
+        # reactions that carry a lot of flux are cheaper next time, so we use fewer, busier reactions
+        weight = cost / (flux + FLUX_TOLERANCE * 1000)
+    return best
+
+
+def _choose_reactions(original_reactions_to_run, candidates, modeldata, media, biomass_equation, milp, time_limit,
+                      iterations, backend, verbose):
+    """
+    Choose the candidate reactions with the mixed integer program or the L1 relaxation, and check that they grow
+
+    :param original_reactions_to_run: the original set from our genome
+    :type original_reactions_to_run: set[str]
+    :param candidates: the weight and step of each candidate reaction (see stage_weights)
+    :type candidates: dict[str, (float, str)]
+    :param modeldata: our modeldata object
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param media: our media object
+    :type media: set[PyFBA.metabolism.Compound]
+    :param biomass_equation: our biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param milp: solve the mixed integer program rather than the L1 relaxation
+    :type milp: bool
+    :param time_limit: the number of seconds that we let the mixed integer program run for
+    :type time_limit: float
+    :param iterations: the number of times we reweight the candidates and solve the relaxation again
+    :type iterations: int
+    :param backend: the linear programming backend to use
+    :type backend: str
+    :param verbose: more output
+    :type verbose: bool
+    :return: the candidate reactions that we use, or None if we did not find a set that grows
+    :rtype: set[str] | None
+    """
+
+    network = PyFBA.fba.CompiledNetwork.compile(modeldata, original_reactions_to_run.union(candidates), media,
+                                                biomass_equation, verbose=verbose)
+    columns = np.array([network.reaction_index[r] for r in candidates if r in network.reaction_index], dtype=int)
+    cost = np.array([candidates[network.reactions[j]][0] for j in columns], dtype=float)
+
+    best = None
+    growth = False
+    # the biomass equation is the last column of the network
+    if network.upper[-1] < PyFBA.fba.GROWTH_THRESHOLD + PyFBA.fba.GROWTH_TOLERANCE:
+        log_and_message("The biomass equation can not carry enough flux to grow", stderr=True, loglevel="WARN")
+    elif milp:
+        best = _milp_reactions(network, columns, cost, time_limit=time_limit, verbose=verbose)
+    else:
+        best = _lp_reactions(network, columns, cost, iterations=iterations, backend=backend, verbose=verbose)
+
+    if best is not None:
+        status, value, growth = PyFBA.fba.run_fba(modeldata, original_reactions_to_run.union(best), media,
+                                                  biomass_equation, growth_only=True)
+    return best if growth else None
+
+
+def global_gapfill(original_reactions_to_run, added_reactions, modeldata, media, biomass_equation, weights=None,
+                   milp=None, time_limit=None, iterations=3, backend=None, processes=1, speculative=False,
+                   strategy='bisect', checkpoint=None, verbose=False):
+    """
+    Find a small set of the added reactions that allows growth with a single optimization. This takes the same
+    arguments and returns the same dict as PyFBA.gapfill.minimize_reactions, so you can use either of them
+    at the end of gapfilling.
+
+    :param original_reactions_to_run: the original set from our genome
+    :type original_reactions_to_run: set[str]
+    :param added_reactions: the steps and the reactions they suggested, in the order we ran them
+    :type added_reactions: list[(str, set[str])]
+    :param modeldata: our modeldata object
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param media: our media object
+    :type media: set[PyFBA.metabolism.Compound]
+    :param biomass_equation: our biomass equation
+    :type biomass_equation: PyFBA.metabolism.Reaction
+    :param weights: the weight of each step (see stage_weights)
+    :type weights: dict[str, float]
+    :param milp: solve the mixed integer program (see _milp_reactions) rather than the L1 relaxation (see
+    _lp_reactions). Default: use the mixed integer program if the backend is highs
+    :type milp: bool
+    :param time_limit: the number of seconds that we let the mixed integer program run for. Default: no limit
+    :type time_limit: float
+    :param iterations: the number of times we reweight the candidates and solve the relaxation again
+    :type iterations: int
+    :param backend: the linear programming backend to use. Default: PyFBA.lp.default_backend()
+    :type backend: str
+    :param processes: the number of processes to use if we need to bisect the reactions (see minimize_reactions)
+    :type processes: int
+    :param speculative: also test the next bisection while we are testing this one if we need to bisect the
+    reactions (see minimize_reactions)
+    :type speculative: bool
+    :param strategy: how to minimize each set of reactions if we need to bisect them (see minimize_reactions)
+    :type strategy: str
+    :param checkpoint: save the reactions that we choose, and use the reactions that we chose before if we are
+    resuming. This is also used if we need to bisect the reactions (see PyFBA.gapfill.Checkpoint)
+    :type checkpoint: PyFBA.gapfill.Checkpoint
+    :param verbose: more output
+    :type verbose: bool
+    :return: A dict of the minimal set of reactions and their source
+    :rtype: dict[str, str]
+    """
+
+    if backend is None:
+        backend = PyFBA.lp.default_backend()
+    if milp is None:
+        milp = backend == 'highs'
+    if milp and solve_milp is None:
+        log_and_message("scipy.optimize.milp is not available, so we use the L1 relaxation", stderr=verbose)
+        milp = False
+
+    original_reactions_to_run = set(original_reactions_to_run)
+    candidates = stage_weights(added_reactions, weights)
+    for r in original_reactions_to_run:
+        candidates.pop(r, None)
+
+    best = None
+    if checkpoint is not None:
+        best = checkpoint.required('global gapfill', original_reactions_to_run, set(candidates))
+    if best is None:
+        best = _choose_reactions(original_reactions_to_run, candidates, modeldata, media, biomass_equation, milp,
+                                 time_limit, iterations, backend, verbose)
+        if best is None:
+            log_and_message("Global gapfill did not find a set of reactions that grows. Bisecting the reactions "
+                            "instead", stderr=True, loglevel="WARN")
+            return PyFBA.gapfill.minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media,
+                                                    biomass_equation, processes=processes, speculative=speculative,
+                                                    strategy=strategy, checkpoint=checkpoint, verbose=verbose)
+        if checkpoint is not None:
+            checkpoint.record_required('global gapfill', original_reactions_to_run, set(candidates), best)
+
+    log_and_message(f"Global gapfill added {len(best)} of {len(candidates)} candidate reactions", stderr=verbose)
+    rxn_source = {r: 'genome prediction' for r in original_reactions_to_run}
+    for r in best:
+        modeldata.reactions[r].is_gapfilled = True
+        modeldata.reactions[r].gapfill_method = candidates[r][1]
+        rxn_source[r] = candidates[r][1]
+    return rxn_source
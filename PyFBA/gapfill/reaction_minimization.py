@@ -1,10 +1,113 @@
+import contextlib
 import copy
-import sys
+import os
+from functools import partial
+from multiprocessing import Pool
 from random import shuffle
 
 import PyFBA
 from PyFBA import log_and_message
 
+# the FBASession for this worker process when we bisect in parallel. This is set by _init_worker
+_session = None
+
+
+def _init_worker(network, backend):
+    """
+    Load the network into an FBASession for this worker process
+
+    :param network: the compiled base and optional reactions
+    :type network: PyFBA.fba.CompiledNetwork
+    :param backend: the linear programming backend to use
+    :type backend: str
+    """
+    global _session
+    _session = PyFBA.fba.FBASession(network=network, backend=backend)
+
+
+def _worker_grows(reactions):
+    """
+    Test whether exactly these reactions grow using the session for this worker process
+
+    :param reactions: the reactions to enable
+    :type reactions: set[str]
+    :return: whether the model grew
+    :rtype: bool
+    """
+    _session.set_reactions(reactions)
+    return _session.grows()
+
+
+def _submit(pool, pending, base_reactions, reactions):
+    """
+    Start testing whether the base reactions and these reactions grow in one of the worker processes, unless we
+    are already testing them
+
+    :param pool: the worker processes
+    :type pool: multiprocessing.Pool
+    :param pending: a dict of the sets of reactions that we are testing and their results
+    :type pending: dict[frozenset[str], multiprocessing.pool.AsyncResult]
+    :param base_reactions: the reactions that are always enabled
+    :type base_reactions: set[str]
+    :param reactions: the optional reactions to enable
+    :type reactions: list[str]
+    """
+    key = frozenset(reactions)
+    if key not in pending:
+        pending[key] = pool.apply_async(_worker_grows, (base_reactions.union(key),))
+
+
+def _submit_all(pool, pending, base_reactions, candidates):
+    """
+    Start testing all the sets of reactions that we may need next in the worker processes (see _submit), and
+    forget the tests that we started for any other sets. We can not stop a test once it has started, but we will
+    not need its result, so we do not keep it.
+
+    :param pool: the worker processes
+    :type pool: multiprocessing.Pool
+    :param pending: a dict of the sets of reactions that we are testing and their results
+    :type pending: dict[frozenset[str], multiprocessing.pool.AsyncResult]
+    :param base_reactions: the reactions that are always enabled
+    :type base_reactions: set[str]
+    :param candidates: the sets of optional reactions to enable
+    :type candidates: list[list[str]]
+    """
+    keys = {frozenset(reactions) for reactions in candidates}
+    for key in set(pending).difference(keys):
+        del pending[key]
+    for reactions in candidates:
+        _submit(pool, pending, base_reactions, reactions)
+
+
+def _grows(session, oracle, pool, pending, base_reactions, reactions):
+    """
+    Test whether the base reactions and these reactions grow, unless the oracle already knows. If we have a pool of
+    worker processes, we use the result of the test we already started, or start it now and wait for it.
+
+    :param session: the FBA session with all the base and optional reactions
+    :type session: PyFBA.fba.FBASession
+    :param oracle: the sets of reactions that we know grow or do not grow
+    :type oracle: PyFBA.fba.GrowthOracle
+    :param pool: the worker processes, or None to use the session
+    :type pool: multiprocessing.Pool
+    :param pending: a dict of the sets of reactions that we are testing and their results
+    :type pending: dict[frozenset[str], multiprocessing.pool.AsyncResult]
+    :param base_reactions: the reactions that are always enabled
+    :type base_reactions: set[str]
+    :param reactions: the optional reactions to enable
+    :type reactions: list[str]
+    :return: whether the model grew
+    :rtype: bool
+    """
+    def test():
+        if pool is None:
+            session.set_reactions(base_reactions.union(reactions))
+            return session.grows()
+        _submit(pool, pending, base_reactions, reactions)
+        return pending.pop(frozenset(reactions)).get()
+
+    return oracle.grows(base_reactions.union(reactions), test)
+
 
 def accuracy(precision_recall):
     """
@@ -20,10 +123,62 @@ def accuracy(precision_recall):
     return 1.0 * (precision_recall['tp'] + precision_recall['tn']) / (sum(list(precision_recall.values())))
 
 
-def calculate_precision_recall(growth_media, no_growth_media, modeldata, reactions2run, biomass_eqtn):
+def _outcome(should_grow, growth):
+    """
+    Whether growth on a media is a true or false positive or negative
+
+    :param should_grow: whether we should grow on the media
+    :type should_grow: bool
+    :param growth: whether we grew
+    :type growth: bool
+    :return: one of tp, tn, fp, or fn
+    :rtype: str
+    """
+    if should_grow:
+        return 'tp' if growth else 'fn'
+    return 'fp' if growth else 'tn'
+
+
+def _cannot_succeed(results, untested_growth, untested, minimum_tp, best_accuracy):
+    """
+    Whether the media that we have not tested yet can no longer give more than minimum_tp true positives, or an
+    accuracy of at least best_accuracy
+
+    :param results: the true positives, true negatives, false positives, and false negatives so far
+    :type results: dict[str, int]
+    :param untested_growth: the number of growth media that we have not tested
+    :type untested_growth: int
+    :param untested: the number of growth and no growth media that we have not tested
+    :type untested: int
+    :param minimum_tp: the number of true positives that we need to exceed, or None
+    :type minimum_tp: float
+    :param best_accuracy: the accuracy that we need to reach, or None
+    :type best_accuracy: float
+    :return: whether we can stop testing
+    :rtype: bool
+    """
+    if minimum_tp is not None and results['tp'] + untested_growth <= minimum_tp:
+        return True
+    total = sum(results.values()) + untested
+    if best_accuracy is not None and total and (results['tp'] + results['tn'] + untested) / total < best_accuracy:
+        return True
+    return False
+
+
+def calculate_precision_recall(growth_media, no_growth_media, modeldata, reactions2run, biomass_eqtn,
+                               minimum_tp=None, best_accuracy=None, processes=1, verbose=False):
     """
     Test growth on our positive and negative media. Return the number of positive/negatives that grew.
 
+    The reactions are compiled once for all the media, and the media can be tested in several processes (see
+    PyFBA.fba.grow_on_media). Media where the growth oracle already knows the answer are not tested
+    (see PyFBA.fba.GrowthOracle).
+
+    If you provide minimum_tp or best_accuracy, we stop testing as soon as the remaining media can no longer
+    give more than minimum_tp true positives, or an accuracy of at least best_accuracy. The media that we did not
+    test are counted as wrong predictions (false negatives or false positives), so the results are still below
+    minimum_tp or best_accuracy, as they would be if we had tested every media.
+
     :param no_growth_media: Media on which the model should NOT grow
     :type no_growth_media: list of Media sets
     :param growth_media: Media on which the model should grow
@@ -34,31 +189,56 @@ def calculate_precision_recall(growth_media, no_growth_media, modeldata, reactio
     :type reactions2run: set
     :param biomass_eqtn: The biomass equation
     :type biomass_eqtn: PyFBA.metabolism.reaction.Reaction
+    :param minimum_tp: stop once we can not have more than this number of true positives
+    :type minimum_tp: float
+    :param best_accuracy: stop once we can not have at least this accuracy
+    :type best_accuracy: float
+    :param processes: the number of processes to test the media with. Use None for the number of CPUs
+    :type processes: int
+    :param verbose: more output
+    :type verbose: bool
     :return: A dict of true positives, true negatives, false positives, false negative
     :rtype: dict of str and int
     """
     results = {'tp': 0, 'tn': 0, 'fp': 0, 'fn': 0}
-    for media in growth_media:
-        status, value, growth = PyFBA.fba.run_fba(modeldata, reactions2run, media, biomass_eqtn)
-        PyFBA.fba.remove_uptake_and_secretion_reactions(modeldata.reactions)
-        if growth:
-            results['tp'] += 1
-        else:
-            results['fn'] += 1
-
-    for media in no_growth_media:
-        status, value, growth = PyFBA.fba.run_fba(modeldata, reactions2run, media, biomass_eqtn)
-        PyFBA.fba.remove_uptake_and_secretion_reactions(modeldata.reactions)
-        if growth:
-            results['fp'] += 1
-        else:
-            results['tn'] += 1
-
+    # whether we should grow on each media that the oracle does not know, and the media to test
+    expected = {}
+    media = {}
+    for should_grow, all_media in ((True, growth_media), (False, no_growth_media)):
+        for i, m in enumerate(all_media):
+            growth = PyFBA.fba.growth_oracle(modeldata, m, biomass_eqtn).known(reactions2run)
+            if growth is None:
+                name = f"{'growth' if should_grow else 'no growth'} media {i}"
+                expected[name] = should_grow
+                media[name] = m
+            else:
+                results[_outcome(should_grow, growth)] += 1
+
+    untested_growth = sum(expected.values())
+    if media and not _cannot_succeed(results, untested_growth, len(expected), minimum_tp, best_accuracy):
+        tests = PyFBA.fba.grow_on_media(modeldata, reactions2run, media, biomass_eqtn, processes=processes,
+                                        growth_only=True)
+        for name, value, growth in tests:
+            oracle = PyFBA.fba.growth_oracle(modeldata, media[name], biomass_eqtn)
+            oracle.tests += 1
+            oracle.record(reactions2run, growth)
+            should_grow = expected.pop(name)
+            untested_growth -= should_grow
+            results[_outcome(should_grow, growth)] += 1
+            if _cannot_succeed(results, untested_growth, len(expected), minimum_tp, best_accuracy):
+                break
+        tests.close()
+
+    if expected:
+        log_and_message(f"Stopped after testing {len(growth_media) + len(no_growth_media) - len(expected)} media " +
+                        "because the rest can not change the result", stderr=verbose)
+    for should_grow in expected.values():
+        results[_outcome(should_grow, not should_grow)] += 1
     return results
 
 
 def iterate_reactions_to_run(base_reactions, optional_reactions, modeldata, media,
-                             biomass_eqn, verbose=False):
+                             biomass_eqn, session=None, verbose=False):
     """
     Iterate all the elements in optional_reactions and merge them with base reactions, and then test to see which are
     required for growth
@@ -80,6 +260,8 @@ def iterate_reactions_to_run(base_reactions, optional_reactions, modeldata, medi
     :type media: set
     :param biomass_eqn: our biomass equation
     :type biomass_eqn: network.reaction.Reaction
+    :param session: an FBA session that includes all the base and optional reactions (optional)
+    :type session: PyFBA.fba.FBASession
     :param verbose: Print more information
     :type verbose: bool
     :return: The list of reactions that need to be added to base_reactions to get growth
@@ -90,15 +272,24 @@ def iterate_reactions_to_run(base_reactions, optional_reactions, modeldata, medi
     required_optionals = set()
     i = 1
 
+    # we only remove one reaction at a time, so we load all the reactions once and switch them off and on
+    if session is None:
+        session = PyFBA.fba.FBASession(modeldata, base_reactions.union(optional_reactions), media, biomass_eqn)
+    else:
+        session.set_reactions(base_reactions.union(optional_reactions))
+    oracle = PyFBA.fba.growth_oracle(modeldata, media, biomass_eqn)
+
     for r in range(num_elements):
         removed_reaction = optional_reactions.pop()
-        r2r = base_reactions.union(optional_reactions).union(required_optionals)
         log_and_message(f"Single reaction iteration {i} of {num_elements}: Attempting without {removed_reaction}: "
                         f"{modeldata.reactions[removed_reaction].equation}", stderr=verbose)
-        status, value, growth = PyFBA.fba.run_fba(modeldata, r2r, media, biomass_eqn)
+        if removed_reaction not in base_reactions:
+            session.disable({removed_reaction})
+        growth = oracle.grows(session.enabled(), session.grows)
         if not growth:
             log_and_message("Result: REQUIRED", stderr=verbose)
             required_optionals.add(removed_reaction)
+            session.enable({removed_reaction})
         elif verbose:
             log_and_message("Result: NOT REQUIRED", stderr=verbose)
         i += 1
@@ -107,7 +298,8 @@ def iterate_reactions_to_run(base_reactions, optional_reactions, modeldata, medi
 
 
 def minimize_additional_reactions(base_reactions, optional_reactions, modeldata, media,
-                                  biomass_eqn, verbose=False):
+                                  biomass_eqn, processes=1, speculative=False, backend=None, strategy='bisect',
+                                  verbose=False):
     """
     Given two sets, one of base reactions (base_reactions), and one of optional
     reactions we will attempt to minimize the reactions in the optional
@@ -115,6 +307,13 @@ def minimize_additional_reactions(base_reactions, optional_reactions, modeldata,
     the fba. We return a set of the optional reactions that are required
     for the fba to grow.
 
+    With more than one process, we test both halves of each bisection at the same time in separate worker
+    processes, each with its own solver, and optionally start testing the halves of the next bisection before
+    we know which half we will keep. We still choose the halves in the same order, so the result is the same.
+
+    Bisection can return more reactions than we need. The ddmin strategy (see PyFBA.gapfill.ddmin) always
+    returns a set where every reaction is needed, and usually with fewer growth tests.
+
     :param base_reactions: a set of reactions that are required for the model but that do not result in growth
     :type base_reactions: set
     :param optional_reactions: a set of reactions that when added to the base_reactions set result in
@@ -126,31 +325,49 @@ def minimize_additional_reactions(base_reactions, optional_reactions, modeldata,
     :type media: set
     :param biomass_eqn: our biomass equation
     :type biomass_eqn: network.reaction.Reaction
+    :param processes: the number of processes to test the bisections with. Default: 1 (test them one at a time
+    in this process). Use None for the number of CPUs
+    :type processes: int
+    :param speculative: with more than one process, also test the halves of the next bisection while we are
+    testing this one
+    :type speculative: bool
+    :param backend: the linear programming backend for the worker processes. Default: PyFBA.lp.default_backend()
+    :type backend: str
+    :param strategy: how to minimize the optional reactions: bisect (the default) or ddmin
+    :type strategy: str
     :param verbose: Print more information
     :type verbose: bool
     :return: The set of reactions that need to be added to base_reactions to get growth
     :rtype: set
     """
 
+    if strategy not in ('bisect', 'ddmin'):
+        raise ValueError(f"Unknown strategy {strategy} to minimize the reactions. Use bisect or ddmin")
     base_reactions = set(base_reactions)
     optional_reactions = set(optional_reactions)
+    # all the sets that we test are base_reactions plus some of the optional reactions, so we load them all
+    # once and switch the optional reactions on and off. Each solve starts from the previous basis
+    session = PyFBA.fba.FBASession(modeldata, base_reactions.union(optional_reactions), media, biomass_eqn,
+                                   enabled=base_reactions)
+    # growth is monotone in the reactions, so we do not need to test sets that are implied by the sets we have tested
+    oracle = PyFBA.fba.growth_oracle(modeldata, media, biomass_eqn)
     # test that (a) the base_reactions set does not grow and the base_reactions
     # + optional set does grow
-    status, value, growth = PyFBA.fba.run_fba(modeldata, base_reactions, media, biomass_eqn)
+    growth = oracle.grows(base_reactions, session.grows)
     if growth:
         log_and_message("The set of 'base' reactions results in growth so we don't need to bisect the optional set",
                         stderr=True)
         return set()
 
-    status, value, growth = PyFBA.fba.run_fba(modeldata, base_reactions.union(optional_reactions), media,
-                                              biomass_eqn)
+    session.set_reactions(base_reactions.union(optional_reactions))
+    growth = oracle.grows(base_reactions.union(optional_reactions), session.grows)
     if not growth:
         raise Exception("'base' union 'optional' reactions does not generate growth. We can not bisect the set\n")
 
     # first, lets see if we can limit the reactions based on compounds present and still get growth
     limited_rxn = PyFBA.gapfill.limit_reactions_by_compound(modeldata.reactions, base_reactions, optional_reactions)
-    status, value, growth = PyFBA.fba.run_fba(modeldata, base_reactions.union(limited_rxn), media,
-                                              biomass_eqn)
+    session.set_reactions(base_reactions.union(limited_rxn))
+    growth = oracle.grows(base_reactions.union(limited_rxn), session.grows)
     if growth:
         if verbose:
             log_and_message(f"Successfully limited the reactions by compound and reduced from "
@@ -165,91 +382,150 @@ def minimize_additional_reactions(base_reactions, optional_reactions, modeldata,
     log_and_message(f"At the beginning the base list has {len(base_reactions)} and"
                     f" the optional list has {len(current_rx_list)} reactions", stderr=verbose)
 
-    left = []
-    right = []
-    while test:
-        itera += 1
-        left, right = PyFBA.gapfill.bisections.bisect(current_rx_list)
-        # left, right = percent_split(current_rx_list, percent)
-        r2r = base_reactions.union(set(left))
-        status, value, lgrowth = PyFBA.fba.run_fba(modeldata, r2r, media, biomass_eqn)
-        # running the fba takes all the time, so we only run the right half if the left half doesn't grow
-        if lgrowth:
-            tries = 0
-            current_rx_list = left
-            if len(left) == 1:
-                test = False
-                right = []
-            log_and_message(f"Iteration: {itera} Try: {tries} Length: {len(left)} and {len(right)} "
-                            f"Growth: {lgrowth} and NOT TESTED", stderr=verbose)
-        else:
-            r2r = base_reactions.union(set(right))
-            status, value, rgrowth = PyFBA.fba.run_fba(modeldata, r2r, media, biomass_eqn)
-            log_and_message(f"Iteration: {itera} Try: {tries} Length: {len(left)} and {len(right)} "
-                            f"Growth: {lgrowth} and {rgrowth}", stderr=verbose)
-
-            if rgrowth:
-                # the right list grows so we can use it
+    # with more than one process, the worker processes test the halves while we wait for the result we need
+    if processes is None:
+        processes = os.cpu_count() or 1
+    pool = None
+    pending = {}
+    if processes > 1:
+        pool = Pool(processes, initializer=_init_worker, initargs=(session.full_network, backend))
+
+    # the worker processes are stopped when we are done, even if a growth test raises an exception
+    with pool if pool is not None else contextlib.nullcontext():
+        if strategy == 'ddmin':
+            prefetch = None
+            if pool is not None:
+                prefetch = partial(_submit_all, pool, pending, base_reactions)
+            grows = partial(_grows, session, oracle, pool, pending, base_reactions)
+            remaining, tests = PyFBA.gapfill.ddmin(current_rx_list, grows, prefetch=prefetch, verbose=verbose)
+            log_and_message(f"ddmin used {tests} growth tests. There are {len(remaining)} reactions remaining: "
+                            f"{remaining}", stderr=verbose)
+            return set(remaining)
+
+        left = []
+        right = []
+        while test:
+            itera += 1
+            left, right = PyFBA.gapfill.bisections.bisect(current_rx_list)
+            # left, right = percent_split(current_rx_list, percent)
+            # if the right half is much longer we shuffle it before we bisect it again
+            reshuffle = len(right) > 5 * len(left) and len(right) != 1
+            if pool is not None:
+                candidates = [left, right]
+                if speculative:
+                    # whichever half grows is the one we bisect next. We can not know the halves of a shuffled list,
+                    # so we do not start testing them
+                    candidates.extend(PyFBA.gapfill.bisections.bisect(left))
+                    if not reshuffle:
+                        candidates.extend(PyFBA.gapfill.bisections.bisect(right))
+                _submit_all(pool, pending, base_reactions, candidates)
+            lgrowth = _grows(session, oracle, pool, pending, base_reactions, left)
+            # running the fba takes all the time, so we only run the right half if the left half doesn't grow
+            if lgrowth:
                 tries = 0
-                if len(right) > 5 * len(left) and len(right) != 1:
-                    shuffle(right)
-                current_rx_list = right
-                if len(right) == 1:
+                current_rx_list = left
+                if len(left) == 1:
                     test = False
-                    left = []
-            else:
-                # neither grows.
-                # If there are less than 20 elements we'll just iterate through them all.
-                # Otherwise, we can we split the list unevenly and see if we get growth
-                uneven_test = True
-                if len(current_rx_list) < 20:
-                    left = iterate_reactions_to_run(base_reactions, current_rx_list, modeldata, media, biomass_eqn,
-                                                    verbose)
                     right = []
-                    test = False
+                log_and_message(f"Iteration: {itera} Try: {tries} Length: {len(left)} and {len(right)} "
+                                f"Growth: {lgrowth} and NOT TESTED", stderr=verbose)
+            else:
+                rgrowth = _grows(session, oracle, pool, pending, base_reactions, right)
+                log_and_message(f"Iteration: {itera} Try: {tries} Length: {len(left)} and {len(right)} "
+                                f"Growth: {lgrowth} and {rgrowth}", stderr=verbose)
+
+                if rgrowth:
+                    # the right list grows so we can use it
+                    tries = 0
+                    if reshuffle:
+                        shuffle(right)
+                    current_rx_list = right
+                    if len(right) == 1:
+                        test = False
+                        left = []
                 else:
-                    percent = 40
-                    left, right = PyFBA.gapfill.bisections.percent_split(current_rx_list, percent)
-                    while uneven_test and len(left) > 0 and len(right) > 0:
-                        # Not testing left side anymore! The left side is always giving some of its
-                        # reactions to the right side. Decreasing the number of reactions will never
-                        # result in growth if it didn't grow with the larger number of reactions.
-                        # Will leave it commented out for now.
-
-                        # r2r = base_reactions.union(set(left))
-                        # status, value, lgrowth = PyFBA.fba.run_fba(compounds, reactions, r2r, media, biomass_eqn)
-                        r2r = base_reactions.union(set(right))
-                        status, value, rgrowth = PyFBA.fba.run_fba(modeldata, r2r, media, biomass_eqn)
-                        log_and_message(f"Iteration: {itera} Try: {tries} Length: {len(left)} and {len(right)} "
-                                        f"Growth: {lgrowth} and {rgrowth}", stderr=verbose)
-                        # if lgrowth:
-                        #    tries = 0
-                        #    current_rx_list = left
-                        #    uneven_test = False
-                        # elif rgrowth:
-                        if rgrowth:
-                            tries = 0
-                            current_rx_list = right
-                            uneven_test = False
-                        else:
-                            percent /= 2.0
-                            left, right = PyFBA.gapfill.bisections.percent_split(current_rx_list, percent)
-                if uneven_test:
-                    # we never got growth, so we can't continue
-                    # we take another stab and try again
-                    tries += 1
-                    current_rx_list = left + right
-                    shuffle(current_rx_list)
-                if tries > maxtries:
-                    test = False
+                    # neither grows.
+                    # If there are less than 20 elements we'll just iterate through them all.
+                    # Otherwise, we can we split the list unevenly and see if we get growth
+                    uneven_test = True
+                    if len(current_rx_list) < 20:
+                        left = iterate_reactions_to_run(base_reactions, current_rx_list, modeldata, media, biomass_eqn,
+                                                        session=session, verbose=verbose)
+                        right = []
+                        test = False
+                    else:
+                        percent = 40
+                        left, right = PyFBA.gapfill.bisections.percent_split(current_rx_list, percent)
+                        while uneven_test and len(left) > 0 and len(right) > 0:
+                            # Not testing left side anymore! The left side is always giving some of its
+                            # reactions to the right side. Decreasing the number of reactions will never
+                            # result in growth if it didn't grow with the larger number of reactions.
+                            # Will leave it commented out for now.
+
+                            # r2r = base_reactions.union(set(left))
+                            # status, value, lgrowth = PyFBA.fba.run_fba(compounds, reactions, r2r, media, biomass_eqn)
+                            rgrowth = _grows(session, oracle, pool, pending, base_reactions, right)
+                            log_and_message(f"Iteration: {itera} Try: {tries} Length: {len(left)} and {len(right)} "
+                                            f"Growth: {lgrowth} and {rgrowth}", stderr=verbose)
+                            # if lgrowth:
+                            #    tries = 0
+                            #    current_rx_list = left
+                            #    uneven_test = False
+                            # elif rgrowth:
+                            if rgrowth:
+                                tries = 0
+                                current_rx_list = right
+                                uneven_test = False
+                            else:
+                                percent /= 2.0
+                                left, right = PyFBA.gapfill.bisections.percent_split(current_rx_list, percent)
+                    if uneven_test:
+                        # we never got growth, so we can't continue
+                        # we take another stab and try again
+                        tries += 1
+                        current_rx_list = left + right
+                        shuffle(current_rx_list)
+                    if tries > maxtries:
+                        test = False
 
     remaining = set(left + right)
     log_and_message(f"There are {len(remaining)} reactions remaining: {remaining}", stderr=verbose)
+    log_and_message(f"Growth tests so far: {oracle}", stderr=verbose)
     return remaining
 
 
+def _accurate(growth_media, no_growth_media, modeldata, base_reactions, biomass_eqn, minimum_tp, processes,
+              reactions):
+    """
+    Test whether the base reactions and these reactions have more than minimum_tp true positives
+
+    :param growth_media: A list of media conditions where the model DOES grow
+    :type growth_media: list of sets
+    :param no_growth_media: A list of media conditions where the model does NOT grow
+    :type no_growth_media: list of sets
+    :param modeldata: The model data
+    :type modeldata: PyFBA.model_seed.ModelData
+    :param base_reactions: the reactions that are always enabled
+    :type base_reactions: set[str]
+    :param biomass_eqn: our biomass equation
+    :type biomass_eqn: network.reaction.Reaction
+    :param minimum_tp: the number of true positives that we need to exceed
+    :type minimum_tp: float
+    :param processes: the number of processes to test the media with
+    :type processes: int
+    :param reactions: the optional reactions to enable
+    :type reactions: list[str]
+    :return: whether we have enough true positives
+    :rtype: bool
+    """
+    precision = calculate_precision_recall(growth_media, no_growth_media, modeldata, base_reactions.union(reactions),
+                                           biomass_eqn, minimum_tp=minimum_tp, processes=processes)
+    return precision['tp'] > minimum_tp
+
+
 def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_media, no_growth_media,
-                         biomass_eqn, minimum_tp=0, minimum_accuracy=0.50, verbose=False):
+                         biomass_eqn, minimum_tp=0, minimum_accuracy=0.50, strategy='bisect', processes=1,
+                         verbose=False):
     """
     Given two sets, one of base reactions (base_reactions), and one of optional
     reactions we will attempt to minimize the reactions in the optional
@@ -265,6 +541,11 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
     :param minimum_accuracy: The minimum accuracy that we will accept as "growth" e.g. to determine when we have reached
      the end!
     :type minimum_accuracy: float
+    :param strategy: how to minimize the optional reactions: bisect (the default) or ddmin. With ddmin we find a
+    set where every reaction is needed to have more than minimum_tp true positives (see PyFBA.gapfill.ddmin)
+    :type strategy: str
+    :param processes: the number of processes to test the media with (see calculate_precision_recall)
+    :type processes: int
     :param no_growth_media: A list of media conditions where the model does NOT grow
     :type no_growth_media: list of sets
     :param growth_media: A list of media conditions where the model DOES grow
@@ -284,6 +565,8 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
     :rtype: set
     """
 
+    if strategy not in ('bisect', 'ddmin'):
+        raise ValueError(f"Unknown strategy {strategy} to minimize the reactions. Use bisect or ddmin")
     if minimum_tp < 1:
         minimum_tp *= len(growth_media)
 
@@ -292,7 +575,7 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
     # test that (a) the base_reactions set does not grow and the base_reactions
     # + optional set does grow
     base_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata, base_reactions,
-                                                biomass_eqn)
+                                                biomass_eqn, processes=processes)
     if base_precision['tp'] > minimum_tp:
         msg = f"The set of 'base' reactions results in {base_precision['tp']} positive reactions. " \
               f"Bigger than {minimum_tp} so no need to bisect"
@@ -307,7 +590,8 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
         return set()
 
     beginning_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata,
-                                                     base_reactions.union(optional_reactions), biomass_eqn)
+                                                     base_reactions.union(optional_reactions), biomass_eqn,
+                                                     processes=processes)
 
     beginning_accuracy = accuracy(beginning_precision)
 
@@ -323,7 +607,8 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
     # first, lets see if we can limit the reactions based on compounds present and get better accuracy
     limited_rxn = PyFBA.gapfill.limit_reactions_by_compound(modeldata.reactions, base_reactions, optional_reactions)
     new_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata,
-                                               base_reactions.union(limited_rxn), biomass_eqn)
+                                               base_reactions.union(limited_rxn), biomass_eqn, minimum_tp=minimum_tp,
+                                               processes=processes)
     new_accuracy = accuracy(new_precision)
     msg = f"The improved accuracy is {new_accuracy}."
     log_and_message(msg, stderr=verbose)
@@ -341,6 +626,15 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
     msg = f"At the beginning the base list has {len(base_reactions)} and the " \
           f"optional list has {len(current_rx_list)} reactions"
     log_and_message(msg, stderr=verbose)
+
+    if strategy == 'ddmin':
+        accurate = partial(_accurate, growth_media, no_growth_media, modeldata, base_reactions, biomass_eqn,
+                           minimum_tp, processes)
+        remaining, tests = PyFBA.gapfill.ddmin(current_rx_list, accurate, verbose=verbose)
+        log_and_message(f"ddmin used {tests} tests ({tests * (len(growth_media) + len(no_growth_media))} FBAs). "
+                        f"There are {len(remaining)} reactions remaining: {remaining}", stderr=verbose)
+        return set(remaining)
+
     left = []
     right = []
     while test:
@@ -349,11 +643,17 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
         log_and_message(f"Lengths: left {len(left)} right {len(right)}", stderr=verbose)
         # left, right = percent_split(current_rx_list, percent)
         r2r = base_reactions.union(set(left))
-        l_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata, r2r, biomass_eqn)
+        # we only need the accuracy of a half if it has enough true positives, so we stop testing a half as
+        # soon as it can not have enough, or the right half can not be as accurate as the left half
+        l_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata, r2r, biomass_eqn,
+                                                 minimum_tp=minimum_tp, processes=processes)
         l_accuracy = accuracy(l_precision)
 
         r2r = base_reactions.union(set(right))
-        r_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata, r2r, biomass_eqn)
+        best_accuracy = l_accuracy if l_precision['tp'] > minimum_tp else None
+        r_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata, r2r, biomass_eqn,
+                                                 minimum_tp=minimum_tp, best_accuracy=best_accuracy,
+                                                 processes=processes)
         r_accuracy = accuracy(r_precision)
 
         if l_precision['tp'] > minimum_tp and r_precision['tp'] > minimum_tp:
@@ -384,12 +684,13 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
             while uneven_test and len(left) > 0 and len(right) > 0:
                 r2r = base_reactions.union(set(left))
                 l_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata,
-                                                         r2r, biomass_eqn)
+                                                         r2r, biomass_eqn, minimum_tp=minimum_tp,
+                                                         processes=processes)
                 l_accuracy = accuracy(l_precision)
 
                 r2r = base_reactions.union(set(right))
                 r_precision = calculate_precision_recall(growth_media, no_growth_media, modeldata,
-                                                         r2r, biomass_eqn)
+                                                         r2r, biomass_eqn, minimum_tp=0, processes=processes)
                 r_accuracy = accuracy(r_precision)
                 msg = f"Iteration: {itera} Try: {tries} Length: {len(left)} and {len(right)} " \
                       f"Growth: {l_precision['tp']} and {r_precision['tp']} Accuracy {l_accuracy} " \
@@ -425,7 +726,9 @@ def minimize_by_accuracy(base_reactions, optional_reactions, modeldata, growth_m
     return remaining
 
 
-def minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media, biomass_equation, verbose=False):
+def minimize_reactions(original_reactions_to_run, added_reactions, modeldata, media, biomass_equation,
+                       global_lp=False, processes=1, speculative=False, strategy='bisect', checkpoint=None,
+                       verbose=False):
     """
     Sort thorugh all the added reactions and return a dict of new reactions
     :param original_reactions_to_run: the original set from our genome
@@ -438,15 +741,36 @@ def minimize_reactions(original_reactions_to_run, added_reactions, modeldata, me
     :type media: set[PyFBA.metabolism.Compound]
     :param biomass_equation: our biomass equation
     :type biomass_equation: PyFBA.metabolism.Reaction
+    :param global_lp: choose the reactions from all the added reactions at once with a mixed integer program (or
+    a few linear programs) rather than bisecting each set of reactions (see PyFBA.gapfill.global_gapfill)
+    :type global_lp: bool
+    :param processes: the number of processes to test the bisections with (see minimize_additional_reactions)
+    :type processes: int
+    :param speculative: also test the next bisection while we are testing this one (see
+    minimize_additional_reactions)
+    :type speculative: bool
+    :param strategy: how to minimize each set of reactions: bisect or ddmin (see minimize_additional_reactions)
+    :type strategy: str
+    :param checkpoint: save the reactions that we keep from each step, and the sets of reactions that we know
+    grow, and use the reactions that we already kept if we are resuming (see PyFBA.gapfill.Checkpoint)
+    :type checkpoint: PyFBA.gapfill.Checkpoint
     :param verbose: more output
     :type verbose: bool
     :return: A dict of the minimal set of reactions and their source
     :rtype: dict[str, str]
     """
+    if global_lp:
+        return PyFBA.gapfill.global_gapfill(original_reactions_to_run, added_reactions, modeldata, media,
+                                            biomass_equation, processes=processes, speculative=speculative,
+                                            strategy=strategy, checkpoint=checkpoint, verbose=verbose)
+
     reqd_additional = set()
-    print(f"Before we began, we had {len(original_reactions_to_run)} reactions")
+    log_and_message(f"Before we began, we had {len(original_reactions_to_run)} reactions", stderr=verbose)
 
     rxn_source = {}
+    if checkpoint is not None:
+        checkpoint.watch(f"media {PyFBA.gapfill.media_digest(media)}",
+                         PyFBA.fba.growth_oracle(modeldata, media, biomass_equation))
 
     while added_reactions:
         ori = copy.deepcopy(original_reactions_to_run)
@@ -454,7 +778,7 @@ def minimize_reactions(original_reactions_to_run, added_reactions, modeldata, me
         # Test next set of gap-filled reactions
         # Each set is based on a method described above
         how, new = added_reactions.pop()
-        sys.stderr.write(f"Testing reactions from {how}\n")
+        log_and_message(f"Testing reactions from {how}", stderr=verbose)
 
         # Get all the other gap-filled reactions we need to add
         for tple in added_reactions:
@@ -466,8 +790,15 @@ def minimize_reactions(original_reactions_to_run, added_reactions, modeldata, me
 
         # Use minimization function to determine the minimal
         # set of gap-filled reactions from the current method
-        new_essential = minimize_additional_reactions(ori, new, modeldata, media, biomass_equation,
-                                                                    verbose=True)
+        new_essential = None
+        if checkpoint is not None:
+            new_essential = checkpoint.required(how, ori, new)
+        if new_essential is None:
+            new_essential = minimize_additional_reactions(ori, new, modeldata, media, biomass_equation,
+                                                          processes=processes, speculative=speculative,
+                                                          strategy=strategy, verbose=verbose)
+            if checkpoint is not None:
+                checkpoint.record_required(how, ori, new, new_essential)
         log_and_message(f"Saved {len(new_essential)} reactions from {how}", stderr=verbose)
         # Record the method used to determine
         # how the reaction was gap-filled
@@ -29,9 +29,8 @@ def test_growth(reactions_to_delete, reactions_to_run, modeldata, media, biomass
     """
 
     new_r2r = set([x for x in reactions_to_run if x not in reactions_to_delete])
-    PyFBA.fba.remove_uptake_and_secretion_reactions(reactions)
 
-    status, value, growth = PyFBA.fba.run_fba(modeldata, new_r2r, media, biomass_eqn)
+    status, value, growth = PyFBA.fba.run_fba(modeldata, new_r2r, media, biomass_eqn, growth_only=True)
 
     if verbose:
         sys.stderr.write("Deleted {} rxns. Use {}. Growth: {}\n".format(len(reactions_to_delete), len(new_r2r), growth))
@@ -1,5 +1,30 @@
-from .glpk_solver import load, row_bounds, col_bounds, objective_coefficients, solve
-from .glpk_solver import col_primal_hash, col_primals, row_primal_hash, row_primals
+from .backends import backends, backend_class, available_backends, default_backend, new_problem
+from .backends import get_default_problem
+from .backends import load, load_sparse, load_csr, row_bounds, col_bounds, objective_coefficients, solve
+from .backends import col_primal_hash, col_primals, row_primal_hash, row_primals
+from .backends import col_primal_array, col_dual_array, row_primal_array, row_dual_array
 
-__all__ = ['load', 'row_bounds', 'col_bounds', 'objective_coefficients', 'solve', 'col_primal_hash', 'col_primals',
-            'row_primal_hash', 'row_primals']
+__all__ = ['backends', 'backend_class', 'available_backends', 'default_backend', 'new_problem',
+           'get_default_problem', 'load', 'load_sparse', 'load_csr', 'row_bounds', 'col_bounds', 'objective_coefficients', 'solve',
+           'col_primal_hash', 'col_primals', 'row_primal_hash', 'row_primals',
+           'col_primal_array', 'col_dual_array', 'row_primal_array', 'row_dual_array']
+
+# the solvers are optional, as long as one of them is installed
+try:
+    from .glpk_solver import LPProblem
+    __all__.append('LPProblem')
+except ImportError:
+    pass
+
+try:
+    from .highs_solver import HiGHSProblem
+    __all__.append('HiGHSProblem')
+except ImportError:
+    pass
+
+
+def __getattr__(name):
+    # PyFBA.lp.default_problem is created the first time it is used, not when PyFBA is imported
+    if name == 'default_problem':
+        return get_default_problem()
+    raise AttributeError(f"module {__name__} has no attribute {name}")
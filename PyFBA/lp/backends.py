@@ -0,0 +1,321 @@
+import os
+from importlib import import_module
+
+"""
+
+Choose the linear programming backend.
+
+All the backends have the same interface (load, load_sparse, load_csr, row_bounds, col_bounds,
+objective_coefficients, solve, and the primal accessors), so the fba code does not need to know which
+solver is being used. Use new_problem to create a problem with a specific backend, or set the
+PYFBA_LP_BACKEND environment variable to choose the backend for the default problem and for any
+problem that is created without naming a backend.
+
+The backends are:
+    glpk:   GLPK via pyGLPK (PyFBA.lp.LPProblem)
+    highs:  HiGHS via scipy.optimize.linprog (PyFBA.lp.HiGHSProblem)
+
+"""
+
+# the backend name, and the module and class that implement it. The first one that can be imported is the default
+backends = {
+    'glpk': ('.glpk_solver', 'LPProblem'),
+    'highs': ('.highs_solver', 'HiGHSProblem'),
+}
+
+
+def backend_class(backend):
+    """
+    Get the class that implements a backend
+
+    :param backend: the name of the backend
+    :type backend: str
+    :return: the class for problems using this backend
+    :rtype: type
+    """
+    backend = backend.lower()
+    if backend not in backends:
+        raise ValueError(f"Unknown linear programming backend {backend}. Please choose one of " +
+                         ", ".join(backends))
+    module, cls = backends[backend]
+    return getattr(import_module(module, __package__), cls)
+
+
+def available_backends():
+    """
+    The backends whose solvers are installed
+
+    :return: the names of the backends that can be used
+    :rtype: list of str
+    """
+    available = []
+    for b in backends:
+        try:
+            backend_class(b)
+        except ImportError:
+            continue
+        available.append(b)
+    return available
+
+
+def default_backend():
+    """
+    The backend to use if one is not specified. This is the PYFBA_LP_BACKEND environment variable if it is set,
+    otherwise the first backend that is installed.
+
+    :return: the name of the default backend
+    :rtype: str
+    """
+    if os.environ.get('PYFBA_LP_BACKEND'):
+        return os.environ['PYFBA_LP_BACKEND'].lower()
+    available = available_backends()
+    if not available:
+        raise ImportError("No linear programming solver is installed. Please install pyGLPK or scipy")
+    return available[0]
+
+
+def new_problem(backend=None, **kwargs):
+    """
+    Create a new, empty linear programming problem
+
+    :param backend: the backend to use (e.g. glpk or highs). Default: default_backend()
+    :type backend: str
+    :param kwargs: any other arguments are passed to the problem (e.g. count_iterations)
+    :return: the new problem
+    :rtype: PyFBA.lp.LPProblem | PyFBA.lp.HiGHSProblem
+    """
+    if backend is None:
+        backend = default_backend()
+    return backend_class(backend)(**kwargs)
+
+
+# The default problem that the module level functions use. This is created the first time we need it
+_default_problem = None
+
+
+def get_default_problem():
+    """
+    The problem that the module level functions use, created with the default backend the first time we need it
+
+    :return: the default problem
+    :rtype: PyFBA.lp.LPProblem | PyFBA.lp.HiGHSProblem
+    """
+    global _default_problem
+    if _default_problem is None:
+        _default_problem = new_problem()
+    return _default_problem
+
+
+def __getattr__(name):
+    # default_problem is still available as a module attribute, but it is only created when it is used
+    if name == 'default_problem':
+        return get_default_problem()
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+
+def load(matrix, rowheaders=None, colheaders=None, verbose=False):
+    """
+    Load the data matrix into the default linear programming problem. See PyFBA.lp.LPProblem.load
+
+    :param matrix: the 2D array of data. It should not have row or column
+    headers, they can be specified separately
+    :type matrix: list of list
+    :param rowheaders: (optional) are the row identifiers
+    :type rowheaders: list
+    :param colheaders: (optional) are the column identifiers
+    :type colheaders: list
+    :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+    :type verbose: int
+    :return: void
+    :rtype: void
+
+    """
+    get_default_problem().load(matrix, rowheaders, colheaders, verbose=verbose)
+
+
+def load_sparse(matrix, nrows, ncols, rowheaders=None, colheaders=None, verbose=False):
+    """
+    Load a sparse matrix of (row, column, value) triplets into the default linear programming
+    problem. See PyFBA.lp.LPProblem.load_sparse
+
+    :param matrix: the (row, column, value) triplets of the non-zero elements
+    :type matrix: list of (int, int, float)
+    :param nrows: the number of rows in the matrix
+    :type nrows: int
+    :param ncols: the number of columns in the matrix
+    :type ncols: int
+    :param rowheaders: (optional) are the row identifiers
+    :type rowheaders: list
+    :param colheaders: (optional) are the column identifiers
+    :type colheaders: list
+    :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+    :type verbose: int
+    :return: void
+    :rtype: void
+    """
+    get_default_problem().load_sparse(matrix, nrows, ncols, rowheaders, colheaders, verbose=verbose)
+
+
+def load_csr(indptr, indices, data, ncols, rowheaders=None, colheaders=None, verbose=False):
+    """
+    Load a matrix in compressed sparse row (CSR) format into the default linear programming
+    problem. See PyFBA.lp.LPProblem.load_csr
+
+    :param indptr: the row pointers. This has one more element than there are rows
+    :type indptr: list of int
+    :param indices: the column index of each non-zero element
+    :type indices: list of int
+    :param data: the non-zero elements
+    :type data: list of float
+    :param ncols: the number of columns in the matrix
+    :type ncols: int
+    :param rowheaders: (optional) are the row identifiers
+    :type rowheaders: list
+    :param colheaders: (optional) are the column identifiers
+    :type colheaders: list
+    :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+    :type verbose: int
+    :return: void
+    :rtype: void
+    """
+    get_default_problem().load_csr(indptr, indices, data, ncols, rowheaders, colheaders, verbose=verbose)
+
+
+def row_bounds(bounds):
+    """
+    Set the bounds for the rows in the default linear programming problem.
+    This should either be an array of the same length as the number of rows,
+    where each element is a tuple of (lower bound, upper bound), or a dict
+    of row index and bounds for the rows to change. See PyFBA.lp.LPProblem.row_bounds
+
+    :param bounds: The bounds as a single tuple for each of the rows, or a dict of row index and bounds
+    :type bounds: list of tuples | dict of int and tuple
+    :return: The number of rows whose bounds were changed
+    :rtype: int
+
+    """
+    return get_default_problem().row_bounds(bounds)
+
+
+def col_bounds(bounds):
+    """
+    Set the bounds for the columns in the default linear programming problem.
+    This should either be an array of the same length as the number of columns,
+    where each element is a tuple of (lower bound, upper bound), or a dict
+    of column index and bounds for the columns to change. See PyFBA.lp.LPProblem.col_bounds
+
+    :param bounds: The bounds as a single tuple for each of the columns, or a dict of column index and bounds
+    :type bounds: list of tuples | dict of int and tuple
+    :return: The number of columns whose bounds were changed
+    :rtype: int
+    """
+    return get_default_problem().col_bounds(bounds)
+
+
+def objective_coefficients(coeff):
+    """
+    Set the objective coefficients of the default problem. coeff should be an array of
+    coefficients, or a dict of column index and coefficient for the coefficients to change
+
+    :param coeff: The objective cooefficient for the linear solver
+    :type coeff: list of float | dict of int and float
+    :return: void
+    :rtype: void
+    """
+    get_default_problem().objective_coefficients(coeff)
+
+
+def solve(warm=True):
+    """
+    Solve the default lp and return the status and the objective function
+    value. See PyFBA.lp.LPProblem.solve
+
+    :param warm: reuse the basis from the previous solve
+    :type warm: bool
+    :return: The status and value of the solution
+    :rtype: str, float
+
+    """
+    return get_default_problem().solve(warm=warm)
+
+
+def col_primal_hash():
+    """
+    Return a hash of the column names and the primals (activities)
+    associated with those columns in the default problem. This presumes that you have named
+    the columns
+
+    :return: A hash of the column names and their primals
+    :rtype: dict
+    """
+    return get_default_problem().col_primal_hash()
+
+
+def col_primals():
+    """
+    Return an array of the primals (activities), one for each column of the default problem
+
+    :return: A list of the column primals
+    :rtype: list
+    """
+    return get_default_problem().col_primals()
+
+
+def row_primal_hash():
+    """ Retrieve a hash of the primals (activity) of the rows of the default problem. This
+    presume that you have named the columns
+
+    :return: A hash of the row names and their primals
+    :rtype: dict
+    """
+    return get_default_problem().row_primal_hash()
+
+
+def row_primals():
+    """
+    Return an array of the primals (activities), one for each row of the default problem
+
+    :return: A list of the row primals
+    :rtype: list
+    """
+    return get_default_problem().row_primals()
+
+
+def col_primal_array():
+    """
+    Return a numpy array of the primals (activities), one for each column of the default problem
+
+    :return: An array of the column primals
+    :rtype: numpy.ndarray
+    """
+    return get_default_problem().col_primal_array()
+
+
+def col_dual_array():
+    """
+    Return a numpy array of the reduced costs, one for each column of the default problem
+
+    :return: An array of the reduced costs
+    :rtype: numpy.ndarray
+    """
+    return get_default_problem().col_dual_array()
+
+
+def row_primal_array():
+    """
+    Return a numpy array of the primals (activities), one for each row of the default problem
+
+    :return: An array of the row primals
+    :rtype: numpy.ndarray
+    """
+    return get_default_problem().row_primal_array()
+
+
+def row_dual_array():
+    """
+    Return a numpy array of the shadow prices, one for each row of the default problem
+
+    :return: An array of the shadow prices
+    :rtype: numpy.ndarray
+    """
+    return get_default_problem().row_dual_array()
@@ -1,5 +1,6 @@
 import sys
 import glpk
+import numpy as np
 
 from PyFBA import log_and_message
 
@@ -11,206 +12,473 @@ This is a generic linear programming wrapper that I wrote that we can
 build upon for fba work, but it is not limited to fba.
 
 Do not use the standard pyGLK. The only version that I could get to
-compile is https://github.com/bradfordboyle/pyglpk 
+compile is https://github.com/bradfordboyle/pyglpk
 
+Each LPProblem holds its own GLPK problem, so you can have more than one
+problem loaded at once (e.g. one per thread or worker process). The module
+level functions in PyFBA.lp are thin wrappers around a default problem, see
+PyFBA.lp.backends
 
 """
 
-solver = glpk.LPX()
 
-
-def load(matrix, rowheaders=None, colheaders=None, verbose=False):
-    """
-    Load the data matrix into the linear programming solver
-
-    :param matrix: the 2D array of data. It should not have row or column
-    headers, they can be specified separately
-    :type matrix: list of list
-    :param rowheaders: (optional) are the row identifiers
-    :type rowheaders: list
-    :param colheaders: (optional) are the column identifiers
-    :type colheaders: list
-    :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
-    :type verbose: int
-    :return: void
-    :rtype: void
-
-    """
-    global solver
-
-    solver.erase()
-
-    solver.obj.maximize = True
-
-    nrows = len(matrix)
-    ncols = len(matrix[0])
-
-    if verbose:
-        log_and_message(f"We are loading {nrows} rows and {ncols} columns", stderr=True)
-
-    solver.rows.add(nrows)
-    solver.cols.add(ncols)
-
-    # we need to flatten the 2D array before we add it to the lp object
-    temp = []
-    for i in range(len(matrix)):
-        for j in range(len(matrix[0])):
-            temp.append(matrix[i][j])
-
-    if verbose > 4:
-        log_and_message("Matrix: " + str(temp) + "\n")
-    solver.matrix = temp
-
-    # name the rows and columns
-    if rowheaders and len(rowheaders) == nrows:
-        for i in range(len(rowheaders)):
-            if len(rowheaders[i]) > 255:
-                if verbose:
-                    log_and_message(f"WARNING ROW HEADER: {rowheaders[i]} truncated to 255 characters", stderr=True)
-                solver.rows[i].name = rowheaders[i][0:255]
-            else:
-                solver.rows[i].name = rowheaders[i]
-    elif rowheaders:
-        raise ValueError("The size of row headers (" + str(len(rowheaders)) +
-                         ") does not match the expected number of rows (" + str(nrows) + "\n")
-
-    if colheaders and len(colheaders) == ncols:
-        for i in range(len(colheaders)):
-            if len(colheaders[i]) > 255:
-                if verbose > 0:
-                    log_and_message(f"WARNING COL HEADER: {colheaders[i]} truncated to 255 characters", stderr=True)
-                solver.cols[i].name = colheaders[i][0:255]
-            else:
-                solver.cols[i].name = colheaders[i]
-    elif colheaders:
-        raise ValueError("Warning: the size of col headers (" + str(len(colheaders)) +
-                         ") does not match the expected number of cols (" + str(ncols) + "\n")
-
-
-def row_bounds(bounds):
-    """
-    Set the bounds for the rows in the linear programming. 
-    This should be an array of the same length as the number of rows, 
-    and each element should be a tuple of (lower bound, upper bound)
-
-    :param bounds: The bounds as a single tuple for each of the rows
-    :type bounds: list of tuples
-    :return: void
-    :rtype: void
-
-    """
-
-    global solver
-    if len(bounds) != len(solver.rows):
-        raise ValueError("There must be the same number of bounds as rows bounds:" + str(bounds) + " rows: " + str(len(
-            solver.rows)) + "\n")
-
-    for i in range(len(bounds)):
-        solver.rows[i].bounds = bounds[i]
-
-
-def col_bounds(bounds):
+class LPProblem:
     """
-    Set the bounds for the columns in the linear programming.
-    This should be an array of the same length as the number of columns,
-    and each element should be a tuple of (lower bound, upper bound)
-
-    :param bounds: The bounds as a single tuple for each of the columns
-    :type bounds: list of tuples
-    :return: void
-    :rtype: void
+    A linear programming problem that is solved with GLPK.
+
+    The problem keeps the last basis between calls to solve. If only the bounds have changed since the
+    last solve (e.g. when switching reactions off or changing the media) the previous optimal basis is
+    still dual feasible, and we re-solve from it with the dual simplex rather than starting again.
+
+    :ivar solver: the underlying glpk.LPX object
+    :ivar maximize: maximize (True) or minimize (False) the objective
+    :ivar count_iterations: record the number of basis changes for each solve
+    :ivar iterations: the number of basis changes in the last solve (if count_iterations is True)
+    :ivar total_iterations: the number of basis changes in all the solves (if count_iterations is True)
+    :ivar solves: the number of times this problem has been solved
+    :ivar warm_solves: the number of solves that started from the previous basis with the dual simplex
+    :ivar row_bound_values: the bounds that we have set on each row
+    :ivar col_bound_values: the bounds that we have set on each column
+    :ivar row_names: the row headers (or None if they were not provided)
+    :ivar col_names: the column headers (or None if they were not provided)
+    :ivar row_index: a dict of row header and its index
+    :ivar col_index: a dict of column header and its index
     """
 
-    global solver
-    if len(bounds) != len(solver.cols):
-        raise ValueError("There must be the same number of bounds as cols")
-
-    for i in range(len(bounds)):
-        solver.cols[i].bounds = bounds[i]
-
+    def __init__(self, count_iterations=False):
+        """
+        Initiate the object with an empty GLPK problem
+
+        :param count_iterations: record the number of basis changes for each solve. pyGLPK does not
+        expose the GLPK simplex iteration count, so we count the variables that enter the basis, which is
+        a lower bound on the number of simplex iterations. This requires looking at every row and column
+        so it is off by default.
+        :type count_iterations: bool
+        """
+        self.solver = glpk.LPX()
+        self.count_iterations = count_iterations
+        self.basis_valid = False
+        self.objective_changed = True
+        self.iterations = None
+        self.total_iterations = 0
+        self.solves = 0
+        self.warm_solves = 0
+        self.row_bound_values = []
+        self.col_bound_values = []
+        self.row_names = None
+        self.col_names = None
+        self.row_index = {}
+        self.col_index = {}
+
+    def load(self, matrix, rowheaders=None, colheaders=None, verbose=False):
+        """
+        Load the data matrix into the linear programming solver
+
+        The dense matrix is converted to (row, column, value) triplets of the non-zero
+        elements and passed to load_sparse. If you already have a sparse representation
+        use load_sparse or load_csr directly and avoid building the dense matrix.
+
+        :param matrix: the 2D array of data. It should not have row or column
+        headers, they can be specified separately
+        :type matrix: list of list
+        :param rowheaders: (optional) are the row identifiers
+        :type rowheaders: list
+        :param colheaders: (optional) are the column identifiers
+        :type colheaders: list
+        :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+        :type verbose: int
+        :return: void
+        :rtype: void
+
+        """
+
+        nrows = len(matrix)
+        ncols = len(matrix[0])
+
+        triplets = []
+        for i in range(nrows):
+            for j in range(ncols):
+                if matrix[i][j]:
+                    triplets.append((i, j, matrix[i][j]))
+
+        self.load_sparse(triplets, nrows, ncols, rowheaders, colheaders, verbose=verbose)
+
+    def load_sparse(self, matrix, nrows, ncols, rowheaders=None, colheaders=None, verbose=False):
+        """
+        Load a sparse matrix into the linear programming solver. The matrix is
+        a list of (row index, column index, value) triplets for the non-zero
+        elements (i.e. coordinate or COO format). Only these values are passed to GLPK.
+
+        :param matrix: the (row, column, value) triplets of the non-zero elements
+        :type matrix: list of (int, int, float)
+        :param nrows: the number of rows in the matrix
+        :type nrows: int
+        :param ncols: the number of columns in the matrix
+        :type ncols: int
+        :param rowheaders: (optional) are the row identifiers
+        :type rowheaders: list
+        :param colheaders: (optional) are the column identifiers
+        :type colheaders: list
+        :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+        :type verbose: int
+        :return: void
+        :rtype: void
+        """
+
+        solver = self.solver
+        solver.erase()
+        self.basis_valid = False
+        self.objective_changed = True
+
+        solver.obj.maximize = True
+
+        if verbose:
+            log_and_message(f"We are loading {nrows} rows and {ncols} columns with {len(matrix)} non-zero elements",
+                            stderr=True)
+
+        solver.rows.add(nrows)
+        solver.cols.add(ncols)
+        self.row_bound_values = [None] * nrows
+        self.col_bound_values = [None] * ncols
+        self.row_names = None
+        self.col_names = None
+        self.row_index = {}
+        self.col_index = {}
+
+        if verbose > 4:
+            log_and_message("Matrix: " + str(matrix) + "\n")
+        solver.matrix = matrix
+
+        # name the rows and columns
+        if rowheaders and len(rowheaders) == nrows:
+            for i in range(len(rowheaders)):
+                if len(rowheaders[i]) > 255:
+                    if verbose:
+                        log_and_message(f"WARNING ROW HEADER: {rowheaders[i]} truncated to 255 characters",
+                                        stderr=True)
+                    solver.rows[i].name = rowheaders[i][0:255]
+                else:
+                    solver.rows[i].name = rowheaders[i]
+            self.row_names = list(rowheaders)
+            self.row_index = {r: i for i, r in enumerate(self.row_names)}
+        elif rowheaders:
+            raise ValueError("The size of row headers (" + str(len(rowheaders)) +
+                             ") does not match the expected number of rows (" + str(nrows) + "\n")
+
+        if colheaders and len(colheaders) == ncols:
+            for i in range(len(colheaders)):
+                if len(colheaders[i]) > 255:
+                    if verbose > 0:
+                        log_and_message(f"WARNING COL HEADER: {colheaders[i]} truncated to 255 characters",
+                                        stderr=True)
+                    solver.cols[i].name = colheaders[i][0:255]
+                else:
+                    solver.cols[i].name = colheaders[i]
+            self.col_names = list(colheaders)
+            self.col_index = {c: i for i, c in enumerate(self.col_names)}
+        elif colheaders:
+            raise ValueError("Warning: the size of col headers (" + str(len(colheaders)) +
+                             ") does not match the expected number of cols (" + str(ncols) + "\n")
+
+    def load_csr(self, indptr, indices, data, ncols, rowheaders=None, colheaders=None, verbose=False):
+        """
+        Load a matrix in compressed sparse row (CSR) format into the linear programming solver.
+        The values for row i are data[indptr[i]:indptr[i+1]] in the columns indices[indptr[i]:indptr[i+1]].
+
+        :param indptr: the row pointers. This has one more element than there are rows
+        :type indptr: list of int
+        :param indices: the column index of each non-zero element
+        :type indices: list of int
+        :param data: the non-zero elements
+        :type data: list of float
+        :param ncols: the number of columns in the matrix
+        :type ncols: int
+        :param rowheaders: (optional) are the row identifiers
+        :type rowheaders: list
+        :param colheaders: (optional) are the column identifiers
+        :type colheaders: list
+        :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+        :type verbose: int
+        :return: void
+        :rtype: void
+        """
+
+        nrows = len(indptr) - 1
+        triplets = []
+        for i in range(nrows):
+            for k in range(indptr[i], indptr[i + 1]):
+                triplets.append((i, indices[k], data[k]))
+
+        self.load_sparse(triplets, nrows, ncols, rowheaders, colheaders, verbose=verbose)
+
+    def row_bounds(self, bounds):
+        """
+        Set the bounds for the rows in the linear programming.
+        This should either be an array of the same length as the number of rows,
+        where each element is a tuple of (lower bound, upper bound), or a dict
+        of row index and (lower bound, upper bound) for just the rows that you want to change.
+
+        We remember the bounds that we have set and only pass the bounds that have changed
+        since the last call to GLPK.
+
+        :param bounds: The bounds as a single tuple for each of the rows, or a dict of row index and bounds
+        :type bounds: list of tuples | dict of int and tuple
+        :return: The number of rows whose bounds were changed
+        :rtype: int
+
+        """
+
+        solver = self.solver
+        if not isinstance(bounds, dict) and len(bounds) != len(solver.rows):
+            raise ValueError("There must be the same number of bounds as rows bounds:" + str(bounds) + " rows: " +
+                             str(len(solver.rows)) + "\n")
+
+        return self._set_bounds(solver.rows, self.row_bound_values, bounds)
+
+    def col_bounds(self, bounds):
+        """
+        Set the bounds for the columns in the linear programming.
+        This should either be an array of the same length as the number of columns,
+        where each element is a tuple of (lower bound, upper bound), or a dict
+        of column index and (lower bound, upper bound) for just the columns that you want to change.
+
+        We remember the bounds that we have set and only pass the bounds that have changed
+        since the last call to GLPK.
+
+        :param bounds: The bounds as a single tuple for each of the columns, or a dict of column index and bounds
+        :type bounds: list of tuples | dict of int and tuple
+        :return: The number of columns whose bounds were changed
+        :rtype: int
+        """
+
+        solver = self.solver
+        if not isinstance(bounds, dict) and len(bounds) != len(solver.cols):
+            raise ValueError("There must be the same number of bounds as cols")
+
+        return self._set_bounds(solver.cols, self.col_bound_values, bounds)
+
+    @staticmethod
+    def _set_bounds(bars, current, bounds):
+        """
+        Set the bounds on the rows or columns that have changed
+
+        :param bars: the GLPK rows or columns
+        :param current: the bounds that we last set on each row or column (None if we have not set them)
+        :type current: list
+        :param bounds: the new bounds as a list of tuples or a dict of index and tuple
+        :type bounds: list of tuples | dict of int and tuple
+        :return: the number of bounds that were changed
+        :rtype: int
+        """
+
+        if isinstance(bounds, dict):
+            items = bounds.items()
+        else:
+            items = enumerate(bounds)
+
+        changed = 0
+        for i, b in items:
+            b = tuple(b)
+            if current[i] != b:
+                bars[i].bounds = b
+                current[i] = b
+                changed += 1
+        return changed
+
+    def objective_coefficients(self, coeff):
+        """
+        Set the objective coefficients. coeff should be an array of
+        coefficients, or a dict of column index and coefficient for just the
+        coefficients that you want to change
+
+        :param coeff: The objective cooefficient for the linear solver
+        :type coeff: list of float | dict of int and float
+        :return: void
+        :rtype: void
+        """
+
+        if isinstance(coeff, dict):
+            for i, c in coeff.items():
+                self.solver.obj[i] = c
+        else:
+            self.solver.obj[:] = coeff
+        self.objective_changed = True
+
+    def objective_coefficient(self, col):
+        """
+        The objective coefficient of a column
+
+        :param col: the index of the column
+        :type col: int
+        :return: the objective coefficient
+        :rtype: float
+        """
+        return self.solver.obj[col]
+
+    @property
+    def ncols(self):
+        """
+        The number of columns in the matrix
+        """
+        return len(self.solver.cols)
+
+    @property
+    def maximize(self):
+        """
+        Whether we maximize (True) or minimize (False) the objective
+        """
+        return self.solver.obj.maximize
+
+    @maximize.setter
+    def maximize(self, maximize):
+        if self.solver.obj.maximize != maximize:
+            self.solver.obj.maximize = maximize
+            self.objective_changed = True
+
+    def _basis(self):
+        """
+        The status of every column and row, e.g. 'bs' if it is in the basis
+
+        :return: A list of the statuses
+        :rtype: list of str
+        """
+        return [c.status for c in self.solver.cols] + [r.status for r in self.solver.rows]
+
+    def solve(self, warm=True):
+        """
+        Solve the lp and return the status and the objective function
+        value
+
+        If warm is True and the objective has not changed since the last solve, we start
+        from the previous basis with the dual simplex. Otherwise we use the primal simplex, which
+        also starts from the previous basis unless warm is False. The previous basis is still primal
+        feasible when only the objective has changed.
+
+        :param warm: reuse the basis from the previous solve
+        :type warm: bool
+        :return: The status and value of the solution
+        :rtype: str, float
+
+        """
+
+        if not warm:
+            self.solver.std_basis()
+            self.basis_valid = False
+
+        before = None
+        if self.count_iterations:
+            before = self._basis()
+
+        if self.basis_valid and not self.objective_changed:
+            # only the bounds have changed so the last basis is still dual feasible
+            retval = self.solver.simplex(meth=glpk.LPX.DUALP)
+            self.warm_solves += 1
+        else:
+            retval = self.solver.simplex()
+        self.basis_valid = retval is None
+        self.objective_changed = False
+        self.solves += 1
+
+        if before is not None:
+            after = self._basis()
+            self.iterations = sum(1 for b, a in zip(before, after) if a == 'bs' and b != 'bs')
+            self.total_iterations += self.iterations
+
+        return self.solver.status, self.solver.obj.value
+
+    def col_primal_hash(self):
+        """
+        Return a hash of the column names and the primals (activities)
+        associated with those columns. This presumes that you have named
+        the columns
+
+        :return: A hash of the column names and their primals
+        :rtype: dict
+        """
+
+        if self.col_names is not None:
+            return dict(zip(self.col_names, self.col_primal_array().tolist()))
+
+        d = {}
+        for c in self.solver.cols:
+            d[c.name] = c.primal
+        return d
+
+    def col_primals(self):
+        """
+        Return an array of the primals (activities), one for each column
+
+        :return: A list of the column primals
+        :rtype: list
+        """
+
+        d = []
+        for c in self.solver.cols:
+            d.append(c.primal)
+        return d
+
+    def row_primal_hash(self):
+        """ Retrieve a hash of the primals (activity) of the rows. This
+        presume that you have named the columns
+
+        :return: A hash of the row names and their primals
+        :rtype: dict
+        """
+
+        d = {}
+        for r in self.solver.rows:
+            d[r.name] = r.primal
+        return d
+
+    def row_primals(self):
+        """
+        Return an array of the primals (activities), one for each column
+
+        :return: A list of the row primals
+        :rtype: list
+        """
+
+        d = []
+        for r in self.solver.rows:
+            d.append(r.primal)
+        return d
+
+    def col_primal_array(self):
+        """
+        Return a numpy array of the primals (activities), one for each column
+
+        :return: An array of the column primals
+        :rtype: numpy.ndarray
+        """
+
+        return np.fromiter((c.primal for c in self.solver.cols), dtype=float, count=len(self.solver.cols))
 
-def objective_coefficients(coeff):
-    """
-    Set the objective coefficients. coeff should be an array of
-    coefficients
-
-    :param coeff: The objective cooefficient for the linear solver
-    :type coeff: list of float
-    :return: void
-    :rtype: void
-    """
-    global solver
-    solver.obj[:] = coeff
+    def col_dual_array(self):
+        """
+        Return a numpy array of the duals of the columns. These are the reduced costs of each column
 
+        :return: An array of the reduced costs
+        :rtype: numpy.ndarray
+        """
 
-def solve():
-    """
-    Solve the lp and return the status and the objective function
-    value
-
-    :return: The status and value of the solution
-    :rtype: str, float
-
-    """
-    solver.simplex()
-    return solver.status, solver.obj.value
-
-
-def col_primal_hash():
-    """
-    Return a hash of the column names and the primals (activities)
-    associated with those columns. This presumes that you have named
-    the columns
-
-    :return: A hash of the column names and their primals
-    :rtype: dict
-    """
-
-    d = {}
-    for c in solver.cols:
-        d[c.name] = c.primal
-    return d
-
-
-def col_primals():
-    """
-    Return an array of the primals (activities), one for each column
-
-    :return: A list of the column primals
-    :rtype: list
-    """
-
-    d = []
-    for c in solver.cols:
-        d.append(c.primal)
-    return d
-
-
-def row_primal_hash():
-    """ Retrieve a hash of the primals (activity) of the rows. This
-    presume that you have named the columns
-
-    :return: A hash of the row names and their primals
-    :rtype: dict
-    """
-
-    d = {}
-    for r in solver.rows:
-        d[r.name] = r.primal
-    return d
-
-
-def row_primals():
-    """
-    Return an array of the primals (activities), one for each column
-
-    :return: A list of the row primals
-    :rtype: list
-    """
+        return np.fromiter((c.dual for c in self.solver.cols), dtype=float, count=len(self.solver.cols))
+
+    def row_primal_array(self):
+        """
+        Return a numpy array of the primals (activities), one for each row
+
+        :return: An array of the row primals
+        :rtype: numpy.ndarray
+        """
+
+        return np.fromiter((r.primal for r in self.solver.rows), dtype=float, count=len(self.solver.rows))
 
-    d = []
-    for r in solver.rows:
-        d.append(r.primal)
-    return d
+    def row_dual_array(self):
+        """
+        Return a numpy array of the duals of the rows. These are the shadow prices of each row
 
+        :return: An array of the shadow prices
+        :rtype: numpy.ndarray
+        """
 
+        return np.fromiter((r.dual for r in self.solver.rows), dtype=float, count=len(self.solver.rows))
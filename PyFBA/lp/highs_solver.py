@@ -0,0 +1,425 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from PyFBA import log_and_message
+
+"""
+
+Run linear programming using the HiGHS solver that is included with scipy.
+
+This has the same interface as the GLPK LPProblem, so either can be used for the fba
+work. scipy installs from wheels on all platforms, so this backend does not need any
+libraries to be compiled.
+
+scipy.optimize.linprog does not support bounds on the rows, so we add a slack variable
+for every row. The matrix we solve is [A  -I] [x s]^T = 0, and the row bounds become the
+bounds on the slack variables.
+
+"""
+
+
+class HiGHSProblem:
+    """
+    A linear programming problem that is solved with HiGHS via scipy.optimize.linprog.
+
+    The matrix is stored as a sparse matrix and the bounds and objective are stored as numpy
+    arrays, so changing the bounds between solves is cheap. linprog does not allow us to
+    restart from the previous basis, so every solve starts from scratch.
+
+    :ivar maximize: maximize (True) or minimize (False) the objective
+    :ivar count_iterations: record the number of simplex iterations for each solve
+    :ivar iterations: the number of simplex iterations in the last solve (if count_iterations is True)
+    :ivar total_iterations: the number of simplex iterations in all the solves (if count_iterations is True)
+    :ivar solves: the number of times this problem has been solved
+    :ivar warm_solves: always 0 as linprog can not start from a previous basis
+    :ivar row_bound_values: the bounds that we have set on each row
+    :ivar col_bound_values: the bounds that we have set on each column
+    :ivar row_names: the row headers (or None if they were not provided)
+    :ivar col_names: the column headers (or None if they were not provided)
+    :ivar row_index: a dict of row header and its index
+    :ivar col_index: a dict of column header and its index
+    :ivar result: the scipy.optimize.OptimizeResult from the last solve
+    """
+
+    statuses = {0: 'opt', 1: 'undef', 2: 'nofeas', 3: 'unbnd', 4: 'undef'}
+
+    def __init__(self, count_iterations=False):
+        """
+        Initiate the object with an empty problem
+
+        :param count_iterations: record the number of simplex iterations for each solve
+        :type count_iterations: bool
+        """
+        self.maximize = True
+        self.count_iterations = count_iterations
+        self.iterations = None
+        self.total_iterations = 0
+        self.solves = 0
+        self.warm_solves = 0
+        self.nrows = 0
+        self.ncols = 0
+        self.matrix = None
+        self.lower = np.zeros(0)
+        self.upper = np.zeros(0)
+        self.objective = np.zeros(0)
+        self.row_bound_values = []
+        self.col_bound_values = []
+        self.row_names = None
+        self.col_names = None
+        self.row_index = {}
+        self.col_index = {}
+        self.result = None
+
+    def load(self, matrix, rowheaders=None, colheaders=None, verbose=False):
+        """
+        Load the data matrix into the linear programming solver
+
+        :param matrix: the 2D array of data. It should not have row or column
+        headers, they can be specified separately
+        :type matrix: list of list
+        :param rowheaders: (optional) are the row identifiers
+        :type rowheaders: list
+        :param colheaders: (optional) are the column identifiers
+        :type colheaders: list
+        :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+        :type verbose: int
+        :return: void
+        :rtype: void
+        """
+
+        nrows = len(matrix)
+        ncols = len(matrix[0])
+
+        triplets = []
+        for i in range(nrows):
+            for j in range(ncols):
+                if matrix[i][j]:
+                    triplets.append((i, j, matrix[i][j]))
+
+        self.load_sparse(triplets, nrows, ncols, rowheaders, colheaders, verbose=verbose)
+
+    def load_sparse(self, matrix, nrows, ncols, rowheaders=None, colheaders=None, verbose=False):
+        """
+        Load a sparse matrix into the linear programming solver. The matrix is
+        a list of (row index, column index, value) triplets for the non-zero
+        elements (i.e. coordinate or COO format).
+
+        As with GLPK, the new columns are fixed at zero and the new rows are free until you set their bounds.
+
+        :param matrix: the (row, column, value) triplets of the non-zero elements
+        :type matrix: list of (int, int, float)
+        :param nrows: the number of rows in the matrix
+        :type nrows: int
+        :param ncols: the number of columns in the matrix
+        :type ncols: int
+        :param rowheaders: (optional) are the row identifiers
+        :type rowheaders: list
+        :param colheaders: (optional) are the column identifiers
+        :type colheaders: list
+        :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+        :type verbose: int
+        :return: void
+        :rtype: void
+        """
+
+        if rowheaders and len(rowheaders) != nrows:
+            raise ValueError("The size of row headers (" + str(len(rowheaders)) +
+                             ") does not match the expected number of rows (" + str(nrows) + "\n")
+        if colheaders and len(colheaders) != ncols:
+            raise ValueError("Warning: the size of col headers (" + str(len(colheaders)) +
+                             ") does not match the expected number of cols (" + str(ncols) + "\n")
+
+        if verbose:
+            log_and_message(f"We are loading {nrows} rows and {ncols} columns with {len(matrix)} non-zero elements",
+                            stderr=True)
+
+        if matrix:
+            rows, cols, values = zip(*matrix)
+        else:
+            rows, cols, values = [], [], []
+        a = sparse.coo_matrix((values, (rows, cols)), shape=(nrows, ncols), dtype=float)
+        self.matrix = sparse.hstack([a, -sparse.identity(nrows, format='coo')], format='csr')
+
+        self.nrows = nrows
+        self.ncols = ncols
+        # the columns are fixed at zero and the slack variables (rows) are free
+        self.lower = np.concatenate([np.zeros(ncols), np.full(nrows, -np.inf)])
+        self.upper = np.concatenate([np.zeros(ncols), np.full(nrows, np.inf)])
+        self.objective = np.zeros(ncols)
+        self.maximize = True
+        self.row_bound_values = [None] * nrows
+        self.col_bound_values = [None] * ncols
+        self.result = None
+
+        self.row_names = list(rowheaders) if rowheaders else None
+        self.row_index = {r: i for i, r in enumerate(rowheaders)} if rowheaders else {}
+        self.col_names = list(colheaders) if colheaders else None
+        self.col_index = {c: i for i, c in enumerate(colheaders)} if colheaders else {}
+
+    def load_csr(self, indptr, indices, data, ncols, rowheaders=None, colheaders=None, verbose=False):
+        """
+        Load a matrix in compressed sparse row (CSR) format into the linear programming solver.
+        The values for row i are data[indptr[i]:indptr[i+1]] in the columns indices[indptr[i]:indptr[i+1]].
+
+        :param indptr: the row pointers. This has one more element than there are rows
+        :type indptr: list of int
+        :param indices: the column index of each non-zero element
+        :type indices: list of int
+        :param data: the non-zero elements
+        :type data: list of float
+        :param ncols: the number of columns in the matrix
+        :type ncols: int
+        :param rowheaders: (optional) are the row identifiers
+        :type rowheaders: list
+        :param colheaders: (optional) are the column identifiers
+        :type colheaders: list
+        :param verbose: verbose turns on some debugging output. The higher the number the more output is generated
+        :type verbose: int
+        :return: void
+        :rtype: void
+        """
+
+        nrows = len(indptr) - 1
+        triplets = []
+        for i in range(nrows):
+            for k in range(indptr[i], indptr[i + 1]):
+                triplets.append((i, indices[k], data[k]))
+
+        self.load_sparse(triplets, nrows, ncols, rowheaders, colheaders, verbose=verbose)
+
+    def row_bounds(self, bounds):
+        """
+        Set the bounds for the rows in the linear programming.
+        This should either be an array of the same length as the number of rows,
+        where each element is a tuple of (lower bound, upper bound), or a dict
+        of row index and (lower bound, upper bound) for just the rows that you want to change.
+
+        :param bounds: The bounds as a single tuple for each of the rows, or a dict of row index and bounds
+        :type bounds: list of tuples | dict of int and tuple
+        :return: The number of rows whose bounds were changed
+        :rtype: int
+        """
+
+        if not isinstance(bounds, dict) and len(bounds) != self.nrows:
+            raise ValueError("There must be the same number of bounds as rows bounds:" + str(bounds) + " rows: " +
+                             str(self.nrows) + "\n")
+
+        return self._set_bounds(self.ncols, self.row_bound_values, bounds)
+
+    def col_bounds(self, bounds):
+        """
+        Set the bounds for the columns in the linear programming.
+        This should either be an array of the same length as the number of columns,
+        where each element is a tuple of (lower bound, upper bound), or a dict
+        of column index and (lower bound, upper bound) for just the columns that you want to change.
+
+        :param bounds: The bounds as a single tuple for each of the columns, or a dict of column index and bounds
+        :type bounds: list of tuples | dict of int and tuple
+        :return: The number of columns whose bounds were changed
+        :rtype: int
+        """
+
+        if not isinstance(bounds, dict) and len(bounds) != self.ncols:
+            raise ValueError("There must be the same number of bounds as cols")
+
+        return self._set_bounds(0, self.col_bound_values, bounds)
+
+    def _set_bounds(self, offset, current, bounds):
+        """
+        Set the bounds on the rows or columns that have changed. None means there is no bound.
+
+        :param offset: the position of the first row or column in the lower and upper bound arrays
+        :type offset: int
+        :param current: the bounds that we last set on each row or column (None if we have not set them)
+        :type current: list
+        :param bounds: the new bounds as a list of tuples or a dict of index and tuple
+        :type bounds: list of tuples | dict of int and tuple
+        :return: the number of bounds that were changed
+        :rtype: int
+        """
+
+        if isinstance(bounds, dict):
+            items = bounds.items()
+        else:
+            items = enumerate(bounds)
+
+        changed = 0
+        for i, b in items:
+            b = tuple(b)
+            if current[i] != b:
+                lower, upper = b
+                self.lower[offset + i] = -np.inf if lower is None else lower
+                self.upper[offset + i] = np.inf if upper is None else upper
+                current[i] = b
+                changed += 1
+        return changed
+
+    def objective_coefficients(self, coeff):
+        """
+        Set the objective coefficients. coeff should be an array of
+        coefficients, or a dict of column index and coefficient for just the
+        coefficients that you want to change
+
+        :param coeff: The objective cooefficient for the linear solver
+        :type coeff: list of float | dict of int and float
+        :return: void
+        :rtype: void
+        """
+
+        if isinstance(coeff, dict):
+            for i, c in coeff.items():
+                self.objective[i] = c
+            return
+        if len(coeff) != self.ncols:
+            raise ValueError(f"There are {len(coeff)} objective coefficients but {self.ncols} columns")
+        self.objective = np.asarray(coeff, dtype=float)
+
+    def objective_coefficient(self, col):
+        """
+        The objective coefficient of a column
+
+        :param col: the index of the column
+        :type col: int
+        :return: the objective coefficient
+        :rtype: float
+        """
+        return self.objective.item(col)
+
+    def solve(self, warm=True):
+        """
+        Solve the lp and return the status and the objective function
+        value
+
+        :param warm: ignored. linprog can not start from the previous basis
+        :type warm: bool
+        :return: The status and value of the solution
+        :rtype: str, float
+        """
+
+        sign = -1 if self.maximize else 1
+        c = np.concatenate([sign * self.objective, np.zeros(self.nrows)])
+        self.result = linprog(c, A_eq=self.matrix if self.nrows else None,
+                              b_eq=np.zeros(self.nrows) if self.nrows else None,
+                              bounds=np.column_stack([self.lower, self.upper]), method='highs')
+        self.solves += 1
+
+        if self.count_iterations:
+            self.iterations = self.result.nit
+            self.total_iterations += self.iterations
+
+        status = self.statuses.get(self.result.status, 'undef')
+        if self.result.x is None:
+            return status, 0.0
+        return status, float(self.objective @ self.result.x[:self.ncols])
+
+    def _values(self, x):
+        """
+        The values of the variables from the last solve, or zeros if there is no solution
+
+        :param x: the values of all the variables (columns then slack variables) from linprog
+        :type x: numpy.ndarray | None
+        :return: An array with a value for every column and row
+        :rtype: numpy.ndarray
+        """
+        if x is None:
+            return np.zeros(self.ncols + self.nrows)
+        return x
+
+    def _marginals(self):
+        """
+        The sensitivity of the objective to the bounds of every column and slack variable. This is the reduced cost
+        of the columns and the shadow price of the rows, with the same sign convention as GLPK
+
+        :return: An array with a marginal for every column and row
+        :rtype: numpy.ndarray
+        """
+        if self.result is None or self.result.x is None:
+            return np.zeros(self.ncols + self.nrows)
+        marginals = self.result.lower.marginals + self.result.upper.marginals
+        # linprog minimizes, so the marginals of a maximization are the negative of what we want
+        return -marginals if self.maximize else marginals
+
+    def col_primal_hash(self):
+        """
+        Return a hash of the column names and the primals (activities)
+        associated with those columns. This presumes that you have named
+        the columns
+
+        :return: A hash of the column names and their primals
+        :rtype: dict
+        """
+
+        names = self.col_names if self.col_names is not None else [None] * self.ncols
+        return dict(zip(names, self.col_primal_array().tolist()))
+
+    def col_primals(self):
+        """
+        Return an array of the primals (activities), one for each column
+
+        :return: A list of the column primals
+        :rtype: list
+        """
+
+        return self.col_primal_array().tolist()
+
+    def row_primal_hash(self):
+        """ Retrieve a hash of the primals (activity) of the rows. This
+        presume that you have named the rows
+
+        :return: A hash of the row names and their primals
+        :rtype: dict
+        """
+
+        names = self.row_names if self.row_names is not None else [None] * self.nrows
+        return dict(zip(names, self.row_primal_array().tolist()))
+
+    def row_primals(self):
+        """
+        Return an array of the primals (activities), one for each row
+
+        :return: A list of the row primals
+        :rtype: list
+        """
+
+        return self.row_primal_array().tolist()
+
+    def col_primal_array(self):
+        """
+        Return a numpy array of the primals (activities), one for each column
+
+        :return: An array of the column primals
+        :rtype: numpy.ndarray
+        """
+
+        return self._values(self.result.x if self.result else None)[:self.ncols].copy()
+
+    def col_dual_array(self):
+        """
+        Return a numpy array of the duals of the columns. These are the reduced costs of each column
+
+        :return: An array of the reduced costs
+        :rtype: numpy.ndarray
+        """
+
+        return self._marginals()[:self.ncols]
+
+    def row_primal_array(self):
+        """
+        Return a numpy array of the primals (activities), one for each row
+
+        :return: An array of the row primals
+        :rtype: numpy.ndarray
+        """
+
+        return self._values(self.result.x if self.result else None)[self.ncols:].copy()
+
+    def row_dual_array(self):
+        """
+        Return a numpy array of the duals of the rows. These are the shadow prices of each row
+
+        :return: An array of the shadow prices
+        :rtype: numpy.ndarray
+        """
+
+        return self._marginals()[self.ncols:]
@@ -4,7 +4,7 @@ import os.path
 import PyFBA
 
 
-def model_reaction_fluxes(model, media_file, biomass_reaction=None):
+def model_reaction_fluxes(model, media_file, biomass_reaction=None, parsimonious=False):
     """
     Run FBA on model and return dictionary of reaction ID and flux.
 
@@ -14,15 +14,17 @@ def model_reaction_fluxes(model, media_file, biomass_reaction=None):
     :type media_file: str
     :param biomass_reaction: Given biomass Reaction object
     :type biomass_reaction: Reaction
+    :param parsimonious: Return the fluxes with the smallest total flux at the optimal biomass flux (pFBA)
+    :type parsimonious: bool
     :rtype: dict
     """
-    status, value, growth = model.run_fba(media_file, biomass_reaction)
+    status, value, growth = model.run_fba(media_file, biomass_reaction, parsimonious=parsimonious)
     if not growth:
         print("Warning: model did not grow on given media", file=sys.stderr)
     return PyFBA.fba.reaction_fluxes()
 
 
-def output_fba(f, model, media_file, biomass_reaction=None):
+def output_fba(f, model, media_file, biomass_reaction=None, parsimonious=False):
     """
     Run FBA on model and output results in tab-delimited format.
 
@@ -34,6 +36,8 @@ def output_fba(f, model, media_file, biomass_reaction=None):
     :type media_file: str
     :param biomass_reaction: Given biomass Reaction object
     :type biomass_reaction: Reaction
+    :param parsimonious: Output the fluxes with the smallest total flux at the optimal biomass flux (pFBA)
+    :type parsimonious: bool
     """
     # Get mapping from reaction IDs to roles
     mReactions = {r: [] for r in model.reactions.keys()}
@@ -42,7 +46,7 @@ def output_fba(f, model, media_file, biomass_reaction=None):
             mReactions[r].append(role)
 
     # Run FBA and get fluxes
-    fluxes = model_reaction_fluxes(model, media_file, biomass_reaction)
+    fluxes = model_reaction_fluxes(model, media_file, biomass_reaction, parsimonious)
 
     # Print header
     f.write("reaction\tflux\tfunction\n")
@@ -55,7 +59,7 @@ def output_fba(f, model, media_file, biomass_reaction=None):
         f.write("\n")
 
 
-def output_fba_with_subsystem(f, model, media_file, biomass_reaction=None):
+def output_fba_with_subsystem(f, model, media_file, biomass_reaction=None, parsimonious=False):
     """
     Run FBA on model and output results and subsystem info in tab-delimited format.
 
@@ -67,6 +71,8 @@ def output_fba_with_subsystem(f, model, media_file, biomass_reaction=None):
     :type media_file: str
     :param biomass_reaction: Given biomass Reaction object
     :type biomass_reaction: Reaction
+    :param parsimonious: Output the fluxes with the smallest total flux at the optimal biomass flux (pFBA)
+    :type parsimonious: bool
     """
     # Get mapping from reaction IDs to roles
     mReactions = {r: [] for r in model.reactions.keys()}
@@ -87,7 +93,7 @@ def output_fba_with_subsystem(f, model, media_file, biomass_reaction=None):
             ss_data[func].add((cat, subcat, ss))
 
     # Run FBA and get fluxes
-    fluxes = model_reaction_fluxes(model, media_file, biomass_reaction)
+    fluxes = model_reaction_fluxes(model, media_file, biomass_reaction, parsimonious)
 
     # Print header
     f.write("reaction\tflux\tfunction\tsubsystem\tsubcategory\tcategory\n")
@@ -181,7 +181,7 @@ class Model:
                 cat, subcat, ss = i
                 f.write("{}\t{}\t{}\t{}\n".format(role, ss, subcat, cat))
 
-    def run_fba(self, media_file, biomass_reaction=None):
+    def run_fba(self, media_file, biomass_reaction=None, parsimonious=False):
         """
         Run FBA on model and return status, value, and growth.
 
@@ -189,6 +189,8 @@ class Model:
         :type media_file: str
         :param biomass_reaction: Given biomass Reaction object
         :type biomass_reaction: Reaction
+        :param parsimonious: Also find the fluxes with the smallest total flux at the optimal biomass flux (pFBA)
+        :type parsimonious: bool
         :rtype: tuple
         """
         # Check if model has a biomass reaction if none was given
@@ -213,7 +215,8 @@ class Model:
         status, value, growth = PyFBA.fba.run_fba(modeldata,
                                                   model_rxns,
                                                   media,
-                                                  biomass_reaction)
+                                                  biomass_reaction,
+                                                  parsimonious=parsimonious)
 
         return status, value, growth
 
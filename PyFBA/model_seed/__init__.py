@@ -2,8 +2,8 @@
 A model seed object
 """
 
-from .model_data import ModelData
+from .model_data import ModelData, ReactionDict
 
 __all__ = [
-    'ModelData'
+    'ModelData', 'ReactionDict'
 ]
\ No newline at end of file
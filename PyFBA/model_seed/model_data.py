@@ -1,11 +1,55 @@
 """
 
 """
+import uuid
 from typing import Dict, Set
 
+from scipy import sparse
+
 import PyFBA
 
 
+class ReactionDict(dict):
+    """
+    A dict of reaction id -> reaction objects that counts how many times it has been changed, so that we know
+    when to rebuild anything that we calculated from the reactions (e.g. ModelData.universe_matrix) without
+    looking at every reaction.
+
+    :ivar version: the number of times that reactions have been added, replaced, or removed
+    """
+
+    version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.version += 1
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+
 class ModelData:
     """
      A class to hold model seed objects so that we only need to parse them once.
@@ -15,8 +59,13 @@ class ModelData:
 
      Other variables associated with the Compound class:
      :ivar compounds: a dict of compound id -> compound objects
-     :ivar reactions: a dict of organism type -> dict(reaction id -> reaction objects).
+     :ivar reactions: a dict of reaction id -> reaction objects. This is a ReactionDict, so we know when it changes
      :ivar enzymes:a dict of enzyme id -> enzyme objects
+     :ivar uid: a unique id for this object, e.g. to tell the compiled models of different model data apart
+     :ivar universe: a sparse compound x reaction matrix of all the reactions (see universe_matrix)
+     :ivar universe_compounds: the compound with location for each row of the universe matrix
+     :ivar universe_reaction_index: a dict of reaction id and its column in the universe matrix
+     :ivar exchange_reactions: a dict of reaction id -> the uptake and secretion reaction for an external compound
 
      """
     compounds: Set[PyFBA.metabolism.Compound]
@@ -25,6 +74,7 @@ class ModelData:
     def __init__(self, compounds=None, reactions=None, enzymes=None,
                  complexes=None, roles=None, organism_type=None):
         self.compounds = compounds
+        self.changes = 0
         if reactions:
             self.reactions = reactions
         else:
@@ -33,10 +83,16 @@ class ModelData:
         self.complexes = complexes
         self.roles = roles
         self.organism_type = organism_type
+        self.uid = uuid.uuid4().hex
         self.compounds_by_id = {}
         self.compounds_by_name = {}
         self.last_compound_by_id_sz = 0
         self.last_compound_by_name_sz = 0
+        self.universe = None
+        self.universe_compounds = []
+        self.universe_reaction_index = {}
+        self.universe_version = None
+        self.exchange_reactions = {}
 
     def reset(self):
         self.compounds = set()
@@ -44,6 +100,9 @@ class ModelData:
         self.enzymes = None
         self.complexes = None
         self.roles = None
+        self.universe = None
+        self.exchange_reactions = {}
+        self.uid = uuid.uuid4().hex
 
     def rebuild_indices(self):
         self.compounds_by_id = {}
@@ -84,5 +143,101 @@ class ModelData:
             return self.compounds_by_id[cid]
         return None
 
+    def exchange_reaction(self, compound):
+        """
+        Retrieve the uptake and secretion reaction for an external compound. The reaction is only created the
+        first time we need it, and it is not added to self.reactions.
+
+        :param compound: the external compound
+        :type compound: PyFBA.metabolism.CompoundWithLocation
+        :return: the uptake and secretion reaction
+        :rtype: PyFBA.metabolism.Reaction
+        """
+
+        rid = PyFBA.fba.exchange_reaction_id(compound)
+        if rid not in self.exchange_reactions:
+            self.exchange_reactions[rid] = PyFBA.fba.exchange_reaction(compound)
+        return self.exchange_reactions[rid]
+
+    @property
+    def reactions(self):
+        return self._reactions
+
+    @reactions.setter
+    def reactions(self, reactions):
+        # count the new dict as a change, so that its version is never the same as the old one
+        self.changes += 1
+        if not isinstance(reactions, ReactionDict):
+            reactions = ReactionDict(reactions)
+        self._reactions = reactions
+
+    @property
+    def version(self):
+        """
+        A value that changes whenever reactions are added to, replaced in, or removed from self.reactions, or
+        when you call reactions_changed. Anything that we calculate from the reactions (e.g. the universe matrix
+        and the PyFBA.fba.StoichiometryCache keys) is recalculated when the version changes.
+
+        :return: the version of the reactions
+        :rtype: (int, int)
+        """
+        return self.changes, self._reactions.version
 
+    def reactions_changed(self):
+        """
+        Tell the model data that you have changed the stoichiometry of a reaction in place (e.g. with
+        Reaction.add_left_compounds). Adding, replacing, or removing reactions in self.reactions is noticed
+        automatically.
+        """
+        self.changes += 1
+
+    def rebuild_universe(self):
+        """
+        Build a sparse compound x reaction matrix for every reaction that we know about. Each compound with
+        location is a row, and each reaction is a column. Compounds that are on both sides of a reaction have
+        the coefficient from the right side. Coefficients of zero are stored explicitly so that we know the
+        compounds are part of the reaction.
+        """
+
+        rows = []
+        cols = []
+        values = []
+        compound_index = {}
+        self.universe_compounds = []
+        self.universe_reaction_index = {}
+        for rid in sorted(self.reactions):
+            rxn = self.reactions[rid]
+            if rxn.is_uptake_secretion:
+                continue
+            col = len(self.universe_reaction_index)
+            self.universe_reaction_index[rid] = col
+            coefficients = {}
+            for c in rxn.left_compounds:
+                coefficients[c] = 0 - rxn.get_left_compound_abundance(c)
+            for c in rxn.right_compounds:
+                coefficients[c] = rxn.get_right_compound_abundance(c)
+            for c, v in coefficients.items():
+                if c not in compound_index:
+                    compound_index[c] = len(self.universe_compounds)
+                    self.universe_compounds.append(c)
+                rows.append(compound_index[c])
+                cols.append(col)
+                values.append(v)
+
+        self.universe = sparse.csc_matrix((values, (rows, cols)),
+                                          shape=(len(self.universe_compounds), len(self.universe_reaction_index)))
+        self.universe_version = self.version
+
+    def universe_matrix(self):
+        """
+        Retrieve the sparse compound x reaction matrix for every reaction. A model's stoichiometric matrix is
+        just a slice of the columns for its reactions. We use self.version to see if the reactions have changed,
+        and if so we rebuild the matrix.
+
+        :return: the matrix in CSC format, the compound for each row, and a dict of reaction id and its column
+        :rtype: (scipy.sparse.csc_matrix, list[PyFBA.metabolism.CompoundWithLocation], dict[str, int])
+        """
 
+        if self.universe is None or self.universe_version != self.version:
+            self.rebuild_universe()
+        return self.universe, self.universe_compounds, self.universe_reaction_index
@@ -20,6 +20,21 @@ def media_files():
     return PyFBA.Biochemistry.media
 
 
+def available_media():
+    """
+    The names of all the media that we can read: the media provided with PyFBA and the media files in the
+    directory in the PYFBA_MEDIA_DIR environment variable (if it is set)
+
+    :return: the media names
+    :rtype: list[str]
+    """
+    names = sorted(media_files())
+    if 'PYFBA_MEDIA_DIR' in os.environ and os.path.isdir(os.environ['PYFBA_MEDIA_DIR']):
+        names += sorted(m for m in os.listdir(os.environ['PYFBA_MEDIA_DIR'])
+                        if os.path.isfile(os.path.join(os.environ['PYFBA_MEDIA_DIR'], m)) and m not in names)
+    return names
+
+
 def raw_media(media_name, verbose=False):
     """
     Parse a media file that we have provided with PyFBA.
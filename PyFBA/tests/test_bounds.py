@@ -43,6 +43,17 @@ class TestBounds(unittest.TestCase):
         self.assertEqual(rbvals['re'], (0, 1000))
         self.assertEqual(rbvals['rf'], (-1000, 1000))
 
+    def test_uptake_secretion_bounds(self):
+        '''Test that the uptake and secretion reactions must be provided because they are not in the reactions'''
+        glc = PyFBA.metabolism.CompoundWithLocation('cpd00027', 'D-Glucose', 'e')
+        ra = PyFBA.metabolism.Reaction('rA', 'reaction A')
+        ra.direction = '>'
+        upsr = PyFBA.fba.uptake_and_secretion_reactions({glc}, {glc}, PyFBA.model_seed.ModelData())
+        reactions2run = ['rA', 'EX_cpd00027_e', 'BIOMASS_EQN']
+        self.assertRaises(ValueError, PyFBA.fba.calculate_reaction_bounds, {'rA': ra}, reactions2run, {glc})
+        rbvals = PyFBA.fba.calculate_reaction_bounds({'rA': ra}, reactions2run, {glc}, uptake_secretion=upsr)
+        self.assertEqual(rbvals['EX_cpd00027_e'], (-1000, 1000))
+
     def test_col_bounds(self):
         '''Testing the assertion of column bounds'''
         # define an FBA matrix of the right size
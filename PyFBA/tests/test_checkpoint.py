@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_model
+
+"""
+Test saving and resuming the progress of gapfilling
+
+"""
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'checkpoint.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume(self):
+        """Test that we resume the steps that ran the same reactions"""
+        checkpoint = PyFBA.gapfill.Checkpoint(self.path)
+        checkpoint.record_step('media', {'r1', 'r2'}, [('media', {'r2'})], False)
+        checkpoint.record_required('subsystems', {'r1'}, {'r2', 'r3'}, {'r3'})
+        self.assertEqual(os.listdir(self.directory.name), ['checkpoint.json'])
+
+        resumed = PyFBA.gapfill.Checkpoint(self.path)
+        self.assertSetEqual(resumed.reactions, {'r1', 'r2'})
+        self.assertListEqual(resumed.added_reactions, [('media', {'r2'})])
+        self.assertFalse(resumed.result('media', {'r2', 'r1'}))
+        self.assertIsNone(resumed.result('media', {'r1', 'r3'}))
+        self.assertIsNone(resumed.result('subsystems', {'r1', 'r2'}))
+        self.assertSetEqual(resumed.required('subsystems', {'r1'}, {'r3', 'r2'}), {'r3'})
+        self.assertIsNone(resumed.required('subsystems', {'r1'}, {'r2'}))
+
+    def test_oracle(self):
+        """Test that we save and restore the sets of reactions that the growth oracles know"""
+        checkpoint = PyFBA.gapfill.Checkpoint(self.path)
+        oracle = PyFBA.fba.GrowthOracle()
+        checkpoint.watch('growth', oracle)
+        oracle.record({'r1', 'r2'}, True)
+        oracle.record({'r3'}, False)
+        checkpoint.save()
+
+        restored = PyFBA.fba.GrowthOracle()
+        PyFBA.gapfill.Checkpoint(self.path).watch('growth', restored)
+        self.assertTrue(restored.known({'r1', 'r2', 'r4'}))
+        self.assertFalse(restored.known({'r3'}))
+        self.assertIsNone(restored.known({'r1'}))
+
+    def test_different_model(self):
+        """Test that we do not resume a checkpoint that was saved with a different media or biomass equation"""
+        modeldata, media, biomass_equation = toy_model()
+        checkpoint = PyFBA.gapfill.Checkpoint(self.path, media=media, biomass_equation=biomass_equation)
+        checkpoint.record_step('media', {'r1', 'r2'}, [('media', {'r2'})], False)
+
+        resumed = PyFBA.gapfill.Checkpoint(self.path, media=set(media), biomass_equation=biomass_equation)
+        self.assertFalse(resumed.result('media', {'r1', 'r2'}))
+        other = {PyFBA.metabolism.CompoundWithLocation('cpd2', 'B', 'e')}
+        with self.assertRaises(ValueError):
+            PyFBA.gapfill.Checkpoint(self.path, media=other, biomass_equation=biomass_equation)
+        with self.assertRaises(ValueError):
+            PyFBA.gapfill.Checkpoint(self.path, media=media)
+
+    def test_global_gapfill(self):
+        """Test that we save the reactions that the global gapfill chose, and use them when we resume"""
+        steps = [('first', {'rxn3', 'rxn5'}), ('second', {'rxn8', 'rxn9'})]
+        modeldata, media, biomass_equation = toy_model()
+        checkpoint = PyFBA.gapfill.Checkpoint(self.path, media=media, biomass_equation=biomass_equation)
+        rxns = PyFBA.gapfill.minimize_reactions({'rxn1'}, list(steps), modeldata, media, biomass_equation,
+                                                global_lp=True, checkpoint=checkpoint)
+        self.assertSetEqual(set(rxns), {'rxn1', 'rxn3', 'rxn5'})
+
+        resumed = PyFBA.gapfill.Checkpoint(self.path, media=media, biomass_equation=biomass_equation)
+        self.assertSetEqual(resumed.required('global gapfill', {'rxn1'}, {'rxn3', 'rxn5', 'rxn8', 'rxn9'}),
+                            {'rxn3', 'rxn5'})
+        with mock.patch('PyFBA.fba.run_fba') as run_fba:
+            again = PyFBA.gapfill.global_gapfill({'rxn1'}, list(steps), modeldata, media, biomass_equation,
+                                                 checkpoint=resumed)
+        run_fba.assert_not_called()
+        self.assertDictEqual(again, rxns)
+
+    def test_media_oracles(self):
+        """Test that minimize_reactions names the growth oracle after the media"""
+        modeldata, media, biomass_equation = toy_model()
+        checkpoint = PyFBA.gapfill.Checkpoint(self.path, media=media, biomass_equation=biomass_equation)
+        PyFBA.gapfill.minimize_reactions({'rxn1'}, [('first', {'rxn3', 'rxn4', 'rxn5'})], modeldata, media,
+                                         biomass_equation, checkpoint=checkpoint)
+        self.assertListEqual(list(checkpoint.oracles), [f"media {PyFBA.gapfill.media_digest(media)}"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import pickle
+import unittest
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_network
+
+"""
+Test the compiled network that we load into the solver
+
+"""
+
+
+class TestCompiledNetwork(unittest.TestCase):
+
+    def network(self):
+        """A small compiled network"""
+        return toy_network([(0, 0, 1.0), (1, 1, -1.0), (1, 2, 1.0)], ['a', 'b'], ['x', 'y', 'BIOMASS_EQN'],
+                           {'x': (-1000, 1000), 'y': (0, 1000), 'BIOMASS_EQN': (0, 1000)})
+
+    def test_arrays(self):
+        """Test the indices, bounds, and objective"""
+        network = self.network()
+        self.assertEqual(network.data, [(0, 0, 1.0), (1, 1, -1.0), (1, 2, 1.0)])
+        self.assertEqual(network.reaction_index['y'], 1)
+        self.assertEqual(network.reaction_bounds['x'], (-1000, 1000))
+        self.assertListEqual(network.objective.tolist(), [0, 0, 1])
+
+    def test_pickle(self):
+        """Test that we can send the network to another process"""
+        network = pickle.loads(pickle.dumps(self.network()))
+        self.assertEqual(network.data, self.network().data)
+        self.assertListEqual(network.reactions, ['x', 'y', 'BIOMASS_EQN'])
+        self.assertEqual(network.reaction_bounds, self.network().reaction_bounds)
+
+    def test_load(self):
+        """Test that loading the network only changes the problem, not the uptake and secretion reactions"""
+        a = PyFBA.metabolism.CompoundWithLocation('cpd1', 'A', 'e')
+        upsr = PyFBA.fba.uptake_and_secretion_reactions({a}, set())
+        network = toy_network([(0, 0, -1.0), (0, 1, -1.0)], [a], ['EX_cpd1_e', 'BIOMASS_EQN'],
+                              {'EX_cpd1_e': (-1000, 1000), 'BIOMASS_EQN': (0, 1000)}, upsr)
+        network.load(PyFBA.lp.new_problem())
+        self.assertEqual((upsr['EX_cpd1_e'].lower_bound, upsr['EX_cpd1_e'].upper_bound), (0, 1000))
+
+    def test_feasible_growth(self):
+        """Test asking whether the network grows without optimizing the biomass"""
+        network = self.network()
+        network.load()
+        problem = PyFBA.lp.get_default_problem()
+        self.assertEqual(PyFBA.fba.feasible_growth(problem, 2, (0, 1000)), ('opt', True))
+        self.assertEqual(PyFBA.fba.feasible_growth(problem, 2, (0, 0)), ('nofeas', False))
+
+    def test_feasible_growth_objective(self):
+        """Test that we restore the objective when it is not the biomass equation"""
+        network = self.network()
+        problem = PyFBA.lp.new_problem()
+        network.load(problem)
+        problem.objective_coefficients([1.0, 0.0, 0.0])
+        self.assertEqual(PyFBA.fba.feasible_growth(problem, 2, (0, 1000)), ('opt', True))
+        self.assertEqual(problem.objective_coefficient(0), 1.0)
+        self.assertEqual(problem.objective_coefficient(2), 0.0)
+
+    def test_growth_threshold(self):
+        """Test that solve and grows agree that a biomass flux of exactly the threshold is not growth"""
+        for upper, grows in ((PyFBA.fba.GROWTH_THRESHOLD, False), (PyFBA.fba.GROWTH_THRESHOLD + 0.5, True)):
+            network = toy_network([(0, 0, 1.0), (1, 1, -1.0), (1, 2, 1.0)], ['a', 'b'], ['x', 'y', 'BIOMASS_EQN'],
+                                  {'x': (-1000, 1000), 'y': (0, 1000), 'BIOMASS_EQN': (0, upper)})
+            session = PyFBA.fba.FBASession(network=network)
+            status, value, growth = session.solve()
+            self.assertAlmostEqual(value, upper)
+            self.assertEqual(growth, grows)
+            self.assertEqual(session.grows(), grows)
+
+
+if __name__ == '__main__':
+    unittest.main()
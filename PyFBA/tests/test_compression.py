@@ -0,0 +1,46 @@
+import unittest
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_network
+
+"""
+Test merging the fully coupled reactions into single columns
+
+"""
+
+
+class TestCompression(unittest.TestCase):
+
+    def network(self):
+        """
+        A linear pathway. EX_a takes up a, r1: a -> b, r2: 2 b <=> c, r3: c -> d, and the biomass equation uses d.
+        r2 and r3 are coupled to r1, so they should all end up in the column for r1.
+        """
+        compounds = ['a', 'b', 'c', 'd']
+        reactions = ['r1', 'r2', 'r3', 'EX_a', 'BIOMASS_EQN']
+        data = [(0, 0, -1), (1, 0, 1), (1, 1, -2), (2, 1, 1), (2, 2, -1), (3, 2, 1), (0, 3, -1), (3, 4, -1)]
+        bounds = {'r1': (0, 1000), 'r2': (-1000, 1000), 'r3': (0, 100), 'EX_a': (-1000, 1000),
+                  'BIOMASS_EQN': (0, 1000)}
+        ex_a = PyFBA.metabolism.Reaction('EX_a', 'EX_a')
+        return toy_network(data, compounds, reactions, bounds, {'EX_a': ex_a})
+
+    def test_compress(self):
+        """Test merging a linear pathway"""
+        compressed = PyFBA.fba.compress(self.network())
+        self.assertListEqual(compressed.reactions, ['r1', 'EX_a', 'BIOMASS_EQN'])
+        self.assertListEqual(compressed.compounds, ['a', 'd'])
+        self.assertDictEqual(compressed.coupled, {'r1': [('r2', 0.5), ('r3', 0.5)]})
+        # r3 can only carry 100, so r1 can only carry 200
+        self.assertEqual(compressed.reaction_bounds['r1'], (0, 200))
+        self.assertEqual(sorted(compressed.data), [(0, 0, -1), (0, 1, -1), (1, 0, 0.5), (1, 2, -1)])
+
+    def test_protected(self):
+        """Test that we do not merge the uptake and secretion reactions or the biomass equation"""
+        compressed = PyFBA.fba.compress(self.network())
+        self.assertIn('EX_a', compressed.reactions)
+        self.assertEqual(compressed.reactions[-1], 'BIOMASS_EQN')
+        self.assertIs(compressed.compress(), compressed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+import PyFBA
+
+"""
+Test minimizing a set of reactions with delta debugging
+
+"""
+
+
+class TestDdmin(unittest.TestCase):
+
+    reactions = [f"r{i}" for i in range(16)]
+
+    def test_split_reactions(self):
+        """Test finding reactions that bisection would split between the two halves"""
+        needed = {'r3', 'r12'}
+        reactions, tests = PyFBA.gapfill.ddmin(self.reactions, lambda r: needed.issubset(r))
+        self.assertCountEqual(reactions, needed)
+        self.assertLess(tests, 2 ** len(needed) * len(self.reactions))
+
+    def test_one_minimal(self):
+        """Test that we can not remove any one of the reactions we return"""
+        def grows(r):
+            return {'r1', 'r2'}.issubset(r) or {'r5', 'r9', 'r14'}.issubset(r)
+        reactions, tests = PyFBA.gapfill.ddmin(self.reactions, grows)
+        self.assertTrue(grows(reactions))
+        for r in reactions:
+            self.assertFalse(grows([s for s in reactions if s != r]))
+
+
+if __name__ == '__main__':
+    unittest.main()
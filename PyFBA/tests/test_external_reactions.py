@@ -0,0 +1,27 @@
+import unittest
+
+import PyFBA
+
+"""
+Test adding and removing the uptake and secretion reactions
+
+"""
+
+
+class TestExternalReactions(unittest.TestCase):
+
+    a = PyFBA.metabolism.CompoundWithLocation('cpd1', 'A', 'e')
+
+    def test_remove(self):
+        """Test that we only remove the uptake and secretion reactions that we added, not the model EX_ reactions"""
+        exchange = PyFBA.fba.exchange_reaction(self.a)
+        model_exchange = PyFBA.metabolism.Reaction('EX_cpd1', 'exchange for A from the model')
+        model_exchange.add_left_compounds({self.a})
+        model_exchange.is_uptake_secretion = True
+        reactions = {exchange.id: exchange, model_exchange.id: model_exchange}
+        reactions = PyFBA.fba.remove_uptake_and_secretion_reactions(reactions)
+        self.assertListEqual(list(reactions), ['EX_cpd1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,20 @@ class TestFBA(unittest.TestCase):
     modeldata = PyFBA.parse.model_seed.parse_model_seed_data('gramnegative', verbose=True)
     media = PyFBA.parse.pyfba_media(media_name="ArgonneLB", modeldata=modeldata, verbose=False)
 
+    @classmethod
+    def setUpClass(cls):
+        """
+        Read the reactions in reaction_list.txt that are in the model seed data
+        """
+        cls.reactions2run = set()
+        with open(os.path.join(test_file_loc, 'reaction_list.txt'), 'r') as f:
+            for lf in f:
+                if lf.startswith('#') or "biomass" in lf.lower():
+                    continue
+                r = lf.strip()
+                if r in cls.modeldata.reactions:
+                    cls.reactions2run.add(r)
+
     def setUp(self):
         """
         This is run before everything else
@@ -70,3 +84,85 @@ class TestFBA(unittest.TestCase):
         self.assertTrue(growth)
         value = float('%0.3f' % value)
         self.assertGreaterEqual(value, 200)
+
+    def test_fba_session(self):
+        """Test that an FBA session gives the same results as run_fba when we switch reactions off and on"""
+        reactions2run = set(self.__class__.reactions2run)
+        media = PyFBA.parse.pyfba_media('ArgonneLB', self.__class__.modeldata)
+        biomass = PyFBA.metabolism.biomass_equation('gram_negative')
+        session = PyFBA.fba.FBASession(self.__class__.modeldata, reactions2run, media, biomass)
+        status, value, growth = session.solve()
+        self.assertTrue(growth)
+        self.assertGreaterEqual(value, 200)
+
+        # switching off everything means we can not grow
+        session.disable(reactions2run)
+        status, value, growth = session.solve()
+        self.assertFalse(growth)
+
+        session.enable(reactions2run)
+        status, value, growth = session.solve()
+        self.assertTrue(growth)
+        self.assertEqual(session.enabled(), reactions2run)
+        self.assertRaises(ValueError, session.disable, {'not_a_reaction'})
+
+    def test_reaction_knockouts(self):
+        """Test that knocking out reactions in parallel gives the same results as running them one at a time"""
+        reactions2run = set(self.__class__.reactions2run)
+        media = PyFBA.parse.pyfba_media('ArgonneLB', self.__class__.modeldata)
+        biomass = PyFBA.metabolism.biomass_equation('gram_negative')
+        deletions = sorted(reactions2run)[0:10]
+        serial = PyFBA.fba.reaction_knockouts(self.__class__.modeldata, reactions2run, media, biomass,
+                                              deletions=deletions, processes=1)
+        parallel = PyFBA.fba.reaction_knockouts(self.__class__.modeldata, reactions2run, media, biomass,
+                                                deletions=deletions, processes=2)
+        self.assertEqual(set(serial), set(deletions))
+        for d in deletions:
+            self.assertAlmostEqual(serial[d][0], parallel[d][0], places=3)
+            self.assertEqual(serial[d][1], parallel[d][1])
+        self.assertRaises(ValueError, PyFBA.fba.reaction_knockouts, self.__class__.modeldata, reactions2run, media,
+                          biomass, deletions=['not_a_reaction'])
+
+    def test_flux_variability(self):
+        """Test the flux variability analysis"""
+        reactions2run = set(self.__class__.reactions2run)
+        media = PyFBA.parse.pyfba_media('ArgonneLB', self.__class__.modeldata)
+        biomass = PyFBA.metabolism.biomass_equation('gram_negative')
+        status, value, growth = PyFBA.fba.run_fba(self.__class__.modeldata, reactions2run, media, biomass)
+        to_test = set(sorted(reactions2run)[0:10])
+        fva = PyFBA.fba.flux_variability(self.__class__.modeldata, reactions2run, media, biomass,
+                                         fraction_of_optimum=0.9, reactions_to_test=to_test | {'BIOMASS_EQN'})
+        self.assertEqual(set(fva), to_test | {'BIOMASS_EQN'})
+        minimum, maximum = fva['BIOMASS_EQN']
+        self.assertAlmostEqual(minimum, 0.9 * value, places=3)
+        self.assertAlmostEqual(maximum, value, places=3)
+        for r in to_test:
+            self.assertLessEqual(fva[r][0], fva[r][1] + 1e-6)
+
+    def test_screen_media(self):
+        """Test that screening several media gives the same results as running each media separately"""
+        reactions2run = set(self.__class__.reactions2run)
+        biomass = PyFBA.metabolism.biomass_equation('gram_negative')
+        media_names = ['ArgonneLB', 'MOPS_NoC_Alpha-D-Glucose', 'MOPS_NoC_Adenosine']
+        screen = PyFBA.fba.screen_media(self.__class__.modeldata, reactions2run, media_names, biomass)
+        self.assertEqual(set(screen), set(media_names))
+        for m in media_names:
+            media = PyFBA.parse.pyfba_media(m, self.__class__.modeldata)
+            status, value, growth = PyFBA.fba.run_fba(self.__class__.modeldata, reactions2run, media, biomass)
+            self.assertAlmostEqual(screen[m][0], value, places=3)
+            self.assertEqual(screen[m][1], growth)
+
+    def test_run_fba_cache(self):
+        """Test that running the same model from the cache gives the same answer"""
+        reactions2run = set(self.__class__.reactions2run)
+        media = PyFBA.parse.pyfba_media('ArgonneLB', self.__class__.modeldata)
+        biomass = PyFBA.metabolism.biomass_equation('gram_negative')
+        cache = PyFBA.fba.StoichiometryCache()
+        status, value, growth = PyFBA.fba.run_fba(self.__class__.modeldata, reactions2run, media, biomass,
+                                                  cache=cache)
+        self.assertEqual(cache.misses, 1)
+        status, cached_value, cached_growth = PyFBA.fba.run_fba(self.__class__.modeldata, reactions2run, media,
+                                                                biomass, cache=cache)
+        self.assertEqual(cache.hits, 1)
+        self.assertAlmostEqual(value, cached_value, places=3)
+        self.assertEqual(growth, cached_growth)
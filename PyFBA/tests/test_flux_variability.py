@@ -0,0 +1,46 @@
+import math
+import unittest
+
+import PyFBA
+from PyFBA.fba.flux_variability import _load_problem, _variability
+from PyFBA.tests.toy_networks import toy_network
+
+"""
+Test the flux variability analysis on a small network
+
+"""
+
+
+class TestFluxVariability(unittest.TestCase):
+
+    def network(self):
+        """
+        EX_a takes up a, r1: a -> b, r2: b <=> c, r3: c <=> b, and the biomass equation uses b. r2 and r3 are a
+        cycle with no bounds, so their flux is unbounded.
+        """
+        compounds = ['a', 'b', 'c']
+        reactions = ['r1', 'r2', 'r3', 'EX_a', 'BIOMASS_EQN']
+        data = [(0, 0, -1), (1, 0, 1), (1, 1, -1), (2, 1, 1), (2, 2, -1), (1, 2, 1), (0, 3, -1), (1, 4, -1)]
+        bounds = {'r1': (0, 1000), 'r2': (-math.inf, math.inf), 'r3': (-math.inf, math.inf),
+                  'EX_a': (-10, 1000), 'BIOMASS_EQN': (0, 1000)}
+        return toy_network(data, compounds, reactions, bounds)
+
+    def test_optimum(self):
+        """Test that we can keep all of the optimal biomass flux"""
+        problem, optimum = _load_problem(self.network(), 1.0)
+        self.assertAlmostEqual(optimum, 10)
+        j, minimum, maximum = _variability(problem, [0])[0]
+        self.assertAlmostEqual(minimum, 10, places=4)
+        self.assertAlmostEqual(maximum, 10)
+        self.assertLess(PyFBA.fba.biomass_minimum(optimum), optimum)
+
+    def test_unbounded(self):
+        """Test that unbounded fluxes are reported as infinite"""
+        problem, optimum = _load_problem(self.network(), 1.0)
+        j, minimum, maximum = _variability(problem, [1])[0]
+        self.assertEqual(minimum, -math.inf)
+        self.assertEqual(maximum, math.inf)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_model
+
+"""
+Test choosing the gapfilled reactions with a single linear program
+
+"""
+
+
+class TestGlobalGapfill(unittest.TestCase):
+
+    added_reactions = [('essential', {'r1', 'r2'}), ('media', {'r2', 'r3'}), ('orphans', {'r4'})]
+
+    def test_stage_weights(self):
+        """Test that the earlier steps are cheaper"""
+        candidates = PyFBA.gapfill.stage_weights(self.added_reactions)
+        self.assertEqual(candidates['r1'], (1, 'essential'))
+        self.assertEqual(candidates['r2'], (1, 'essential'))
+        self.assertEqual(candidates['r3'], (2, 'media'))
+        self.assertEqual(candidates['r4'], (3, 'orphans'))
+
+    def test_custom_weights(self):
+        """Test giving our own weights to some of the steps"""
+        candidates = PyFBA.gapfill.stage_weights(self.added_reactions, {'orphans': 100})
+        self.assertEqual(candidates['r3'], (2, 'media'))
+        self.assertEqual(candidates['r4'], (100, 'orphans'))
+
+    def test_selection(self):
+        """Test that we choose the cheapest set of reactions that grows"""
+        steps = [('first', {'rxn3', 'rxn5'}), ('second', {'rxn8', 'rxn9'})]
+        for milp in (True, False):
+            modeldata, media, biomass_equation = toy_model()
+            rxns = PyFBA.gapfill.global_gapfill({'rxn1'}, list(steps), modeldata, media, biomass_equation,
+                                                milp=milp, backend='highs')
+            self.assertEqual(rxns, {'rxn1': 'genome prediction', 'rxn3': 'first', 'rxn5': 'first'})
+            self.assertTrue(modeldata.reactions['rxn3'].is_gapfilled)
+            self.assertFalse(modeldata.reactions['rxn8'].is_gapfilled)
+
+            modeldata, media, biomass_equation = toy_model()
+            rxns = PyFBA.gapfill.global_gapfill({'rxn1'}, list(steps), modeldata, media, biomass_equation,
+                                                weights={'first': 10}, milp=milp, backend='highs')
+            self.assertEqual(rxns, {'rxn1': 'genome prediction', 'rxn8': 'second', 'rxn9': 'second'})
+
+    def test_fall_back(self):
+        """Test that we bisect the reactions, with the same options, if we do not find a set that grows"""
+        modeldata, media, biomass_equation = toy_model()
+        steps = [('first', {'rxn4', 'rxn5'})]
+        checkpoint = mock.Mock()
+        checkpoint.required.return_value = None
+        with mock.patch('PyFBA.gapfill.minimize_reactions', return_value={}) as minimize:
+            PyFBA.gapfill.global_gapfill({'rxn1'}, steps, modeldata, media, biomass_equation, backend='highs',
+                                         processes=2, strategy='ddmin', checkpoint=checkpoint)
+        minimize.assert_called_once_with({'rxn1'}, steps, modeldata, media, biomass_equation, processes=2,
+                                         speculative=False, strategy='ddmin', checkpoint=checkpoint, verbose=False)
+        checkpoint.record_required.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -160,3 +160,131 @@ class TestGLPKSolver(unittest.TestCase):
         
 
 
+
+    def test_sparse(self):
+        """Test loading the matrix as (row, column, value) triplets and in CSR format"""
+        mat = [
+                (0, 0, 1.0), (0, 1, 1.0), (0, 2, 1.0),
+                (1, 0, 10.0), (1, 1, 4.0), (1, 2, 5.0),
+                (2, 0, 2.0), (2, 1, 2.0), (2, 2, 6.0),
+        ]
+        lp.load_sparse(mat, 3, 3)
+        lp.objective_coefficients([ 10.0, 6.0, 4.0 ])
+        lp.row_bounds([(None, 100.0), (None, 600.0), (None, 300.0)])
+        lp.col_bounds([(0, None), (0, None), (0, None)])
+        status, result = lp.solve()
+        self.assertEqual("%0.3f" % result, "733.333")
+        self.assertEqual(status, 'opt')
+
+        lp.load_csr([0, 3, 6, 9], [0, 1, 2, 0, 1, 2, 0, 1, 2],
+                    [1.0, 1.0, 1.0, 10.0, 4.0, 5.0, 2.0, 2.0, 6.0], 3, ['a', 'b', 'c'], ['x', 'y', 'z'])
+        lp.objective_coefficients([ 10.0, 6.0, 4.0 ])
+        lp.row_bounds([(None, 100.0), (None, 600.0), (None, 300.0)])
+        lp.col_bounds([(0, None), (0, None), (0, None)])
+        status, result = lp.solve()
+        self.assertEqual("%0.3f" % result, "733.333")
+        self.assertRaises(ValueError, lp.load_sparse, mat, 3, 3, ['a', 'b'])
+
+    @unittest.skipUnless('glpk' in lp.available_backends(), "pyGLPK is not installed")
+    def test_independent_problems(self):
+        """Test that two LPProblem objects can be loaded and solved independently"""
+        mat = [
+                [ 1.0, 1.0, 1.0],
+                [10.0, 4.0, 5.0],
+                [ 2.0, 2.0, 6.0],
+        ]
+        first = lp.LPProblem()
+        second = lp.LPProblem()
+        first.load(mat, ['a', 'b', 'c'], ['x', 'y', 'z'])
+        second.load(mat, ['a', 'b', 'c'], ['x', 'y', 'z'])
+        for p in first, second:
+            p.objective_coefficients([ 10.0, 6.0, 4.0 ])
+            p.row_bounds([(None, 100.0), (None, 600.0), (None, 300.0)])
+            p.col_bounds([(0, None), (0, None), (0, None)])
+        # restrict the second problem so the two solutions differ
+        second.col_bounds([(0, 0), (0, None), (0, None)])
+        status, result = first.solve()
+        self.assertEqual("%0.3f" % result, "733.333")
+        status, result = second.solve()
+        self.assertEqual("%0.3f" % result, "600.000")
+        assertDeepAlmostEqual(self, {'y': 66.66666666666666, 'x': 33.333333333333336, 'z': 0.0},
+                              first.col_primal_hash(), places=5)
+
+    @unittest.skipUnless('glpk' in lp.available_backends(), "pyGLPK is not installed")
+    def test_warm_start(self):
+        """Test that changing only the bounds re-solves from the previous basis"""
+        mat = [
+                [ 1.0, 1.0, 1.0],
+                [10.0, 4.0, 5.0],
+                [ 2.0, 2.0, 6.0],
+        ]
+        p = lp.LPProblem(count_iterations=True)
+        p.load(mat)
+        p.objective_coefficients([ 10.0, 6.0, 4.0 ])
+        p.row_bounds([(None, 100.0), (None, 600.0), (None, 300.0)])
+        p.col_bounds([(0, None), (0, None), (0, None)])
+        status, result = p.solve()
+        self.assertEqual("%0.3f" % result, "733.333")
+        self.assertEqual(p.warm_solves, 0)
+        self.assertGreater(p.iterations, 0)
+
+        p.col_bounds([(0, 0), (0, None), (0, None)])
+        status, result = p.solve()
+        self.assertEqual("%0.3f" % result, "600.000")
+        self.assertEqual(p.warm_solves, 1)
+
+        # re-solving an unchanged problem does not change the basis
+        status, result = p.solve()
+        self.assertEqual(p.iterations, 0)
+
+        # a cold start gives the same answer
+        status, result = p.solve(warm=False)
+        self.assertEqual("%0.3f" % result, "600.000")
+        self.assertEqual(p.solves, 4)
+
+    @unittest.skipUnless('glpk' in lp.available_backends(), "pyGLPK is not installed")
+    def test_changed_bounds(self):
+        """Test that we only update the bounds that have changed, and that we can provide a dict of bounds"""
+        mat = [
+                [ 1.0, 1.0, 1.0],
+                [10.0, 4.0, 5.0],
+                [ 2.0, 2.0, 6.0],
+        ]
+        p = lp.LPProblem()
+        p.load(mat)
+        p.objective_coefficients([ 10.0, 6.0, 4.0 ])
+        self.assertEqual(p.row_bounds([(None, 100.0), (None, 600.0), (None, 300.0)]), 3)
+        self.assertEqual(p.col_bounds([(0, None), (0, None), (0, None)]), 3)
+        self.assertEqual(p.col_bounds([(0, None), (0, None), (0, None)]), 0)
+        self.assertEqual(p.col_bounds({0: (0, 0)}), 1)
+        self.assertEqual(p.col_bounds([(0, 0), (0, None), (0, None)]), 0)
+        status, result = p.solve()
+        self.assertEqual("%0.3f" % result, "600.000")
+        self.assertEqual(p.col_bounds({0: (0, None)}), 1)
+        status, result = p.solve()
+        self.assertEqual("%0.3f" % result, "733.333")
+
+    @unittest.skipUnless('glpk' in lp.available_backends(), "pyGLPK is not installed")
+    def test_arrays(self):
+        """Test getting the primals, shadow prices and reduced costs back as arrays"""
+        mat = [
+                [ 1.0, 1.0, 1.0],
+                [10.0, 4.0, 5.0],
+                [ 2.0, 2.0, 6.0],
+        ]
+        rh = ['a', 'b', 'c']
+        ch = ['x', 'y', 'z']
+
+        p = lp.LPProblem()
+        p.load(mat, rh, ch)
+        p.objective_coefficients([ 10.0, 6.0, 4.0 ])
+        p.row_bounds([(None, 100.0), (None, 600.0), (None, 300.0)])
+        p.col_bounds([(0, None), (0, None), (0, None)])
+        status, result = p.solve()
+        self.assertEqual(p.col_index, {'x': 0, 'y': 1, 'z': 2})
+        self.assertEqual(p.row_index, {'a': 0, 'b': 1, 'c': 2})
+        assertDeepAlmostEqual(self, [33.333333, 66.666667, 0.0], p.col_primal_array().tolist(), places=5)
+        assertDeepAlmostEqual(self, [0.0, 0.0, -2.666667], p.col_dual_array().tolist(), places=5)
+        assertDeepAlmostEqual(self, [100.0, 600.0, 200.0], p.row_primal_array().tolist(), places=5)
+        assertDeepAlmostEqual(self, [3.333333, 0.666667, 0.0], p.row_dual_array().tolist(), places=5)
+        assertDeepAlmostEqual(self, p.col_primal_hash(), {'x': 33.333333, 'y': 66.666667, 'z': 0.0}, places=5)
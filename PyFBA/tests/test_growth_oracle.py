@@ -0,0 +1,82 @@
+import gc
+import unittest
+import weakref
+
+import PyFBA
+
+"""
+Test answering growth tests from the sets of reactions that we have already tested
+
+"""
+
+
+class TestGrowthOracle(unittest.TestCase):
+
+    def test_implied(self):
+        """Test that supersets of growing sets grow and subsets of failing sets do not"""
+        oracle = PyFBA.fba.GrowthOracle()
+        oracle.record({'r1', 'r2'}, True)
+        oracle.record({'r1', 'r3', 'r4'}, False)
+        self.assertTrue(oracle.known({'r1', 'r2', 'r5'}))
+        self.assertFalse(oracle.known({'r3', 'r4'}))
+        self.assertIsNone(oracle.known({'r2', 'r3'}))
+        self.assertEqual(oracle.hits, 2)
+
+        tested = []
+        self.assertTrue(oracle.grows({'r1', 'r2', 'r3'}, lambda: tested.append(1)))
+        self.assertFalse(oracle.grows({'r2', 'r3'}, lambda: tested.append(1) or False))
+        self.assertEqual(len(tested), 1)
+        self.assertEqual(oracle.tests, 1)
+
+    def test_minimal_sets(self):
+        """Test that we only keep the smallest growing sets and the largest failing sets"""
+        oracle = PyFBA.fba.GrowthOracle()
+        oracle.record({'r1', 'r2', 'r3'}, True)
+        oracle.record({'r1', 'r2'}, True)
+        oracle.record({'r1'}, False)
+        oracle.record({'r2'}, False)
+        oracle.record({'r2', 'r3'}, False)
+        self.assertListEqual(oracle.growing, [frozenset({'r1', 'r2'})])
+        self.assertCountEqual(oracle.failing, [frozenset({'r1'}), frozenset({'r2', 'r3'})])
+
+    def test_changed_bounds(self):
+        """Test that we forget what we know when the bounds of a reaction change"""
+        modeldata = PyFBA.model_seed.ModelData(reactions={'r1': PyFBA.metabolism.Reaction('r1', direction='>'),
+                                                          'r2': PyFBA.metabolism.Reaction('r2', direction='>')})
+        oracle = PyFBA.fba.GrowthOracle(modeldata)
+        oracle.record({'r1', 'r2'}, False)
+        self.assertFalse(oracle.known({'r1'}))
+        modeldata.reactions['r2'].direction = '='
+        # r1 has not changed, so it still does not grow on its own
+        self.assertFalse(oracle.known({'r1'}))
+        self.assertIsNone(oracle.known({'r1', 'r2'}))
+        self.assertIsNone(oracle.known({'r1'}))
+
+    def test_index(self):
+        """Test that the indexed sets give the same answers as comparing every set"""
+        oracle = PyFBA.fba.GrowthOracle()
+        oracle.record({'r2', 'r3'}, True)
+        oracle.record({'r1', 'r4'}, True)
+        oracle.record({'r5', 'r6', 'r7'}, False)
+        oracle.record({'r5'}, False)
+        self.assertTrue(oracle.known({'r1', 'r2', 'r4'}))
+        self.assertTrue(oracle.known({'r2', 'r3', 'r5'}))
+        self.assertIsNone(oracle.known({'r1', 'r3'}))
+        self.assertFalse(oracle.known({'r6', 'r7'}))
+        self.assertIsNone(oracle.known({'r5', 'r6', 'r7', 'r8'}))
+
+    def test_shared_oracles(self):
+        """Test that the shared oracles do not keep the model data"""
+        modeldata = PyFBA.model_seed.ModelData()
+        biomass_equation = PyFBA.metabolism.Reaction('biomass')
+        oracle = PyFBA.fba.growth_oracle(modeldata, set(), biomass_equation)
+        self.assertIs(PyFBA.fba.growth_oracle(modeldata, set(), biomass_equation), oracle)
+        self.assertIsNot(PyFBA.fba.growth_oracle(modeldata, {'cpd1'}, biomass_equation), oracle)
+        model_ref = weakref.ref(modeldata)
+        del modeldata, oracle
+        gc.collect()
+        self.assertIsNone(model_ref())
+
+
+if __name__ == '__main__':
+    unittest.main()
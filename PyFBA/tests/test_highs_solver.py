@@ -0,0 +1,85 @@
+import unittest
+from PyFBA.tests.assertDeepAlmostEqual import assertDeepAlmostEqual
+from PyFBA import lp
+
+"""
+A class to test the HiGHS linear programming backend. These are the same problems as the GLPK tests,
+so the two backends should give the same answers.
+
+"""
+
+
+@unittest.skipUnless('highs' in lp.available_backends(), "scipy is not installed")
+class TestHiGHSSolver(unittest.TestCase):
+
+    mat = [
+            [ 1.0, 1.0, 1.0],
+            [10.0, 4.0, 5.0],
+            [ 2.0, 2.0, 6.0],
+    ]
+
+    def load(self, p):
+        """Load the standard problem"""
+        p.load(self.mat, ['a', 'b', 'c'], ['x', 'y', 'z'])
+        p.objective_coefficients([ 10.0, 6.0, 4.0 ])
+        p.row_bounds([(None, 100.0), (None, 600.0), (None, 300.0)])
+        p.col_bounds([(0, None), (0, None), (0, None)])
+
+    def test_new_problem(self):
+        """Test creating a problem with the highs backend"""
+        p = lp.new_problem('highs')
+        self.assertIsInstance(p, lp.HiGHSProblem)
+        self.assertRaises(ValueError, lp.new_problem, 'not_a_solver')
+
+    def test_solve(self):
+        """Test solving a problem with HiGHS"""
+        p = lp.new_problem('highs')
+        self.load(p)
+        status, result = p.solve()
+        self.assertEqual(status, 'opt')
+        self.assertEqual("%0.3f" % result, "733.333")
+        assertDeepAlmostEqual(self, {'x': 33.333333, 'y': 66.666667, 'z': 0.0}, p.col_primal_hash(), places=5)
+        assertDeepAlmostEqual(self, [100.0, 600.0, 200.0], p.row_primals(), places=5)
+
+    def test_arrays(self):
+        """Test that the shadow prices and reduced costs have the same signs as GLPK"""
+        p = lp.new_problem('highs')
+        self.load(p)
+        p.solve()
+        assertDeepAlmostEqual(self, [33.333333, 66.666667, 0.0], p.col_primal_array().tolist(), places=5)
+        assertDeepAlmostEqual(self, [0.0, 0.0, -2.666667], p.col_dual_array().tolist(), places=5)
+        assertDeepAlmostEqual(self, [3.333333, 0.666667, 0.0], p.row_dual_array().tolist(), places=5)
+
+    def test_changed_bounds(self):
+        """Test changing the bounds between solves"""
+        p = lp.new_problem('highs')
+        self.load(p)
+        self.assertEqual(p.col_bounds([(0, None), (0, None), (0, None)]), 0)
+        self.assertEqual(p.col_bounds({0: (0, 0)}), 1)
+        status, result = p.solve()
+        self.assertEqual("%0.3f" % result, "600.000")
+        p.col_bounds({0: (0, None)})
+        status, result = p.solve()
+        self.assertEqual("%0.3f" % result, "733.333")
+
+    def test_infeasible(self):
+        """Test that an infeasible problem is reported"""
+        p = lp.new_problem('highs')
+        self.load(p)
+        p.row_bounds({0: (200.0, 300.0)})
+        p.col_bounds({0: (0, 0), 1: (0, 0), 2: (0, 0)})
+        status, result = p.solve()
+        self.assertEqual(status, 'nofeas')
+
+    def test_minimize(self):
+        """Test changing some of the objective coefficients and minimizing"""
+        p = lp.new_problem('highs')
+        self.load(p)
+        p.col_bounds({0: (10, None)})
+        p.objective_coefficients({0: 1.0, 1: 0.0, 2: 0.0})
+        p.maximize = False
+        status, result = p.solve()
+        self.assertEqual("%0.3f" % result, "10.000")
+        p.maximize = True
+        status, result = p.solve()
+        self.assertEqual("%0.3f" % result, "60.000")
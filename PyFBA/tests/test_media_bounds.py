@@ -0,0 +1,43 @@
+import unittest
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_network
+
+"""
+Test calculating the bounds of the uptake and secretion reactions for each media
+
+"""
+
+
+class TestMediaBounds(unittest.TestCase):
+
+    a = PyFBA.metabolism.CompoundWithLocation('cpd1', 'A', 'e')
+    b = PyFBA.metabolism.CompoundWithLocation('cpd2', 'B', 'e')
+
+    def network(self):
+        """A network with a reaction that joins A and B and an uptake and secretion reaction for each of them"""
+        uptake_secretion = {r.id: r for r in map(PyFBA.fba.exchange_reaction, [self.a, self.b])}
+        reactions = ['r1', 'EX_cpd1_e', 'EX_cpd2_e', 'BIOMASS_EQN']
+        bounds = {'r1': (-1000, 1000), 'EX_cpd1_e': (0, 1000), 'EX_cpd2_e': (0, 1000), 'BIOMASS_EQN': (0, 1000)}
+        data = [(0, 0, -1), (1, 0, 1), (0, 1, -1), (1, 2, -1), (1, 3, -1)]
+        return toy_network(data, [self.a, self.b], reactions, bounds, uptake_secretion)
+
+    def test_calculate(self):
+        """Test the bounds are in the order of the uptake and secretion columns"""
+        media_bounds = PyFBA.fba.MediaBounds(self.network())
+        self.assertListEqual(media_bounds.columns.tolist(), [1, 2])
+        lower, upper = media_bounds.calculate({self.b})
+        self.assertListEqual(lower.tolist(), [0, -1000])
+        self.assertListEqual(upper.tolist(), [1000, 1000])
+
+    def test_named_media(self):
+        """Test keeping the bounds for named media"""
+        media_bounds = PyFBA.fba.MediaBounds(self.network(), {'A': {self.a}, 'both': {self.a, self.b}})
+        self.assertListEqual(sorted(media_bounds), ['A', 'both'])
+        self.assertListEqual(media_bounds['A'][0].tolist(), [-1000, 0])
+        self.assertListEqual(media_bounds['both'][0].tolist(), [-1000, -1000])
+        self.assertSetEqual(media_bounds.media['A'], {self.a})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,5 +27,65 @@ class TestModelSeedObject(unittest.TestCase):
         self.assertIsNone(msp.enzymes)
         self.assertFalse(msp.reactions)
 
+    def test_universe_matrix(self):
+        """Test the sparse matrix of all the reactions"""
+        a = PyFBA.metabolism.CompoundWithLocation('cpd1', 'A', 'c')
+        b = PyFBA.metabolism.CompoundWithLocation('cpd2', 'B', 'c')
+        c = PyFBA.metabolism.CompoundWithLocation('cpd3', 'C', 'c')
+        r1 = PyFBA.metabolism.Reaction('rxn1', 'rxn1')
+        r1.add_left_compounds({a})
+        r1.set_left_compound_abundance(a, 2)
+        r1.add_right_compounds({b})
+        r1.set_right_compound_abundance(b, 1)
+        r2 = PyFBA.metabolism.Reaction('rxn2', 'rxn2')
+        r2.add_left_compounds({b})
+        r2.set_left_compound_abundance(b, 1)
+        r2.add_right_compounds({c})
+        r2.set_right_compound_abundance(c, 3)
+        msp = PyFBA.model_seed.ModelData(reactions={'rxn1': r1, 'rxn2': r2})
+        universe, compounds, index = msp.universe_matrix()
+        self.assertEqual(universe.shape, (3, 2))
+        self.assertEqual(universe[compounds.index(a), index['rxn1']], -2)
+        self.assertEqual(universe[compounds.index(b), index['rxn1']], 1)
+        self.assertEqual(universe[compounds.index(c), index['rxn2']], 3)
+        self.assertEqual(universe[compounds.index(c), index['rxn1']], 0)
+        # adding a reaction rebuilds the matrix
+        r3 = PyFBA.metabolism.Reaction('rxn3', 'rxn3')
+        r3.add_left_compounds({c})
+        r3.set_left_compound_abundance(c, 1)
+        msp.reactions['rxn3'] = r3
+        universe, compounds, index = msp.universe_matrix()
+        self.assertEqual(universe.shape, (3, 3))
+        self.assertEqual(universe[compounds.index(c), index['rxn3']], -1)
+        # replacing a reaction, or changing it in place, also rebuilds the matrix
+        r4 = PyFBA.metabolism.Reaction('rxn3', 'rxn3')
+        r4.add_left_compounds({a})
+        r4.set_left_compound_abundance(a, 4)
+        msp.reactions['rxn3'] = r4
+        universe, compounds, index = msp.universe_matrix()
+        self.assertEqual(universe[compounds.index(a), index['rxn3']], -4)
+        r4.set_left_compound_abundance(a, 5)
+        msp.reactions_changed()
+        universe, compounds, index = msp.universe_matrix()
+        self.assertEqual(universe[compounds.index(a), index['rxn3']], -5)
+
+    def test_exchange_reactions(self):
+        """Test that the uptake and secretion reactions are only created once"""
+        glc = PyFBA.metabolism.CompoundWithLocation('cpd00027', 'D-Glucose', 'e')
+        h2o = PyFBA.metabolism.CompoundWithLocation('cpd00001', 'H2O', 'e')
+        msp = PyFBA.model_seed.ModelData()
+        upsr = PyFBA.fba.uptake_and_secretion_reactions({glc, h2o}, {glc}, msp)
+        self.assertSetEqual(set(upsr), {'EX_cpd00027_e', 'EX_cpd00001_e'})
+        self.assertEqual((upsr['EX_cpd00027_e'].lower_bound, upsr['EX_cpd00027_e'].upper_bound), (-1000, 1000))
+        self.assertEqual((upsr['EX_cpd00001_e'].lower_bound, upsr['EX_cpd00001_e'].upper_bound), (0, 1000))
+        self.assertFalse(msp.reactions)
+        # a different media reuses the reactions, but does not change the bounds of the ones we already have
+        again = PyFBA.fba.uptake_and_secretion_reactions({glc, h2o}, {h2o}, msp)
+        self.assertSetEqual(set(msp.exchange_reactions), {'EX_cpd00027_e', 'EX_cpd00001_e'})
+        self.assertEqual(again['EX_cpd00027_e'], upsr['EX_cpd00027_e'])
+        self.assertEqual((again['EX_cpd00027_e'].lower_bound, again['EX_cpd00027_e'].upper_bound), (0, 1000))
+        self.assertEqual((again['EX_cpd00001_e'].lower_bound, again['EX_cpd00001_e'].upper_bound), (-1000, 1000))
+        self.assertEqual((upsr['EX_cpd00027_e'].lower_bound, upsr['EX_cpd00027_e'].upper_bound), (-1000, 1000))
+
 if __name__ == '__main__':
     unittest.main()
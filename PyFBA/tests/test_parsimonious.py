@@ -0,0 +1,87 @@
+import unittest
+from unittest import mock
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_network, toy_model
+
+"""
+Test parsimonious FBA
+
+"""
+
+
+class TestParsimonious(unittest.TestCase):
+
+    def network(self):
+        """
+        EX_a takes up a, r1: a -> b, r2: b <=> a, and the biomass equation uses b. r1 and r2 form a futile
+        cycle, so FBA can put any flux through them, but pFBA should not.
+        """
+        compounds = ['a', 'b']
+        reactions = ['r1', 'r2', 'EX_a', 'BIOMASS_EQN']
+        data = [(0, 0, -1), (1, 0, 1), (1, 1, -1), (0, 1, 1), (0, 2, -1), (1, 3, -1)]
+        bounds = {'r1': (0, 1000), 'r2': (-1000, 1000), 'EX_a': (-1000, 1000), 'BIOMASS_EQN': (0, 10)}
+        return toy_network(data, compounds, reactions, bounds)
+
+    def test_split_reversible(self):
+        """Test splitting the reversible reactions into forward and reverse columns"""
+        network = self.network()
+        rows, cols, values, lower, upper, reversible = PyFBA.fba.split_reversible(network)
+        self.assertListEqual(reversible.tolist(), [1, 2])
+        self.assertListEqual(lower.tolist(), [0, 0, 0, 0, 0, 0])
+        self.assertListEqual(upper.tolist(), [1000, 1000, 1000, 10, 1000, 1000])
+        self.assertEqual(sorted(zip(rows[cols == 4].tolist(), values[cols == 4].tolist())), [(0, -1), (1, 1)])
+
+    def test_parsimonious_fba(self):
+        """Test that pFBA removes the futile cycle"""
+        network = self.network()
+        problem = PyFBA.lp.new_problem()
+        network.load(problem, split=True)
+        status, value = problem.solve()
+        self.assertEqual(status, 'opt')
+        self.assertAlmostEqual(value, 10)
+        status, total = PyFBA.fba.parsimonious_fba(problem, 3, (0, 10), value)
+        self.assertEqual(status, 'opt')
+        # the biomass flux can be a little less than the optimum (see PyFBA.fba.biomass_minimum)
+        self.assertAlmostEqual(total, 20, places=4)
+
+        fluxes = PyFBA.fba.reaction_fluxes(problem)
+        self.assertListEqual(list(fluxes), ['r1', 'r2', 'EX_a', 'BIOMASS_EQN'])
+        # r1 and the reverse of r2 are the same reaction, so we can use either of them but not both
+        self.assertAlmostEqual(fluxes['r1'] - fluxes['r2'], 10, places=4)
+        self.assertAlmostEqual(abs(fluxes['r1']) + abs(fluxes['r2']), 10, places=4)
+        self.assertAlmostEqual(fluxes['EX_a'], -10, places=4)
+        self.assertAlmostEqual(fluxes['BIOMASS_EQN'], 10, places=4)
+
+    def test_round_off(self):
+        """Test that an optimum that is a little too high because of round off still solves"""
+        network = self.network()
+        problem = PyFBA.lp.new_problem()
+        network.load(problem, split=True)
+        problem.solve()
+        status, total = PyFBA.fba.parsimonious_fba(problem, 3, (0, 10), 10 + 1e-7)
+        self.assertEqual(status, 'opt')
+        self.assertAlmostEqual(total, 20, places=4)
+
+    def test_failed_parsimonious(self):
+        """Test that run_fba uses the FBA fluxes if the pFBA does not solve"""
+        def fail(problem, biomass_column, biomass_bounds, optimum, verbose=False):
+            # leave the fluxes with no biomass flux in the problem
+            problem.maximize = False
+            problem.solve()
+            problem.maximize = True
+            return 'nofeas', None
+
+        modeldata, media, biomass_equation = toy_model()
+        problem = PyFBA.lp.new_problem()
+        with mock.patch('PyFBA.fba.parsimonious_fba', side_effect=fail) as pfba:
+            status, value, growth = PyFBA.fba.run_fba(modeldata, {'rxn1', 'rxn3', 'rxn5'}, media, biomass_equation,
+                                                      problem=problem, cache=False, parsimonious=True)
+        self.assertEqual(pfba.call_count, 1)
+        self.assertEqual(status, 'opt')
+        self.assertTrue(growth)
+        self.assertAlmostEqual(PyFBA.fba.reaction_fluxes(problem)['BIOMASS_EQN'], value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import PyFBA
+
+"""
+Test counting the media where we correctly predict growth
+
+"""
+
+
+class TestPrecisionRecall(unittest.TestCase):
+
+    modeldata = PyFBA.model_seed.ModelData()
+    biomass = PyFBA.metabolism.Reaction('biomass_equation')
+    growth_media = [{'cpd1'}, {'cpd2'}]
+    no_growth_media = [{'cpd3'}]
+
+    def setUp(self):
+        PyFBA.fba.clear_growth_oracles()
+
+    def tearDown(self):
+        PyFBA.fba.clear_growth_oracles()
+
+    def oracle(self, media):
+        return PyFBA.fba.growth_oracle(self.modeldata, media, self.biomass)
+
+    def test_known(self):
+        """Test that we use the answers that the growth oracles already know"""
+        self.oracle({'cpd1'}).record({'r1'}, True)
+        self.oracle({'cpd2'}).record({'r1', 'r2'}, False)
+        self.oracle({'cpd3'}).record({'r1', 'r2'}, True)
+        results = PyFBA.gapfill.calculate_precision_recall(self.growth_media, self.no_growth_media, self.modeldata,
+                                                           {'r1', 'r2'}, self.biomass)
+        self.assertEqual(results, {'tp': 1, 'tn': 0, 'fp': 1, 'fn': 1})
+
+    def test_stop_early(self):
+        """Test that we do not test the media that can not give us enough true positives"""
+        self.oracle({'cpd1'}).record({'r1', 'r2'}, False)
+        results = PyFBA.gapfill.calculate_precision_recall(self.growth_media, self.no_growth_media, self.modeldata,
+                                                           {'r1'}, self.biomass, minimum_tp=1)
+        self.assertEqual(results, {'tp': 0, 'tn': 0, 'fp': 1, 'fn': 2})
+        self.assertEqual(self.oracle({'cpd2'}).tests, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_network
+
+"""
+Test removing the blocked reactions before we solve the LP
+
+"""
+
+
+class TestPresolve(unittest.TestCase):
+
+    def network(self):
+        """
+        A small network. EX_a takes up a, r1: a -> b, r2: b -> c, r3: a -> d, r4: d <=> e, and the biomass
+        equation uses b. c is never consumed and e is only in r4, so r2, r3 and r4 are blocked.
+        """
+        compounds = ['a', 'b', 'c', 'd', 'e']
+        reactions = ['r1', 'r2', 'r3', 'r4', 'EX_a', 'BIOMASS_EQN']
+        data = [(0, 0, -1), (1, 0, 1), (1, 1, -1), (2, 1, 1), (0, 2, -1), (3, 2, 1), (3, 3, -1), (4, 3, 1),
+                (0, 4, -1), (1, 5, -1)]
+        bounds = {'r1': (0, 1000), 'r2': (0, 1000), 'r3': (0, 1000), 'r4': (-1000, 1000), 'EX_a': (-1000, 1000),
+                  'BIOMASS_EQN': (0, 1000)}
+        return toy_network(data, compounds, reactions, bounds)
+
+    def test_blocked_reactions(self):
+        """Test finding the dead ends"""
+        network = self.network()
+        blocked = PyFBA.fba.blocked_reactions(network)
+        self.assertListEqual([network.reactions[j] for j in range(len(blocked)) if blocked[j]], ['r2', 'r3', 'r4'])
+
+    def test_presolve(self):
+        """Test removing the blocked reactions and their compounds"""
+        reduced = PyFBA.fba.presolve(self.network())
+        self.assertListEqual(reduced.reactions, ['r1', 'EX_a', 'BIOMASS_EQN'])
+        self.assertListEqual(reduced.compounds, ['a', 'b'])
+        self.assertListEqual(reduced.removed, ['r2', 'r3', 'r4'])
+        self.assertEqual(reduced.reaction_bounds['EX_a'], (-1000, 1000))
+        self.assertEqual(sorted(reduced.data), [(0, 0, -1), (0, 1, -1), (1, 0, 1), (1, 2, -1)])
+
+    def test_blocked_biomass(self):
+        """Test that we keep the biomass equation even if it can not carry any flux"""
+        network = self.network()
+        network.upper[0] = 0
+        reduced = PyFBA.fba.presolve(network)
+        self.assertListEqual(reduced.reactions, ['BIOMASS_EQN'])
+        self.assertEqual(reduced.reaction_bounds['BIOMASS_EQN'], (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
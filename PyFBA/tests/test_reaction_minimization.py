@@ -0,0 +1,59 @@
+import sys
+import unittest
+from unittest import mock
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_model
+
+"""
+Test minimizing the gapfilled reactions
+
+"""
+
+
+class TestReactionMinimization(unittest.TestCase):
+
+    optional = {'rxn3', 'rxn4', 'rxn5', 'rxn8', 'rxn9'}
+
+    def test_minimize(self):
+        """Test that both strategies find a set of reactions that grows, with one and with more processes"""
+        for strategy in ('bisect', 'ddmin'):
+            for processes in (1, 2):
+                modeldata, media, biomass_equation = toy_model()
+                reactions = PyFBA.gapfill.minimize_additional_reactions({'rxn1'}, self.optional, modeldata, media,
+                                                                        biomass_equation, processes=processes,
+                                                                        strategy=strategy)
+                self.assertIn(reactions, ({'rxn3', 'rxn5'}, {'rxn8', 'rxn9'}))
+
+    def test_minimize_speculative(self):
+        """Test that bisecting still finds a set of reactions that grows when we also test the next bisection"""
+        modeldata, media, biomass_equation = toy_model()
+        reactions = PyFBA.gapfill.minimize_additional_reactions({'rxn1'}, self.optional, modeldata, media,
+                                                                biomass_equation, processes=2, speculative=True)
+        self.assertIn(reactions, ({'rxn3', 'rxn5'}, {'rxn8', 'rxn9'}))
+
+    def test_pool_stopped(self):
+        """Test that the worker processes are stopped if a growth test raises an exception"""
+        modeldata, media, biomass_equation = toy_model()
+        module = sys.modules['PyFBA.gapfill.reaction_minimization']
+        with mock.patch.object(module, 'Pool') as pool, \
+                mock.patch('PyFBA.gapfill.ddmin', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                PyFBA.gapfill.minimize_additional_reactions({'rxn1'}, self.optional, modeldata, media,
+                                                            biomass_equation, processes=2, strategy='ddmin')
+        pool.return_value.__exit__.assert_called_once()
+
+    def test_stale_tests(self):
+        """Test that we forget the tests that we started for sets of reactions that we no longer need"""
+        module = sys.modules['PyFBA.gapfill.reaction_minimization']
+        pool = mock.Mock()
+        pending = {}
+        module._submit_all(pool, pending, {'rxn1'}, [['rxn3'], ['rxn4'], ['rxn5']])
+        self.assertEqual(len(pending), 3)
+        module._submit_all(pool, pending, {'rxn1'}, [['rxn5'], ['rxn8']])
+        self.assertCountEqual(pending, [frozenset({'rxn5'}), frozenset({'rxn8'})])
+        self.assertEqual(pool.apply_async.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import PyFBA
+from PyFBA.tests.toy_networks import toy_network
+
+"""
+Test the least recently used cache of compiled stoichiometric matrices
+
+"""
+
+
+class TestStoichiometryCache(unittest.TestCase):
+
+    def compiled(self):
+        """A small compiled network"""
+        return toy_network([(0, 0, 1.0), (1, 1, -1.0)], ['a', 'b'], ['x', 'y'], {'x': (0, 1000), 'y': (0, 1000)})
+
+    def test_key(self):
+        """Test that the key does not depend on the order of the reactions or media"""
+        modeldata = PyFBA.model_seed.ModelData(organism_type='test')
+        media = [PyFBA.metabolism.CompoundWithLocation('cpd00001', 'H2O', 'e'),
+                 PyFBA.metabolism.CompoundWithLocation('cpd00027', 'D-Glucose', 'e')]
+        biomass = PyFBA.metabolism.Reaction('biomass', 'biomass')
+        cache = PyFBA.fba.StoichiometryCache()
+        key = cache.key(modeldata, ['rxn1', 'rxn2'], media, biomass)
+        self.assertEqual(key, cache.key(modeldata, ['rxn2', 'rxn1'], list(reversed(media)), biomass))
+        self.assertNotEqual(key, cache.key(modeldata, ['rxn1'], media, biomass))
+        self.assertNotEqual(key, cache.key(modeldata, ['rxn1', 'rxn2'], media[0:1], biomass))
+
+    def test_key_bounds(self):
+        """Test that the key changes when the bounds of a reaction change, but not when we first store them"""
+        modeldata = PyFBA.model_seed.ModelData(reactions={'rxn1': PyFBA.metabolism.Reaction('rxn1', direction='>')})
+        biomass = PyFBA.metabolism.Reaction('biomass', 'biomass')
+        cache = PyFBA.fba.StoichiometryCache()
+        key = cache.key(modeldata, ['rxn1'], [], biomass)
+        modeldata.reactions['rxn1'].lower_bound, modeldata.reactions['rxn1'].upper_bound = (0, 1000)
+        self.assertEqual(key, cache.key(modeldata, ['rxn1'], [], biomass))
+        modeldata.reactions['rxn1'].lower_bound = -1000
+        self.assertNotEqual(key, cache.key(modeldata, ['rxn1'], [], biomass))
+        other = PyFBA.model_seed.ModelData(reactions={'rxn1': PyFBA.metabolism.Reaction('rxn1', direction='>')})
+        self.assertNotEqual(key, cache.key(other, ['rxn1'], [], biomass))
+
+    def test_hits_and_misses(self):
+        """Test the cache statistics"""
+        cache = PyFBA.fba.StoichiometryCache()
+        self.assertIsNone(cache.get('one'))
+        cache.put('one', self.compiled())
+        self.assertIsNotNone(cache.get('one'))
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['bytes'], self.compiled().nbytes)
+
+    def test_eviction(self):
+        """Test that we remove the least recently used matrix when we are over budget"""
+        size = self.compiled().nbytes
+        cache = PyFBA.fba.StoichiometryCache(max_bytes=2 * size)
+        cache.put('one', self.compiled())
+        cache.put('two', self.compiled())
+        cache.get('one')
+        cache.put('three', self.compiled())
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get('two'))
+        self.assertIsNotNone(cache.get('one'))
+        self.assertIsNotNone(cache.get('three'))
+
+    def test_disabled(self):
+        """Test that nothing is stored when the budget is 0"""
+        cache = PyFBA.fba.StoichiometryCache(max_bytes=0)
+        cache.put('one', self.compiled())
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get('one'))
+
+
+if __name__ == '__main__':
+    unittest.main()
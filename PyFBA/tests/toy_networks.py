@@ -0,0 +1,72 @@
+import PyFBA
+
+
+def toy_network(data, compounds, reactions, bounds, uptake_secretion=None):
+    """
+    A small compiled network to test with. The compounds are all balanced (their bounds are (0, 0)).
+
+    :param data: the (row, column, value) triplets of the stoichiometric matrix
+    :type data: list of (int, int, float)
+    :param compounds: the compounds (rows)
+    :type compounds: list
+    :param reactions: the reactions (columns). The last one should be BIOMASS_EQN
+    :type reactions: list of str
+    :param bounds: the lower and upper bounds of each reaction
+    :type bounds: dict of str and (float, float)
+    :param uptake_secretion: the uptake and secretion reactions in the network
+    :type uptake_secretion: dict of str and PyFBA.metabolism.Reaction
+    :return: the compiled network
+    :rtype: PyFBA.fba.CompiledNetwork
+    """
+    return PyFBA.fba.CompiledNetwork(data, compounds, reactions, uptake_secretion or {}, bounds,
+                                     [(0, 0) for c in compounds])
+
+
+def _reaction(rid, left, right, direction='>'):
+    """
+    A reaction for the toy model
+
+    :param rid: the reaction id
+    :type rid: str
+    :param left: the compounds on the left of the equation
+    :type left: list of PyFBA.metabolism.CompoundWithLocation
+    :param right: the compounds on the right of the equation
+    :type right: list of PyFBA.metabolism.CompoundWithLocation
+    :param direction: the direction of the reaction
+    :type direction: str
+    :return: the reaction
+    :rtype: PyFBA.metabolism.Reaction
+    """
+    r = PyFBA.metabolism.Reaction(rid, rid, direction=direction)
+    for c in left:
+        r.add_left_compounds({c})
+        r.set_left_compound_abundance(c, 1)
+    for c in right:
+        r.add_right_compounds({c})
+        r.set_right_compound_abundance(c, 1)
+    return r
+
+
+def toy_model():
+    """
+    A small model that grows on A. A is transported in by rxn1, and E is made for the biomass either from D by
+    rxn3 and rxn5, or from F by rxn8 and rxn9. rxn4 makes D from B, which is not in the media.
+
+    :return: the model data, the media, and the biomass equation
+    :rtype: (PyFBA.model_seed.ModelData, set[PyFBA.metabolism.CompoundWithLocation], PyFBA.metabolism.Reaction)
+    """
+    loc = PyFBA.metabolism.CompoundWithLocation
+    ae, ac, bc = loc('cpd1', 'A', 'e'), loc('cpd1', 'A', 'c'), loc('cpd2', 'B', 'c')
+    dc, ec, fc = loc('cpd3', 'D', 'c'), loc('cpd4', 'E', 'c'), loc('cpd5', 'F', 'c')
+    reactions = {
+        'rxn1': _reaction('rxn1', [ae], [ac]),
+        'rxn3': _reaction('rxn3', [ac], [dc]),
+        'rxn4': _reaction('rxn4', [bc], [dc]),
+        'rxn5': _reaction('rxn5', [dc], [ec], '='),
+        'rxn8': _reaction('rxn8', [ac], [fc]),
+        'rxn9': _reaction('rxn9', [fc], [ec]),
+    }
+    modeldata = PyFBA.model_seed.ModelData(compounds={ae, ac, bc, dc, ec, fc}, reactions=reactions,
+                                           organism_type='toy')
+    biomass_equation = _reaction('biomass', [ec], [loc('cpd99', 'Biomass', 'c')])
+    return modeldata, {ae}, biomass_equation
@@ -3,7 +3,6 @@ Test all the reactions one at a time. We need to run theta(number of reactions)
 
 See PyFBA.gapgeneration.test_reactions.py for a O(n)/omega(log n) approach
 """
-import copy
 import os
 import sys
 import argparse
@@ -14,6 +13,7 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Test all reactions in a model")
     parser.add_argument('-r', help='reactions file', required=True)
     parser.add_argument('-m', help='media file', required=True)
+    parser.add_argument('-p', help='number of processes to use. Default: the number of CPUs', type=int)
     parser.add_argument('-v', help='verbose output', action='store_true')
     args = parser.parse_args()
 
@@ -40,10 +40,7 @@ if __name__ == '__main__':
     if not growth:
         sys.exit("Since the complete model does not grow, we can't parse out the important parts!")
 
-    ori_reactions = copy.copy(reactions_to_run)
-    for r in ori_reactions:
-        reactions_to_run = copy.copy(ori_reactions)
-        reactions_to_run.remove(r)
-        PyFBA.fba.remove_uptake_and_secretion_reactions(modeldata.reactions)
-        status, value, growth = PyFBA.fba.run_fba(modeldata, reactions_to_run, media, biomass_eqn)
+    knockouts = PyFBA.fba.reaction_knockouts(modeldata, reactions_to_run, media, biomass_eqn, processes=args.p)
+    for r in sorted(knockouts):
+        value, growth = knockouts[r]
         print("{}\t{}".format(r, growth))
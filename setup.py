@@ -57,8 +57,12 @@ setup(
         "nose",
         "python-libsbml",
         'importlib_resources; python_version < "3.7"',
-        'glpk'
+        'numpy',
+        'scipy'
     ],
+    extras_require={
+        'glpk': ['glpk'],
+    },
     test_suite = 'nose.collector',
     description='A Python implementation of flux balance analysis',
     tests_require = ['nose'],